@@ -0,0 +1,86 @@
+"""Throughput of the thread coalescer against direct calls
+
+Runs the same number of link budget evaluations from 1, 4 and 64 threads,
+either calling budget.compute directly or going through a shared
+coalesce.Coalescer, and reports the throughput of each case together with
+the number and mean size of the batches formed by the coalescer.
+
+Run from the repository root with:
+
+    python -m benchmarks.coalesce
+
+"""
+import argparse
+import dataclasses
+import logging
+import threading
+import time
+from linkbudget import budget, coalesce
+
+
+BASE_INPUT = budget.LinkBudgetInput(
+    eirp=52, freq=12.45e9, if_bw=24e6, rx_dish_size=0.46,
+    antenna_noise_temp=20, lnb_noise_fig=0.6, lnb_gain=40, coax_length=110,
+    rx_noise_fig=10, sat_long=-101, rx_long=-82.43, rx_lat=29.71)
+
+
+def _run(analyze, inputs, n_threads):
+    """Evaluate the inputs split over n_threads threads
+
+    Returns:
+        Elapsed wall time in seconds.
+
+    """
+    chunks = [inputs[i::n_threads] for i in range(n_threads)]
+    barrier = threading.Barrier(n_threads + 1)
+
+    def worker(chunk):
+        barrier.wait()
+        for inp in chunk:
+            analyze(inp)
+
+    threads = [threading.Thread(target=worker, args=(chunk,))
+               for chunk in chunks]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Coalescer throughput benchmark",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter
+    )
+    parser.add_argument('-n', '--number', type=int, default=20000,
+                        help='Number of evaluations per case')
+    parser.add_argument('--threads', type=int, nargs='+', default=[1, 4, 64],
+                        help='Numbers of calling threads')
+    parser.add_argument('--max-batch', type=int, default=256,
+                        help='Maximum batch size of the coalescer')
+    parser.add_argument('--max-wait', type=float, default=100e-6,
+                        help='Maximum wait of the coalescer in seconds')
+    args = parser.parse_args()
+
+    # Keep the logging overhead out of the measurements
+    logging.disable(logging.INFO)
+
+    inputs = [dataclasses.replace(BASE_INPUT, rx_lat=i % 600 / 10)
+              for i in range(args.number)]
+
+    for n_threads in args.threads:
+        direct = args.number / _run(budget.compute, inputs, n_threads)
+        coalescer = coalesce.Coalescer(args.max_batch, args.max_wait)
+        coalesced = args.number / _run(coalescer.analyze, inputs, n_threads)
+        stats = coalescer.stats()
+        print("{:3d} threads: direct {:9.0f} evals/s, coalesced {:9.0f} "
+              "evals/s ({:.2f}x), {} batches of {:.1f} inputs".format(
+                  n_threads, direct, coalesced, coalesced / direct,
+                  stats['batches'], stats['inputs'] / stats['batches']))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+"""Per-call latency of the look angle computation for a single station
+
+Compares the scalar (math-only) implementation of the ellipsoidal method,
+which pointing.look_angles picks for scalar inputs, against the NumPy-based
+implementation used by pointing.look_angles_batch, for the same single
+station. The latency of the full look_angles call is reported too.
+
+Run from the repository root with:
+
+    python -m benchmarks.look_angles
+
+"""
+import argparse
+import logging
+import timeit
+from linkbudget import pointing
+
+
+def _time_per_call(stmt, number, repeat):
+    """Best per-call time in seconds over several timing repetitions"""
+    return min(timeit.repeat(stmt, number=number, repeat=repeat)) / number
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Look angle latency benchmark",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter
+    )
+    parser.add_argument('-n', '--number', type=int, default=20000,
+                        help='Number of calls per timing repetition')
+    parser.add_argument('-r', '--repeat', type=int, default=5,
+                        help='Number of timing repetitions')
+    args = parser.parse_args()
+
+    # Keep the logging overhead out of the measurements
+    logging.disable(logging.INFO)
+
+    station = (-101, -82.43, 29.71)
+    cases = [
+        ('math', lambda: pointing._look_angles_ellipsoidal(*station)),
+        ('numpy', lambda: pointing._look_angles_ellipsoidal_batch(*station)),
+        ('look_angles', lambda: pointing.look_angles(*station)),
+    ]
+
+    results = {}
+    for label, stmt in cases:
+        results[label] = _time_per_call(stmt, args.number, args.repeat)
+        print("{:12s} {:8.2f} us/call".format(label, results[label] * 1e6))
+
+    print("Speedup of the math over the NumPy implementation: {:.2f}x".format(
+        results['numpy'] / results['math']))
+
+
+if __name__ == '__main__':
+    main()
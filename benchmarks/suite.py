@@ -0,0 +1,267 @@
+"""Benchmark suite
+
+Times the calc functions, both look angle implementations, the end-to-end
+link budget computation and the CLI cold start. Each case is measured for
+single-call latency and, where applicable, batched (vectorized) throughput at
+several batch sizes.
+
+Run from the repository root with:
+
+    python -m benchmarks.suite -o results.json
+
+The results can be saved in a JSON file and compared against a previous run,
+in which case cases that became slower than a given threshold are flagged as
+regressions (and the script exits with a non-zero code):
+
+    python -m benchmarks.suite -o new.json --compare results.json
+
+"""
+import argparse
+import contextlib
+import dataclasses
+import io
+import json
+import logging
+import platform
+import subprocess
+import sys
+import time
+import timeit
+import numpy as np
+from linkbudget import budget, calc, main, pointing
+
+
+CLI_ARGS = [
+    '--eirp', '52',
+    '--freq', '12.45e9',
+    '--if-bw', '24e6',
+    '--rx-dish-size', '0.46',
+    '--antenna-noise-temp', '20',
+    '--lnb-noise-fig', '0.6',
+    '--lnb-gain', '40',
+    '--coax-length', '110',
+    '--rx-noise-fig', '10',
+    '--sat-long', '-101',
+    '--rx-long', '-82.43',
+    '--rx-lat', '29.71',
+    '--json'
+]
+
+BASE_INPUT = budget.LinkBudgetInput(
+    eirp=52, freq=12.45e9, if_bw=24e6, rx_dish_size=0.46,
+    antenna_noise_temp=20, lnb_noise_fig=0.6, lnb_gain=40, coax_length=110,
+    rx_noise_fig=10, sat_long=-101, rx_long=-82.43, rx_lat=29.71)
+
+
+def _calc_cases(n):
+    """Calc function calls with inputs of size n (scalar if n is None)"""
+    rng = np.random.default_rng(0)
+
+    def rand(lo, hi):
+        return rng.uniform(lo, hi) if n is None else rng.uniform(lo, hi, n)
+
+    d = rand(35e6, 42e6)
+    freq = rand(1e9, 30e9)
+    diameter = rand(0.3, 3)
+    length = rand(10, 200)
+    nf = rand(0.3, 3)
+    temp = rand(20, 300)
+    snr = rand(-5, 20)
+    bw = rand(1e6, 50e6)
+    return {
+        'calc.eirp': lambda: calc.eirp(snr, nf),
+        'calc.path_loss': lambda: calc.path_loss(d, freq),
+        'calc.dish_gain': lambda: calc.dish_gain(diameter, freq),
+        'calc.coax_loss_nf': lambda: calc.coax_loss_nf(length),
+        'calc.total_noise_figure': lambda: calc.total_noise_figure(
+            [nf, length / 10, 10], [40, -length / 10]),
+        'calc.noise_fig_to_noise_temp': lambda:
+            calc.noise_fig_to_noise_temp(nf),
+        'calc.noise_temp_to_noise_fig': lambda:
+            calc.noise_temp_to_noise_fig(temp),
+        'calc.rx_sys_noise_temp': lambda: calc.rx_sys_noise_temp(20, temp),
+        'calc.cnr': lambda: calc.cnr(snr + 40, 205, 33, nf + 17, bw),
+        'calc.capacity': lambda: calc.capacity(snr, bw),
+    }
+
+
+def _pointing_cases(n):
+    """Look angle calls for n stations (a single station if n is None)"""
+    rng = np.random.default_rng(0)
+    if (n is None):
+        rx_long, rx_lat = -82.43, 29.71
+    else:
+        rx_long = rng.uniform(-120, -50, n)
+        rx_lat = rng.uniform(-60, 60, n)
+
+    return {
+        'pointing.look_angles[{}]'.format(impl): (
+            lambda impl=impl: pointing.look_angles(-101, rx_long, rx_lat,
+                                                   implementation=impl))
+        for impl in ('ellipsoidal', 'spherical')
+    }
+
+
+def _budget_cases(n):
+    """End-to-end link budget computations over n scenarios"""
+    if (n is None):
+        inp = BASE_INPUT
+        args = main.get_parser().parse_args(CLI_ARGS)
+
+        def analyze():
+            # Discard the JSON output printed by analyze
+            with contextlib.redirect_stdout(io.StringIO()):
+                main.analyze(args)
+
+        return {
+            'budget.compute': lambda: budget.compute(inp),
+            'main.analyze': analyze,
+        }
+
+    rng = np.random.default_rng(0)
+    inp = dataclasses.replace(
+        BASE_INPUT,
+        rx_long=rng.uniform(-120, -50, n),
+        rx_lat=rng.uniform(-60, 60, n),
+        rx_dish_size=rng.uniform(0.3, 3, n))
+    return {
+        'budget.compute': lambda: budget.compute(inp),
+    }
+
+
+def _time(func, min_time):
+    """Measure the time per call in seconds
+
+    Calibrates the number of calls per repetition to take at least min_time
+    seconds and returns the best of three repetitions.
+
+    """
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    while (timer.timeit(number) < min_time):
+        number *= 2
+    return min(timer.repeat(repeat=3, number=number)) / number
+
+
+def _time_cli(repeat):
+    """Measure the CLI cold start (process spawn included) in seconds"""
+    cmd = [sys.executable, '-c', 'from linkbudget.main import main; main()']
+    elapsed = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(cmd + CLI_ARGS, check=True, stdout=subprocess.DEVNULL)
+        elapsed.append(time.perf_counter() - start)
+    return min(elapsed)
+
+
+def run(sizes, min_time, cli_repeat):
+    """Run all benchmark cases
+
+    Returns:
+        Dictionary mapping each case name to a dictionary with the batch
+        size (None for single calls), the time per call in seconds and the
+        throughput in evaluations per second.
+
+    """
+    results = {}
+    for n in [None] + sizes:
+        for group in (_calc_cases, _pointing_cases, _budget_cases):
+            for name, func in group(n).items():
+                case = name if n is None else '{}/batch={}'.format(name, n)
+                t = _time(func, min_time)
+                results[case] = {
+                    'size': n,
+                    'seconds': t,
+                    'throughput': (n or 1) / t
+                }
+                print("{:50s} {:12.3f} us {:14.0f} evals/s".format(
+                    case, t * 1e6, results[case]['throughput']))
+
+    if (cli_repeat > 0):
+        t = _time_cli(cli_repeat)
+        results['cli.cold_start'] = {
+            'size': None,
+            'seconds': t,
+            'throughput': 1 / t
+        }
+        print("{:50s} {:12.3f} ms".format('cli.cold_start', t * 1e3))
+
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Compare results against a baseline run
+
+    Args:
+        results   : Results of the current run.
+        baseline  : Results of the baseline run.
+        threshold : Slowdown ratio above which a case is flagged as a
+                    regression (e.g., 1.2 for 20% slower).
+
+    Returns:
+        List of (case, ratio) tuples with the regressions.
+
+    """
+    regressions = []
+    for case, res in results.items():
+        if (case not in baseline):
+            continue
+        ratio = res['seconds'] / baseline[case]['seconds']
+        if (ratio > threshold):
+            regressions.append((case, ratio))
+    return regressions
+
+
+def main_():
+    parser = argparse.ArgumentParser(
+        description="Link budget benchmark suite",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter
+    )
+    parser.add_argument('-o', '--output',
+                        help='JSON file where the results are saved')
+    parser.add_argument('--compare', metavar='FILE',
+                        help='JSON file with the baseline results')
+    parser.add_argument('--threshold', type=float, default=1.2,
+                        help='Slowdown ratio relative to the baseline above '
+                        'which a case is flagged as a regression')
+    parser.add_argument('--sizes', type=int, nargs='+',
+                        default=[100, 10000, 1000000],
+                        help='Batch sizes used to measure the throughput')
+    parser.add_argument('--min-time', type=float, default=0.05,
+                        help='Minimum duration in seconds of each timing '
+                        'repetition')
+    parser.add_argument('--cli-repeat', type=int, default=5,
+                        help='Number of CLI cold start runs (0 to skip)')
+    args = parser.parse_args()
+
+    # Keep the logging and printing out of the measurements
+    logging.disable(logging.INFO)
+
+    results = run(args.sizes, args.min_time, args.cli_repeat)
+
+    if (args.output):
+        with open(args.output, 'w') as fd:
+            json.dump({
+                'metadata': {
+                    'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+                    'python': platform.python_version(),
+                    'numpy': np.__version__,
+                    'platform': platform.platform(),
+                    'machine': platform.machine()
+                },
+                'results': results
+            }, fd, indent=2)
+
+    if (args.compare):
+        with open(args.compare) as fd:
+            baseline = json.load(fd)['results']
+        regressions = compare(results, baseline, args.threshold)
+        for case, ratio in regressions:
+            print("REGRESSION: {} is {:.2f}x slower".format(case, ratio))
+        if (regressions):
+            sys.exit(1)
+        print("No regressions found")
+
+
+if __name__ == '__main__':
+    main_()
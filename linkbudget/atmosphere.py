@@ -0,0 +1,325 @@
+"""Atmospheric attenuation
+
+Gaseous, cloud and rain attenuation along the Earth-space path, following
+simplified versions of the ITU-R propagation models:
+
+- Gaseous absorption: zenith attenuation of the standard atmosphere (7.5 g/m3
+  of surface water vapour density), tabulated after Recommendation ITU-R
+  P.676 (Fig. 4), scaled to the slant path by the air mass of a spherical
+  shell.
+- Cloud attenuation: Rayleigh scattering model of Recommendation ITU-R P.840,
+  with the double-Debye permittivity of liquid water at 0 degC.
+- Rain attenuation: specific attenuation k*R^alpha of Recommendation ITU-R
+  P.838-3 (circular polarization), over the slant path below the rain height
+  of Recommendation ITU-R P.839 (latitude model), with the horizontal path
+  reduction factor of Recommendation ITU-R P.618.
+
+The coefficients are bundled in this module, and the frequency- and
+elevation-dependent factors are precomputed on first use into uniform 1-D
+interpolation grids (see FREQ_GRID and ELEV_GRID). Hence, each evaluation
+costs a few grid lookups, for scalar and array inputs alike. The models are
+supported from 1 to 50 GHz, and frequencies outside this range produce NaN.
+
+References:
+
+ [1] ITU-R P.676: Attenuation by atmospheric gases and related effects.
+ [2] ITU-R P.838-3: Specific attenuation model for rain for use in
+     prediction methods.
+ [3] ITU-R P.839: Rain height model for prediction methods.
+ [4] ITU-R P.840: Attenuation due to clouds and fog.
+ [5] ITU-R P.618: Propagation data and prediction methods required for the
+     design of Earth-space telecommunication systems.
+
+"""
+import bisect
+import functools
+import math
+from . import util
+
+
+R_EARTH = 8500.0  # effective Earth radius in km (P.618)
+
+# Uniform interpolation grids given as (first value, last value, step), with
+# the frequency in GHz and the elevation in degrees
+FREQ_GRID = (1.0, 50.0, 0.1)
+ELEV_GRID = (0.0, 90.0, 0.25)
+
+# Scale heights (km) of the shells used to compute the air mass of the slant
+# path at low elevations
+GAS_SCALE_HEIGHT = 6.0
+CLOUD_SCALE_HEIGHT = 2.0
+
+# Zenith attenuation (dB) of the standard atmosphere, given as (frequency in
+# GHz, attenuation) pairs, read from Fig. 4 of [1]
+_GAS_ZENITH = (
+    (1, 0.034), (2, 0.036), (4, 0.039), (6, 0.043), (8, 0.047),
+    (10, 0.053), (12, 0.062), (14, 0.077), (16, 0.10), (18, 0.15),
+    (20, 0.25), (21, 0.33), (22, 0.38), (23, 0.37), (24, 0.32),
+    (26, 0.24), (28, 0.21), (30, 0.20), (32, 0.20), (35, 0.22),
+    (38, 0.26), (40, 0.30), (42, 0.37), (44, 0.47), (46, 0.67),
+    (48, 1.05), (50, 1.90),
+)
+
+# Rain specific attenuation coefficients from Table 5 of [2], given as
+# (frequency in GHz, kH, alphaH, kV, alphaV)
+_RAIN_COEFFS = (
+    (1, 0.0000259, 0.9691, 0.0000308, 0.8592),
+    (2, 0.0000847, 1.0664, 0.0000998, 0.9490),
+    (4, 0.0001071, 1.6009, 0.0002461, 1.2476),
+    (6, 0.0007056, 1.5900, 0.0004878, 1.5728),
+    (7, 0.001915, 1.4810, 0.001425, 1.4745),
+    (8, 0.004115, 1.3905, 0.003450, 1.3797),
+    (10, 0.01217, 1.2571, 0.01129, 1.2156),
+    (12, 0.02386, 1.1825, 0.02455, 1.1216),
+    (15, 0.04481, 1.1233, 0.05008, 1.0440),
+    (20, 0.09164, 1.0568, 0.09611, 0.9847),
+    (25, 0.1571, 0.9991, 0.1533, 0.9491),
+    (30, 0.2403, 0.9485, 0.2291, 0.9129),
+    (35, 0.3374, 0.9047, 0.3224, 0.8761),
+    (40, 0.4431, 0.8673, 0.4274, 0.8421),
+    (45, 0.5521, 0.8355, 0.5375, 0.8123),
+    (50, 0.6600, 0.8084, 0.6472, 0.7871),
+)
+
+
+def air_mass(elevation, scale_height):
+    """Relative path length through a spherical shell
+
+    Ratio between the slant and the zenith path lengths through an
+    atmospheric layer of the given thickness, which tends to 1/sin(el) at
+    high elevations and remains finite at the horizon.
+
+    Args:
+        elevation    : Elevation angle in degrees.
+        scale_height : Thickness of the layer in km.
+
+    """
+    xp = util.array_namespace(elevation)
+    ratio = R_EARTH / scale_height
+    sin_el = xp.sin(xp.radians(elevation))
+    return xp.sqrt((ratio * sin_el)**2 + 2 * ratio + 1) - ratio * sin_el
+
+
+def cloud_specific_attenuation(freq_ghz, temp=273.15):
+    """Specific attenuation coefficient of cloud liquid water
+
+    Args:
+        freq_ghz : Frequency in GHz.
+        temp     : Liquid water temperature in K.
+
+    Returns:
+        Coefficient in (dB/km)/(g/m3), per Equations 2 to 9 of [4].
+
+    """
+    theta = 300 / temp
+    eps0 = 77.66 + 103.3 * (theta - 1)
+    eps1 = 0.0671 * eps0
+    eps2 = 3.52
+    fp = 20.20 - 146 * (theta - 1) + 316 * (theta - 1)**2
+    fs = 39.8 * fp
+    eps_im = freq_ghz * (eps0 - eps1) / (fp * (1 + (freq_ghz / fp)**2)) + \
+        freq_ghz * (eps1 - eps2) / (fs * (1 + (freq_ghz / fs)**2))
+    eps_re = (eps0 - eps1) / (1 + (freq_ghz / fp)**2) + \
+        (eps1 - eps2) / (1 + (freq_ghz / fs)**2) + eps2
+    eta = (2 + eps_re) / eps_im
+    return 0.819 * freq_ghz / (eps_im * (1 + eta**2))
+
+
+def rain_height(lat):
+    """Rain height in km as a function of the latitude in degrees [3]"""
+    if (util.is_scalar(lat)):
+        if (lat > 23):
+            height = 5 - 0.075 * (lat - 23)
+        elif (lat < -21):
+            height = 5 + 0.1 * (lat + 21)
+        else:
+            height = 5.0
+        return max(height, 0.0)
+
+    import numpy as np
+    lat = np.asarray(lat, dtype=float)
+    height = np.where(lat > 23, 5 - 0.075 * (lat - 23),
+                      np.where(lat < -21, 5 + 0.1 * (lat + 21), 5.0))
+    return np.maximum(height, 0.0)
+
+
+def _axis(grid):
+    first, last, step = grid
+    return first, step, int(round((last - first) / step)) + 1
+
+
+def _interp(x, xs, ys):
+    """Linear interpolation of the (xs, ys) samples at a scalar x"""
+    i = min(max(bisect.bisect_right(xs, x) - 1, 0), len(xs) - 2)
+    t = (x - xs[i]) / (xs[i + 1] - xs[i])
+    return ys[i] + t * (ys[i + 1] - ys[i])
+
+
+@functools.lru_cache(maxsize=None)
+def _tables():
+    """Interpolation grids, computed on first use
+
+    The gaseous and cloud attenuations are separable into a frequency-
+    dependent zenith (or specific) attenuation and an elevation-dependent
+    air mass, so that the grids are 1-D. They are computed with the math
+    module only, such that the scalar code path does not import NumPy.
+
+    Returns:
+        Dictionary with the zenith gaseous attenuation (dB), the cloud
+        attenuation per kg/m2 of liquid water at zenith (dB) and the rain
+        coefficients k and alpha over the frequency grid, and the air masses
+        of the gas and cloud layers over the elevation grid, as lists.
+
+    """
+    f0, df, nf = _axis(FREQ_GRID)
+    e0, de, ne = _axis(ELEV_GRID)
+    freq = [f0 + df * i for i in range(nf)]
+    elev = [e0 + de * j for j in range(ne)]
+
+    gas_f = [row[0] for row in _GAS_ZENITH]
+    gas_log_a = [math.log(row[1]) for row in _GAS_ZENITH]
+
+    # Circular polarization (Equations 4 and 5 of [2] with tau = 45 deg),
+    # interpolated with log(k) and alpha linear in log(f)
+    rain_log_f = [math.log(row[0]) for row in _RAIN_COEFFS]
+    rain_log_k = []
+    rain_alpha = []
+    for _, kh, ah, kv, av in _RAIN_COEFFS:
+        k_c = (kh + kv) / 2
+        rain_log_k.append(math.log(k_c))
+        rain_alpha.append((kh * ah + kv * av) / (2 * k_c))
+
+    return {
+        'gas': [math.exp(_interp(f, gas_f, gas_log_a)) for f in freq],
+        'gas_air_mass': [air_mass(e, GAS_SCALE_HEIGHT) for e in elev],
+        'cloud': [cloud_specific_attenuation(f) for f in freq],
+        'cloud_air_mass': [air_mass(e, CLOUD_SCALE_HEIGHT) for e in elev],
+        'rain_k': [math.exp(_interp(math.log(f), rain_log_f, rain_log_k))
+                   for f in freq],
+        'rain_alpha': [_interp(math.log(f), rain_log_f, rain_alpha)
+                       for f in freq],
+    }
+
+
+@functools.lru_cache(maxsize=None)
+def _array_tables():
+    """Interpolation grids as arrays, for the vectorized lookups"""
+    import numpy as np
+    return {name: np.array(val) for name, val in _tables().items()}
+
+
+def _index(val, grid):
+    """Grid cell and fractional offset of scalar values"""
+    first, step, n = _axis(grid)
+    x = (val - first) / step
+    i = min(max(int(math.floor(x)), 0), n - 2)
+    return i, x - i
+
+
+def _index_array(val, grid):
+    """Grid cells and fractional offsets of arrays of values"""
+    import numpy as np
+    first, step, n = _axis(grid)
+    x = (np.asarray(val, dtype=float) - first) / step
+    i = np.clip(np.floor(np.nan_to_num(x)), 0, n - 2).astype(np.intp)
+    return i, x - i
+
+
+def _lookup(name, val, grid):
+    """Linear interpolation on a grid"""
+    if (util.is_scalar(val)):
+        g = _tables()[name]
+        i, u = _index(val, grid)
+        return (1 - u) * g[i] + u * g[i + 1]
+    g = _array_tables()[name]
+    i, u = _index_array(val, grid)
+    return (1 - u) * g[i] + u * g[i + 1]
+
+
+def _lookup2(name, freq_ghz, elevation):
+    """Interpolation of a zenith attenuation scaled by its air mass, with NaN
+    outside of the frequency grid"""
+    if (util.is_scalar(freq_ghz, elevation) and
+            not FREQ_GRID[0] <= freq_ghz <= FREQ_GRID[1]):
+        return math.nan
+    res = _lookup(name, freq_ghz, FREQ_GRID) * \
+        _lookup(name + '_air_mass', elevation, ELEV_GRID)
+    if (util.is_scalar(freq_ghz, elevation)):
+        return res
+    import numpy as np
+    in_range = (freq_ghz >= FREQ_GRID[0]) & (freq_ghz <= FREQ_GRID[1])
+    return np.where(in_range, res, np.nan)
+
+
+def _lookup1(name, freq_ghz):
+    """Linear interpolation on the frequency grid"""
+    return _lookup(name, freq_ghz, FREQ_GRID)
+
+
+def _clip_elevation(elevation):
+    """Elevation clipped to the grid range (0 to 90 degrees)"""
+    if (util.is_scalar(elevation)):
+        return min(max(elevation, 0.0), 90.0)
+    import numpy as np
+    return np.clip(elevation, 0.0, 90.0)
+
+
+def gas_loss(freq, elevation):
+    """Gaseous absorption in dB
+
+    Args:
+        freq      : Frequency in Hz.
+        elevation : Elevation angle in degrees.
+
+    """
+    return _lookup2('gas', freq / 1e9, _clip_elevation(elevation))
+
+
+def cloud_loss(freq, elevation, liquid):
+    """Cloud attenuation in dB
+
+    Args:
+        freq      : Frequency in Hz.
+        elevation : Elevation angle in degrees.
+        liquid    : Total columnar content of cloud liquid water in kg/m2
+                    (or, equivalently, mm).
+
+    """
+    return liquid * _lookup2('cloud', freq / 1e9, _clip_elevation(elevation))
+
+
+def rain_loss(freq, elevation, lat, rain_rate, height=None):
+    """Rain attenuation in dB
+
+    Args:
+        freq      : Frequency in Hz.
+        elevation : Elevation angle in degrees.
+        lat       : Latitude of the receiver in degrees.
+        rain_rate : Rain rate in mm/h.
+        height    : Rain height in km. Defaults to the latitude model of [3].
+
+    """
+    xp = util.array_namespace(freq, elevation, lat, rain_rate, height)
+    freq_ghz = freq / 1e9
+    el = xp.radians(_clip_elevation(elevation))
+    if (height is None):
+        height = rain_height(lat)
+    sin_el = xp.sin(el)
+
+    # Slant path length below the rain height, accounting for the Earth
+    # curvature (Equation 1 of [5], valid at low elevations as well)
+    slant = 2 * height / (xp.sqrt(sin_el**2 + 2 * height / R_EARTH) +
+                          sin_el)
+    horizontal = slant * xp.cos(el)
+
+    gamma = _lookup1('rain_k', freq_ghz) * \
+        rain_rate**_lookup1('rain_alpha', freq_ghz)  # dB/km
+
+    # Horizontal reduction factor (Equation 4 of [5])
+    reduction = 1 / (1 + 0.78 * xp.sqrt(horizontal * gamma / freq_ghz) -
+                     0.38 * (1 - xp.exp(-2 * horizontal)))
+    loss = gamma * slant * reduction
+    if (xp is math):
+        return loss if FREQ_GRID[0] <= freq_ghz <= FREQ_GRID[1] else math.nan
+    in_range = (freq_ghz >= FREQ_GRID[0]) & (freq_ghz <= FREQ_GRID[1])
+    return xp.where(in_range, loss, xp.nan)
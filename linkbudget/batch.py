@@ -0,0 +1,265 @@
+"""Streaming batch mode
+
+Evaluates a stream of link budget scenarios, read as JSON Lines or CSV, and
+writes one JSON-formatted result per line. The scenarios are processed one at
+a time, so the memory usage does not depend on the input size.
+
+Each scenario uses the same keys as the command-line options, either with
+dashes or underscores (e.g., "rx-dish-size" or "rx_dish_size").
+
+"""
+import csv
+import dataclasses
+import json
+import math
+import numbers
+from . import budget, noise
+
+
+_FIELDS = {f.name: f for f in dataclasses.fields(budget.LinkBudgetInput)}
+_BOOL_FIELDS = {name for name, f in _FIELDS.items() if f.type is bool}
+
+
+def _parse_bool(val):
+    """Parse a boolean value given in a CSV cell
+
+    Invalid values are returned unchanged, to be rejected by to_input.
+
+    """
+    if (val is None):
+        return False
+    norm = val.strip().lower()
+    if (norm in ('1', 'true', 'yes')):
+        return True
+    if (norm in ('', '0', 'false', 'no')):
+        return False
+    return val
+
+
+def read_jsonl(fd):
+    """Read scenarios from a JSON Lines file
+
+    Args:
+        fd : File object opened in text mode.
+
+    Returns:
+        Generator of (line number, scenario) tuples. Blank lines are skipped
+        and malformed lines are returned as the original string, which is
+        rejected later by to_input.
+
+    """
+    for i_line, line in enumerate(fd, start=1):
+        if (not line.strip()):
+            continue
+        try:
+            yield i_line, json.loads(line)
+        except ValueError:
+            yield i_line, line
+
+
+def read_csv(fd):
+    """Read scenarios from a CSV file with a header row
+
+    Empty cells are treated as undefined parameters. Cells that cannot be
+    parsed are kept as strings and rejected later by to_input.
+
+    Args:
+        fd : File object opened in text mode.
+
+    Returns:
+        Generator of (line number, scenario dictionary) tuples.
+
+    """
+    reader = csv.DictReader(fd)
+    for row in reader:
+        scenario = {}
+        for key, val in row.items():
+            name = _normalize_key(key)
+            if (name in _BOOL_FIELDS):
+                scenario[name] = _parse_bool(val)
+            elif (val is not None and val.strip() != ''):
+                try:
+                    scenario[name] = float(val)
+                except ValueError:
+                    scenario[name] = val
+        yield reader.line_num, scenario
+
+
+def _normalize_key(key):
+    """Convert an option name into the corresponding input parameter"""
+    return key.strip().lstrip('-').replace('-', '_')
+
+
+def to_input(scenario, defaults=None):
+    """Create and validate the link budget input defined by a scenario
+
+    Args:
+        scenario : Dictionary with the scenario parameters.
+        defaults : Optional dictionary with default parameters, which apply
+                   when not defined in the scenario. A scenario parameter
+                   also overrides the default value of its mutually exclusive
+                   alternatives (e.g., "rx_dish_gain" overrides a default
+                   "rx_dish_size").
+
+    Returns:
+        LinkBudgetInput object.
+
+    Raises:
+        ValueError: if the scenario has unknown or inconsistent parameters.
+
+    """
+    if (not isinstance(scenario, dict)):
+        raise ValueError("Invalid scenario (expected a JSON object)")
+
+    params = dict(defaults or {})
+    scenario = {_normalize_key(k): v for k, v in scenario.items()}
+    for name, val in scenario.items():
+        if (name not in _FIELDS):
+            raise ValueError("Unknown parameter \"{}\"".format(name))
+        if (name in _BOOL_FIELDS):
+            valid = isinstance(val, bool)
+        elif (name == 'noise_chain'):
+            # Given as a list or, in CSV files, as a JSON string
+            if (val is not None):
+                scenario[name] = noise.parse_chain(val)
+            valid = True
+        else:
+            valid = val is None or (isinstance(val, numbers.Number) and
+                                    not isinstance(val, bool))
+        if (not valid):
+            raise ValueError("Invalid value for parameter \"{}\"".format(
+                name))
+        for alternatives in budget.EXCLUSIVE_PARAMS:
+            if (name in alternatives):
+                for other in alternatives:
+                    params.pop(other, None)
+    params.update(scenario)
+
+    for alternatives in budget.REQUIRED_PARAMS:
+        if not any(params.get(x) is not None for x in alternatives):
+            raise ValueError("Missing parameter: {}".format(
+                " or ".join(alternatives)))
+
+    inp = budget.LinkBudgetInput(**params)
+    inp.validate()
+    return inp
+
+
+def _solve_defaults(defaults, param):
+    """Defaults with the free parameter of the inverse solver
+
+    The free parameter is set to a placeholder value, such that the
+    scenarios are not required to define it, and its mutually exclusive
+    alternatives are removed from the defaults.
+
+    """
+    from .solve import FREE_PARAMS
+    defaults = dict(defaults or {})
+    for alternatives in budget.EXCLUSIVE_PARAMS:
+        if (param in alternatives):
+            for other in alternatives:
+                defaults.pop(other, None)
+    defaults[param] = FREE_PARAMS.get(param)
+    return defaults
+
+
+def evaluate(scenarios, defaults=None, cache=None, solve_for=None,
+             modcod=None):
+    """Evaluate a stream of scenarios
+
+    Args:
+        scenarios : Iterable of (line number, scenario) tuples, as produced
+                    by read_jsonl or read_csv.
+        defaults  : Optional dictionary with default parameters.
+        cache     : Optional cache.LinkBudgetCache object.
+        solve_for : Optional dictionary with the keyword arguments of
+                    solve.solve (param and the target cnr_db or
+                    capacity_bps). If defined, the scenarios are solved for
+                    the free parameter instead of evaluated.
+        modcod    : Optional dictionary with the keyword arguments of
+                    modcod.select (table and rolloff). If defined, each
+                    result dictionary also reports the MODCOD selected for
+                    the scenario under key "modcod".
+
+    Returns:
+        Generator with one result dictionary (in the format returned by
+        main.analyze) per scenario. Invalid scenarios, or scenarios whose
+        computation fails (e.g., due to a negative frequency), produce a
+        dictionary with a single "error" key instead, so that the results
+        stay aligned with the scenarios. When solving, each result
+        dictionary maps the free parameter to its required value (None if
+        the target is not achievable).
+
+    """
+    if (solve_for is not None):
+        from .solve import solve
+        defaults = _solve_defaults(defaults, solve_for['param'])
+    if (modcod is not None):
+        from . import modcod as acm
+
+    for i_line, scenario in scenarios:
+        try:
+            inp = to_input(scenario, defaults)
+            if (solve_for is None):
+                res = budget.compute(inp, cache)
+            else:
+                value = solve(inp, **solve_for)
+        except (ValueError, ArithmeticError) as e:
+            yield {'error': "line {}: {}".format(i_line, e)}
+            continue
+        if (solve_for is None):
+            out = res.to_dict()
+            if (modcod is not None):
+                out['modcod'] = acm.to_dict(
+                    acm.select(res.cnr_db, inp.if_bw, **modcod))
+            yield out
+        else:
+            yield {solve_for['param']: None if math.isnan(value) else value}
+
+
+def run(fd_in, fd_out, fmt='jsonl', defaults=None, workers=1,
+        chunk_size=1000, cache_size=0, solve_for=None, modcod=None):
+    """Read scenarios from fd_in and write the JSON Lines results to fd_out
+
+    Args:
+        fd_in      : Input file object opened in text mode.
+        fd_out     : Output file object opened in text mode.
+        fmt        : Input format: "jsonl" or "csv".
+        defaults   : Optional dictionary with default parameters.
+        workers    : Number of worker processes. If other than 1, the
+                     scenarios are evaluated in parallel (see the parallel
+                     module), with None meaning one worker per CPU.
+        chunk_size : Number of scenarios processed by a worker at once when
+                     running in parallel.
+        cache_size : Size of the look angle and dish gain caches (see the
+                     cache module), or 0 to disable caching. When running in
+                     parallel, each worker process holds its own cache.
+        solve_for  : Optional arguments of the inverse solver (see
+                     evaluate).
+        modcod     : Optional arguments of the MODCOD selection (see
+                     evaluate).
+
+    Returns:
+        Number of scenarios processed.
+
+    """
+    reader = read_csv if fmt == 'csv' else read_jsonl
+    if (workers == 1):
+        if (cache_size > 0):
+            from .cache import LinkBudgetCache
+            cache = LinkBudgetCache(cache_size)
+        else:
+            cache = None
+        results = evaluate(reader(fd_in), defaults, cache, solve_for,
+                           modcod)
+    else:
+        from . import parallel
+        results = parallel.evaluate(reader(fd_in), defaults, workers,
+                                    chunk_size, cache_size, solve_for,
+                                    modcod)
+
+    count = 0
+    for res in results:
+        fd_out.write(json.dumps(res) + '\n')
+        count += 1
+    return count
@@ -0,0 +1,196 @@
+"""Best-server selection over multiple satellites
+
+Finds, for each ground station, the satellite providing the highest C/N
+among a set of geostationary satellites, each with its own longitude and,
+optionally, its own EIRP and frequency. The look angles of the full station
+x satellite matrix are computed in a single broadcast pass. The pairs below
+the minimum elevation are pruned right away, such that the rest of the link
+budget (path loss, atmospheric losses, etc.) is only computed for the
+visible pairs.
+
+The stations are processed in blocks of rows, which bounds the memory used
+by the intermediate matrices.
+
+"""
+import csv
+import dataclasses
+import numpy as np
+from . import atmosphere, budget, pointing
+
+
+# Fields of the best-server result of each station. The satellite indexes
+# are -1 and the C/N values are NaN when undefined (e.g., for stations with
+# no visible satellite, or a single one in the case of the runner-up).
+BEST_SERVER_DTYPE = np.dtype([
+    ('best', np.int32),
+    ('cnr_db', np.float64),
+    ('margin_db', np.float64),
+    ('runner_up', np.int32),
+    ('runner_up_cnr_db', np.float64),
+])
+
+
+def _per_satellite(val, n_sats, name):
+    """Per-satellite parameter as an array of shape (n_sats,), or None"""
+    if (val is None):
+        return None
+    val = np.asarray(val, dtype=float)
+    if (val.ndim == 0):
+        return np.full(n_sats, float(val))
+    if (val.shape != (n_sats,)):
+        raise ValueError("Parameter \"{}\" must have one value per "
+                         "satellite".format(name))
+    return val
+
+
+def _top_two(cnr_db):
+    """Indexes and values of the two highest C/N values of each row
+
+    Pruned pairs hold -inf, and are reported as index -1 and NaN C/N.
+
+    """
+    rows = np.arange(cnr_db.shape[0])
+    best = np.argmax(cnr_db, axis=1)
+    best_cnr = cnr_db[rows, best]
+    cnr_db[rows, best] = -np.inf
+    runner_up = np.argmax(cnr_db, axis=1)
+    runner_up_cnr = cnr_db[rows, runner_up]
+    cnr_db[rows, best] = best_cnr
+
+    res = []
+    for idx, val in ((best, best_cnr), (runner_up, runner_up_cnr)):
+        undefined = np.isneginf(val)
+        res.append((np.where(undefined, -1, idx),
+                    np.where(undefined, np.nan, val)))
+    return res
+
+
+def best_server(inp, sat_long, rx_long, rx_lat, eirp=None, freq=None,
+                min_elevation=0, required_cnr=0, block_pairs=2**18):
+    """Select the best satellite for each ground station
+
+    Args:
+        inp           : LinkBudgetInput object with the parameters shared by
+                        all pairs. Its satellite and receiver coordinates are
+                        ignored, as are its EIRP (or Tx power) and frequency
+                        when given per satellite.
+        sat_long      : Array with the longitude of each satellite in
+                        degrees.
+        rx_long       : Array with the longitude of each station in degrees.
+        rx_lat        : Array with the latitude of each station in degrees.
+        eirp          : Optional EIRP of each satellite in dBW, given as an
+                        array with one value per satellite or as a scalar.
+        freq          : Optional carrier frequency of each satellite in Hz,
+                        given as an array with one value per satellite or as
+                        a scalar.
+        min_elevation : Minimum elevation in degrees. Satellites below this
+                        elevation are not considered.
+        required_cnr  : Required C/N in dB, relative to which the margin of
+                        the best satellite is computed.
+        block_pairs   : Approximate number of station x satellite pairs
+                        computed at once.
+
+    Returns:
+        Structured array of dtype BEST_SERVER_DTYPE with one record per
+        station, holding the index of the best satellite (in sat_long), its
+        C/N, its margin relative to the required C/N, and the index and C/N
+        of the runner-up satellite.
+
+    Raises:
+        ValueError: if the parameters are inconsistent.
+
+    """
+    sat_long = np.atleast_1d(np.asarray(sat_long, dtype=float))
+    rx_long, rx_lat = np.broadcast_arrays(
+        np.atleast_1d(np.asarray(rx_long, dtype=float)),
+        np.atleast_1d(np.asarray(rx_lat, dtype=float)))
+    if (sat_long.ndim != 1 or rx_long.ndim != 1 or len(sat_long) == 0):
+        raise ValueError("The satellite and station coordinates must be 1-D "
+                         "arrays")
+    n_sats = len(sat_long)
+    eirp = _per_satellite(eirp, n_sats, 'eirp')
+    freq = _per_satellite(freq, n_sats, 'freq')
+
+    # Placeholders for the per-pair parameters, replaced on each block
+    changes = {'sat_long': 0.0, 'rx_long': 0.0, 'rx_lat': 0.0}
+    if (eirp is not None):
+        changes.update(eirp=0.0, tx_power=None)
+    if (freq is not None):
+        changes['freq'] = float(freq[0])
+    inp = dataclasses.replace(inp, **changes)
+    inp.validate()
+    if (freq is not None and budget._atmospheric(inp) and
+            not np.all((freq >= atmosphere.FREQ_GRID[0] * 1e9) &
+                       (freq <= atmosphere.FREQ_GRID[1] * 1e9))):
+        raise ValueError("Atmospheric losses are only modeled from "
+                         "{:g} to {:g} GHz".format(*atmosphere.FREQ_GRID))
+    sat_alt = inp.radar_alt if inp.radar else budget.GEO_ALT
+
+    res = np.empty(len(rx_long), dtype=BEST_SERVER_DTYPE)
+    block_rows = max(1, block_pairs // n_sats)
+    for i_start in range(0, len(rx_long), block_rows):
+        i_end = min(i_start + block_rows, len(rx_long))
+        block_long = rx_long[i_start:i_end, np.newaxis]
+        block_lat = rx_lat[i_start:i_end, np.newaxis]
+
+        # Look angles of the full block x satellite matrix
+        elevation, azimuth, slant_range = pointing.look_angles_batch(
+            sat_long[np.newaxis, :], block_long, block_lat, sat_alt=sat_alt)
+
+        # Link budget of the visible pairs only
+        i_rx, i_sat = np.nonzero(elevation >= min_elevation)
+        pair_inp = {
+            'sat_long': sat_long[i_sat],
+            'rx_long': block_long[i_rx, 0],
+            'rx_lat': block_lat[i_rx, 0]
+        }
+        if (eirp is not None):
+            pair_inp['eirp'] = eirp[i_sat]
+        if (freq is not None):
+            pair_inp['freq'] = freq[i_sat]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            pair_res = budget.compute(
+                dataclasses.replace(inp, **pair_inp),
+                geometry=(elevation[i_rx, i_sat], azimuth[i_rx, i_sat],
+                          slant_range[i_rx, i_sat]))
+
+        cnr_db = np.full(elevation.shape, -np.inf)
+        cnr_db[i_rx, i_sat] = np.nan_to_num(pair_res.cnr_db, nan=-np.inf)
+        (best, best_cnr), (runner_up, runner_up_cnr) = _top_two(cnr_db)
+
+        block = res[i_start:i_end]
+        block['best'] = best
+        block['cnr_db'] = best_cnr
+        block['margin_db'] = best_cnr - required_cnr
+        block['runner_up'] = runner_up
+        block['runner_up_cnr_db'] = runner_up_cnr
+
+    return res
+
+
+def read_table(filename):
+    """Read a CSV file with a header row into a dictionary of columns
+
+    The column names are normalized as in the batch mode (e.g., "sat-long"
+    becomes "sat_long").
+
+    Returns:
+        Dictionary mapping each column name to a 1-D array of floats.
+
+    Raises:
+        ValueError: if a cell is not numeric.
+
+    """
+    with open(filename, newline='') as fd:
+        reader = csv.DictReader(fd)
+        columns = {key: [] for key in reader.fieldnames or []}
+        for row in reader:
+            for key in columns:
+                try:
+                    columns[key].append(float(row[key]))
+                except (TypeError, ValueError):
+                    raise ValueError("{}:{}: invalid value in column "
+                                     "\"{}\"".format(filename,
+                                                     reader.line_num, key))
+    return {key.strip().lstrip('-').replace('-', '_'): np.array(val)
+            for key, val in columns.items()}
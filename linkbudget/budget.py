@@ -0,0 +1,654 @@
+"""Link budget computation
+
+Computational API of the link budget analysis. A LinkBudgetInput object
+defines the scenario and compute() returns the corresponding
+LinkBudgetResult. Nothing is logged or formatted along the way, so that the
+computation can run in tight loops. See the report module for the
+human-readable rendering of the results.
+
+"""
+from collections import namedtuple
+from dataclasses import dataclass, fields, replace
+import functools
+import json
+import math
+from typing import Optional
+from . import atmosphere, calc, noise, pointing, util
+
+
+GEO_ALT = 35786e3  # geosynchronous altitude in meters
+
+# Parameters that must be defined, given as tuples of mutually exclusive
+# alternatives
+REQUIRED_PARAMS = [
+    ('eirp', 'tx_power'),
+    ('freq',),
+    ('if_bw',),
+    ('rx_dish_size', 'rx_dish_gain'),
+    ('antenna_noise_temp',),
+    ('lnb_noise_fig', 'lnb_noise_temp', 'noise_chain'),
+    ('lnb_gain', 'noise_chain'),
+    ('coax_length', 'noise_chain'),
+    ('rx_noise_fig', 'noise_chain'),
+    ('sat_long',),
+    ('rx_long',),
+    ('rx_lat',),
+]
+
+# Mutually exclusive parameters
+EXCLUSIVE_PARAMS = [
+    ('eirp', 'tx_power'),
+    ('tx_dish_size', 'tx_dish_gain'),
+    ('rx_dish_size', 'rx_dish_gain'),
+    ('lnb_noise_fig', 'lnb_noise_temp'),
+    # A noise chain replaces the default LNB -> coax -> receiver chain
+    ('noise_chain', 'lnb_noise_fig'),
+    ('noise_chain', 'lnb_noise_temp'),
+    ('noise_chain', 'lnb_gain'),
+    ('noise_chain', 'coax_length'),
+    ('noise_chain', 'rx_noise_fig'),
+]
+
+
+@dataclass
+class LinkBudgetInput:
+    """Link budget parameters
+
+    The parameters are equivalent to the command-line options of the same name
+    (see main.get_parser). Numeric parameters can be NumPy arrays, in which
+    case the link budget is computed element-wise (with broadcasting).
+
+    The noise_chain parameter is a list of receiver devices (see the noise
+    module), which replaces the default LNB -> coax -> receiver chain defined
+    by parameters lnb_noise_fig (or lnb_noise_temp), lnb_gain, coax_length
+    and rx_noise_fig.
+
+    The atmospheric losses (see the atmosphere module) are included when
+    atmosphere is True or when rain_rate (in mm/h) or cloud_liquid (total
+    columnar cloud liquid water in kg/m2) are defined.
+
+    """
+    freq: float
+    if_bw: float
+    antenna_noise_temp: float
+    sat_long: float
+    rx_long: float
+    rx_lat: float
+    lnb_gain: Optional[float] = None
+    coax_length: Optional[float] = None
+    rx_noise_fig: Optional[float] = None
+    eirp: Optional[float] = None
+    tx_power: Optional[float] = None
+    tx_dish_size: Optional[float] = None
+    tx_dish_gain: Optional[float] = None
+    rx_dish_size: Optional[float] = None
+    rx_dish_gain: Optional[float] = None
+    lnb_noise_fig: Optional[float] = None
+    lnb_noise_temp: Optional[float] = None
+    noise_chain: Optional[list] = None
+    rain_rate: Optional[float] = None
+    cloud_liquid: Optional[float] = None
+    atmosphere: bool = False
+    radar: bool = False
+    radar_alt: Optional[float] = None
+    radar_cross_section: Optional[float] = None
+    radar_bistatic: bool = False
+
+    @classmethod
+    def from_args(cls, args):
+        """Create the input object from a populated argparse namespace"""
+        return cls(**{f.name: getattr(args, f.name) for f in fields(cls)})
+
+    def validate(self):
+        """Check the consistency of the parameters
+
+        Raises:
+            ValueError: if a parameter is missing, if mutually exclusive
+                parameters are both defined, or if the frequency or the IF
+                bandwidth is not positive.
+
+        """
+        # Plain loops (rather than generator expressions), given that the
+        # validation runs once per scenario in batch mode
+        for alternatives in REQUIRED_PARAMS:
+            for x in alternatives:
+                if getattr(self, x) is not None:
+                    break
+            else:
+                raise ValueError("Missing parameter: {}".format(
+                    " or ".join(alternatives)))
+
+        for alternatives in EXCLUSIVE_PARAMS:
+            n_defined = 0
+            for x in alternatives:
+                if getattr(self, x) is not None:
+                    n_defined += 1
+            if n_defined > 1:
+                raise ValueError("Parameters {} are mutually exclusive".format(
+                    " and ".join(alternatives)))
+
+        for x in ('freq', 'if_bw'):
+            val = getattr(self, x)
+            if (util.is_scalar(val)):
+                positive = val > 0
+            else:
+                import numpy as np
+                positive = np.all(np.asarray(val) > 0)
+            if not positive:
+                raise ValueError("Parameter {} must be positive".format(x))
+
+        if (self.tx_power is not None and self.tx_dish_size is None and
+                self.tx_dish_gain is None):
+            raise ValueError("Either tx_dish_size or tx_dish_gain must be "
+                             "defined along with tx_power")
+
+        if (_atmospheric(self) and util.is_scalar(self.freq) and
+                not (atmosphere.FREQ_GRID[0] <= self.freq / 1e9 <=
+                     atmosphere.FREQ_GRID[1])):
+            raise ValueError("Atmospheric losses are only modeled from "
+                             "{:g} to {:g} GHz".format(*atmosphere.FREQ_GRID))
+
+        if (self.radar):
+            if (self.radar_alt is None):
+                raise ValueError("radar_alt is required in radar mode")
+            if (self.radar_cross_section is None):
+                raise ValueError("radar_cross_section is required in radar "
+                                 "mode")
+
+
+# Numeric input parameters, which can hold arrays (e.g., swept or sampled
+# parameters, or inputs stacked by compute_many)
+NUMERIC_PARAMS = tuple(f.name for f in fields(LinkBudgetInput)
+                       if f.type in (float, Optional[float]))
+
+
+# Layout of the result dictionary returned by main.analyze, mapping each
+# dictionary key (with the keys of nested dictionaries joined by a dot) to the
+# corresponding LinkBudgetResult attribute
+RESULT_KEYS = (
+    ('pointing.elevation', 'elevation'),
+    ('pointing.azimuth', 'azimuth'),
+    ('pointing.slant_range', 'slant_range'),
+    ('eirp_db', 'eirp_db'),
+    ('path_loss_db', 'path_loss_db'),
+    ('atm_loss_db.gas', 'gas_loss_db'),
+    ('atm_loss_db.cloud', 'cloud_loss_db'),
+    ('atm_loss_db.rain', 'rain_loss_db'),
+    ('atm_loss_db.total', 'atm_loss_db'),
+    ('rx_dish_gain_db', 'rx_dish_gain_db'),
+    ('noise_fig_db.lnb', 'lnb_noise_fig_db'),
+    ('noise_fig_db.coax', 'coax_noise_fig_db'),
+    ('noise_fig_db.total', 'noise_fig_db'),
+    ('noise_temp_k.effective_input', 'input_noise_temp_k'),
+    ('noise_temp_k.system', 'sys_noise_temp_k'),
+    ('cnr_db', 'cnr_db'),
+    ('capacity_bps', 'capacity_bps'),
+)
+
+
+@dataclass
+class LinkBudgetResult:
+    """Link budget results
+
+    The class uses __slots__, so that each result takes a fixed and small
+    amount of memory. See to_records() for an even more compact
+    representation of many results.
+
+    Attributes:
+        elevation          : Elevation angle in degrees.
+        azimuth            : Azimuth angle in degrees.
+        slant_range        : Slant range in meters.
+        eirp_db            : EIRP in dBW.
+        tx_dish_gain_db    : Tx antenna gain in dB, when used to compute the
+                             EIRP (None otherwise).
+        path_loss_db       : Path loss in dB.
+        gas_loss_db        : Gaseous absorption in dB (None when the
+                             atmospheric losses are not included).
+        cloud_loss_db      : Cloud attenuation in dB (None when the
+                             atmospheric losses are not included).
+        rain_loss_db       : Rain attenuation in dB (None when the
+                             atmospheric losses are not included).
+        atm_loss_db        : Total atmospheric loss in dB (None when the
+                             atmospheric losses are not included).
+        rx_dish_gain_db    : Rx antenna gain in dB.
+        coax_loss_db       : Coaxial line loss in dB (None when using a
+                             noise chain).
+        lnb_noise_fig_db   : LNB noise figure in dB (None when using a noise
+                             chain).
+        coax_noise_fig_db  : Coaxial line noise figure in dB (None when
+                             using a noise chain).
+        noise_fig_db       : Overall noise figure of the receiver in dB.
+        input_noise_temp_k : Effective input-noise temperature in K.
+        sys_noise_temp_k   : Receiver system noise temperature in K.
+        cnr_db             : Carrier-to-noise ratio in dB.
+        capacity_bps       : Channel capacity in bps.
+
+    """
+    __slots__ = ('elevation', 'azimuth', 'slant_range', 'eirp_db',
+                 'tx_dish_gain_db', 'path_loss_db', 'gas_loss_db',
+                 'cloud_loss_db', 'rain_loss_db', 'atm_loss_db',
+                 'rx_dish_gain_db',
+                 'coax_loss_db', 'lnb_noise_fig_db', 'coax_noise_fig_db',
+                 'noise_fig_db', 'input_noise_temp_k', 'sys_noise_temp_k',
+                 'cnr_db', 'capacity_bps')
+    elevation: float
+    azimuth: float
+    slant_range: float
+    eirp_db: float
+    tx_dish_gain_db: Optional[float]
+    path_loss_db: float
+    gas_loss_db: Optional[float]
+    cloud_loss_db: Optional[float]
+    rain_loss_db: Optional[float]
+    atm_loss_db: Optional[float]
+    rx_dish_gain_db: float
+    coax_loss_db: Optional[float]
+    lnb_noise_fig_db: Optional[float]
+    coax_noise_fig_db: Optional[float]
+    noise_fig_db: float
+    input_noise_temp_k: float
+    sys_noise_temp_k: float
+    cnr_db: float
+    capacity_bps: float
+
+    @property
+    def rx_power_dbw(self):
+        """Received power level at the antenna terminals in dBW"""
+        return self.eirp_db - self.path_loss_db - _atm_loss(self.atm_loss_db) \
+            + self.rx_dish_gain_db
+
+    @property
+    def g_over_t_db(self):
+        """Ratio between the Rx antenna gain and the system noise temp."""
+        return self.rx_dish_gain_db - util.abs_to_db(self.sys_noise_temp_k)
+
+    def to_dict(self):
+        """Convert to the dictionary returned by main.analyze
+
+        The atmospheric losses are only included when computed.
+
+        """
+        res = {}
+        for key, attr in result_keys(self):
+            *parents, leaf = key.split('.')
+            d = res
+            for parent in parents:
+                d = d.setdefault(parent, {})
+            d[leaf] = getattr(self, attr)
+        return res
+
+    def to_records(self):
+        """Convert to a structured NumPy array with one record per result
+
+        Results holding arrays (computed from array inputs) are flattened
+        into one record per element, following the broadcast shape of all
+        attributes. Scalar results produce a single record.
+
+        """
+        import numpy as np
+        vals = [getattr(self, attr) for attr in self.__slots__]
+        vals = [np.nan if v is None else v for v in vals]
+        vals = np.broadcast_arrays(*vals)
+        records = np.empty(vals[0].size, dtype=result_dtype())
+        for attr, val in zip(self.__slots__, vals):
+            records[attr] = val.ravel()
+        return records
+
+    @classmethod
+    def from_record(cls, record):
+        """Create a result object from one record of a structured array"""
+        vals = {attr: float(record[attr]) for attr in cls.__slots__}
+        for attr in _OPTIONAL_ATTRS:
+            if (math.isnan(vals[attr])):
+                vals[attr] = None
+        return cls(**vals)
+
+
+# Atmospheric loss attributes, None when the losses are not included
+_ATMOSPHERIC_ATTRS = ('gas_loss_db', 'cloud_loss_db', 'rain_loss_db',
+                      'atm_loss_db')
+
+
+# Result attributes that can be None (stored as NaN in structured arrays)
+_OPTIONAL_ATTRS = ('tx_dish_gain_db', 'coax_loss_db', 'lnb_noise_fig_db',
+                   'coax_noise_fig_db') + _ATMOSPHERIC_ATTRS
+
+
+def result_keys(res):
+    """Subset of RESULT_KEYS applicable to a result
+
+    Args:
+        res : LinkBudgetResult object.
+
+    Returns:
+        Tuple of (key, attribute) pairs, excluding the atmospheric losses
+        when these are not included in the result.
+
+    """
+    if (res.atm_loss_db is None):
+        return tuple((key, attr) for key, attr in RESULT_KEYS
+                     if attr not in _ATMOSPHERIC_ATTRS)
+    return RESULT_KEYS
+
+
+def _atm_loss(atm_loss_db):
+    """Atmospheric loss in dB, treating the excluded losses as 0 dB"""
+    return 0 if atm_loss_db is None else atm_loss_db
+
+
+@functools.lru_cache(maxsize=None)
+def result_dtype():
+    """Record type used to store link budget results in structured arrays
+
+    Holds one 8-byte float per LinkBudgetResult attribute. Also available as
+    the RESULT_DTYPE module attribute, which is created on first access such
+    that NumPy is not imported by the scalar code path.
+
+    """
+    import numpy as np
+    return np.dtype([(attr, np.float64)
+                     for attr in LinkBudgetResult.__slots__])
+
+
+def __getattr__(name):
+    if (name == 'RESULT_DTYPE'):
+        return result_dtype()
+    raise AttributeError("module {!r} has no attribute {!r}".format(
+        __name__, name))
+
+
+def to_records(results):
+    """Pack a sequence of (scalar) results into a structured NumPy array
+
+    Args:
+        results : Sequence of LinkBudgetResult objects.
+
+    Returns:
+        Structured array of dtype RESULT_DTYPE with one record per result.
+
+    """
+    import numpy as np
+    records = np.empty(len(results), dtype=result_dtype())
+    for i, res in enumerate(results):
+        records[i] = tuple(np.nan if v is None else v for v in
+                           (getattr(res, attr) for attr in res.__slots__))
+    return records
+
+
+def records_to_dicts(records):
+    """Convert structured result records into main.analyze dictionaries
+
+    Args:
+        records : Structured array of dtype RESULT_DTYPE.
+
+    Returns:
+        Generator of result dictionaries, one per record.
+
+    """
+    for record in records:
+        yield LinkBudgetResult.from_record(record).to_dict()
+
+
+def _stage_pointing(inp, res, cache):
+    look_angles = pointing.look_angles if cache is None else cache.look_angles
+    sat_alt = GEO_ALT if not inp.radar else inp.radar_alt
+    res['elevation'], res['azimuth'], res['slant_range'] = look_angles(
+        inp.sat_long, inp.rx_long, inp.rx_lat, sat_alt)
+
+
+def _stage_eirp(inp, res, cache):
+    dish_gain = calc.dish_gain if cache is None else cache.dish_gain
+    tx_gain = None
+    if (inp.eirp is None):
+        if inp.tx_dish_gain is None:
+            tx_gain = dish_gain(inp.tx_dish_size, inp.freq)
+        else:
+            tx_gain = inp.tx_dish_gain
+        eirp = calc.eirp(inp.tx_power, tx_gain)
+    else:
+        eirp = inp.eirp
+    res['eirp_db'] = eirp
+    res['tx_dish_gain_db'] = tx_gain
+
+
+def _stage_path_loss(inp, res, cache):
+    # TODO support bistatic radar. Add distance from radar object to rx
+    # station.
+    res['path_loss_db'] = calc.path_loss(res['slant_range'], inp.freq,
+                                         inp.radar, inp.radar_cross_section,
+                                         inp.radar_bistatic)
+
+
+def _atmospheric(inp):
+    """Check whether the atmospheric losses are included"""
+    return (inp.atmosphere or inp.rain_rate is not None or
+            inp.cloud_liquid is not None)
+
+
+def _stage_atmosphere(inp, res, cache):
+    if (not _atmospheric(inp)):
+        res['gas_loss_db'] = res['cloud_loss_db'] = None
+        res['rain_loss_db'] = res['atm_loss_db'] = None
+        return
+
+    elevation = res['elevation']
+    gas = atmosphere.gas_loss(inp.freq, elevation)
+    cloud = 0.0 if inp.cloud_liquid is None else atmosphere.cloud_loss(
+        inp.freq, elevation, inp.cloud_liquid)
+    rain = 0.0 if inp.rain_rate is None else atmosphere.rain_loss(
+        inp.freq, elevation, inp.rx_lat, inp.rain_rate)
+    if (inp.radar):
+        # The signal crosses the atmosphere on the forward and return paths
+        gas, cloud, rain = 2 * gas, 2 * cloud, 2 * rain
+    res['gas_loss_db'] = gas
+    res['cloud_loss_db'] = cloud
+    res['rain_loss_db'] = rain
+    res['atm_loss_db'] = gas + cloud + rain
+
+
+def _stage_rx_gain(inp, res, cache):
+    if (inp.rx_dish_gain is None):
+        dish_gain = calc.dish_gain if cache is None else cache.dish_gain
+        res['rx_dish_gain_db'] = dish_gain(inp.rx_dish_size, inp.freq)
+    else:
+        res['rx_dish_gain_db'] = inp.rx_dish_gain
+
+
+def _stage_noise(inp, res, cache):
+    if (inp.noise_chain is not None):
+        noise_fig_db = noise.noise_figure(inp.noise_chain)
+        effective_input_noise_temp = calc.noise_fig_to_noise_temp(
+            noise_fig_db)
+        res['coax_loss_db'] = None
+        res['lnb_noise_fig_db'] = None
+        res['coax_noise_fig_db'] = None
+        res['noise_fig_db'] = noise_fig_db
+        res['input_noise_temp_k'] = effective_input_noise_temp
+        res['sys_noise_temp_k'] = calc.rx_sys_noise_temp(
+            inp.antenna_noise_temp, effective_input_noise_temp)
+        return
+
+    coax_loss_db, coax_noise_fig_db = calc.coax_loss_nf(inp.coax_length)
+
+    if (inp.lnb_noise_fig is None):
+        lnb_noise_fig = calc.noise_temp_to_noise_fig(inp.lnb_noise_temp)
+    else:
+        lnb_noise_fig = inp.lnb_noise_fig
+
+    noise_fig_db = calc.total_noise_figure(
+        [lnb_noise_fig, coax_noise_fig_db, inp.rx_noise_fig],
+        [inp.lnb_gain, -coax_loss_db]
+    )
+
+    effective_input_noise_temp = calc.noise_fig_to_noise_temp(noise_fig_db)
+
+    res['coax_loss_db'] = coax_loss_db
+    res['lnb_noise_fig_db'] = lnb_noise_fig
+    res['coax_noise_fig_db'] = coax_noise_fig_db
+    res['noise_fig_db'] = noise_fig_db
+    res['input_noise_temp_k'] = effective_input_noise_temp
+    res['sys_noise_temp_k'] = calc.rx_sys_noise_temp(
+        inp.antenna_noise_temp, effective_input_noise_temp)
+
+
+def _stage_cnr(inp, res, cache):
+    T_syst_db = util.abs_to_db(res['sys_noise_temp_k'])  # in dBK
+    res['cnr_db'] = calc.cnr(res['eirp_db'],
+                             res['path_loss_db'] +
+                             _atm_loss(res['atm_loss_db']),
+                             res['rx_dish_gain_db'], T_syst_db, inp.if_bw)
+
+
+def _stage_capacity(inp, res, cache):
+    res['capacity_bps'] = calc.capacity(res['cnr_db'], inp.if_bw)
+
+
+# Stages of the link budget computation, in topological order. Each stage
+# depends on a subset of the input parameters and on the outputs of the
+# upstream stages, and sets a subset of the LinkBudgetResult attributes on
+# the dictionary of results given as argument.
+Stage = namedtuple('Stage', ['name', 'params', 'deps', 'func'])
+STAGES = (
+    Stage('pointing', ('sat_long', 'rx_long', 'rx_lat', 'radar',
+                       'radar_alt'), (), _stage_pointing),
+    Stage('eirp', ('eirp', 'tx_power', 'tx_dish_size', 'tx_dish_gain',
+                   'freq'), (), _stage_eirp),
+    Stage('path_loss', ('freq', 'radar', 'radar_cross_section',
+                        'radar_bistatic'), ('pointing',), _stage_path_loss),
+    Stage('atmosphere', ('freq', 'rx_lat', 'rain_rate', 'cloud_liquid',
+                         'atmosphere', 'radar'), ('pointing',),
+          _stage_atmosphere),
+    Stage('rx_gain', ('rx_dish_size', 'rx_dish_gain', 'freq'), (),
+          _stage_rx_gain),
+    Stage('noise', ('coax_length', 'lnb_noise_fig', 'lnb_noise_temp',
+                    'lnb_gain', 'rx_noise_fig', 'noise_chain',
+                    'antenna_noise_temp'), (), _stage_noise),
+    Stage('cnr', ('if_bw',), ('eirp', 'path_loss', 'atmosphere', 'rx_gain',
+                              'noise'), _stage_cnr),
+    Stage('capacity', ('if_bw',), ('cnr',), _stage_capacity),
+)
+
+
+def compute(inp, cache=None, geometry=None):
+    """Compute the link budget
+
+    Runs all stages of the computation (see STAGES). For repeated
+    evaluations with few changed parameters, see session.LinkBudgetSession,
+    which only reruns the stages affected by the changes.
+
+    Args:
+        inp      : LinkBudgetInput object.
+        cache    : Optional cache.LinkBudgetCache object used to memoize the
+                   look angles and dish gains.
+        geometry : Optional tuple with the elevation (degrees), azimuth
+                   (degrees) and slant range (m), e.g., as computed by
+                   pointing.look_angles_ecef for a non-geostationary orbit.
+                   When defined, it replaces the look angles computed from
+                   the satellite and receiver coordinates on inp.
+
+    Returns:
+        LinkBudgetResult object.
+
+    """
+    res = {}
+    if (geometry is not None):
+        res['elevation'], res['azimuth'], res['slant_range'] = geometry
+    for stage in STAGES:
+        if (stage.name != 'pointing' or geometry is None):
+            stage.func(inp, res, cache)
+    return LinkBudgetResult(**res)
+
+
+# Minimum number of inputs evaluated in a vectorized pass by compute_many.
+# Below this size, the NumPy overhead outweighs the vectorization gains.
+MIN_STACK_SIZE = 16
+
+
+def _group_key(inp):
+    """Key of the inputs that can be evaluated in one vectorized pass
+
+    Inputs share a key when they define the same set of parameters (e.g., the
+    EIRP rather than the Tx power) and the same non-numeric parameters, such
+    that they run the same code path.
+
+    """
+    return (tuple(getattr(inp, name) is None for name in NUMERIC_PARAMS),
+            inp.atmosphere, inp.radar, inp.radar_bistatic,
+            None if inp.noise_chain is None else
+            json.dumps(inp.noise_chain, sort_keys=True))
+
+
+def _compute_one(inp, cache):
+    """Compute the link budget, returning the exception on failure"""
+    try:
+        return compute(inp, cache)
+    except (ValueError, ArithmeticError) as e:
+        return e
+
+
+def compute_many(inputs, cache=None):
+    """Compute the link budget of many scalar inputs
+
+    The inputs that run the same code path (see _group_key) are stacked into
+    a single LinkBudgetInput holding arrays and evaluated in one vectorized
+    pass, which is much faster than evaluating them one by one. Groups
+    smaller than MIN_STACK_SIZE, and inputs whose vectorized evaluation is
+    not finite (e.g., due to a negative frequency), are evaluated
+    individually by compute(), such that the results and errors do not
+    depend on the batching.
+
+    Args:
+        inputs : Sequence of validated LinkBudgetInput objects with scalar
+                 parameters.
+        cache  : Optional cache.LinkBudgetCache object used by the inputs
+                 evaluated individually.
+
+    Returns:
+        List with one LinkBudgetResult object per input, in the same order,
+        or the exception (ValueError or ArithmeticError) raised by compute()
+        for the inputs whose computation fails.
+
+    """
+    if (len(inputs) < MIN_STACK_SIZE):
+        # Too few inputs for any group to be stacked
+        return [_compute_one(inp, cache) for inp in inputs]
+
+    groups = {}
+    for i, inp in enumerate(inputs):
+        groups.setdefault(_group_key(inp), []).append(i)
+
+    results = [None] * len(inputs)
+    for indexes in groups.values():
+        if (len(indexes) < MIN_STACK_SIZE):
+            for i in indexes:
+                results[i] = _compute_one(inputs[i], cache)
+            continue
+        import numpy as np
+        group = [inputs[i] for i in indexes]
+        stacked = {}
+        for name in NUMERIC_PARAMS:
+            vals = [getattr(inp, name) for inp in group]
+            if (vals[0] is not None and vals.count(vals[0]) != len(vals)):
+                stacked[name] = np.array(vals, dtype=float)
+        if (not stacked):
+            # Identical inputs, computed once, but each with its own result
+            # object (or exception)
+            res = _compute_one(group[0], cache)
+            for i in indexes:
+                results[i] = _compute_one(inputs[i], cache) \
+                    if isinstance(res, Exception) else replace(res)
+            continue
+        with np.errstate(all='ignore'):
+            res = compute(replace(group[0], **stacked))
+        # Unpack the result arrays column-wise, which is much faster than
+        # converting the elements one by one. The results that do not depend
+        # on the stacked parameters are scalars, hence the broadcasting.
+        columns = [
+            [None] * len(indexes) if val is None else
+            np.broadcast_to(val, len(indexes)).tolist()
+            for val in (getattr(res, attr) for attr in res.__slots__)]
+        finite = np.broadcast_to(np.isfinite(res.cnr_db), len(indexes))
+        for i, row, ok in zip(indexes, zip(*columns), finite):
+            results[i] = LinkBudgetResult(*row) if ok else \
+                _compute_one(inputs[i], cache)
+    return results
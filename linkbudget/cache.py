@@ -0,0 +1,113 @@
+"""Memoization of the pointing and antenna gain computations
+
+Opt-in cache layer for budget.compute. The same station/satellite positions
+and the same dish sizes and frequencies tend to recur over many evaluations,
+in which case the look angles and the dish gains can be reused instead of
+recomputed.
+
+The cache keys are quantized to a configurable resolution, so that inputs
+differing by less than the resolution share the same cache entry. The cached
+values are computed from the quantized inputs, such that the results do not
+depend on the order of the calls.
+
+"""
+import functools
+from . import calc, pointing, util
+
+
+class QuantizedLRUCache:
+    """Least-recently used (LRU) cache with quantized keys
+
+    Wraps a function of scalar arguments. Calls with array arguments or with
+    non-finite (infinite or NaN) arguments bypass the cache.
+
+    Args:
+        func       : Function to be cached.
+        maxsize    : Maximum number of cached entries. The least-recently
+                     used entry is evicted when the cache is full.
+        resolution : Tuple with the quantization step of each positional
+                     argument of func.
+
+    """
+    def __init__(self, func, maxsize, resolution):
+        self._func = func
+        self._resolution = tuple(resolution)
+        self._cached = functools.lru_cache(maxsize=maxsize)(self._call)
+
+    def _call(self, *key):
+        return self._func(*(k * r for k, r in zip(key, self._resolution)))
+
+    def __call__(self, *args):
+        if (len(args) != len(self._resolution) or not util.is_scalar(*args)):
+            return self._func(*args)
+        try:
+            key = tuple(round(x / r) for x, r in zip(args, self._resolution))
+        except (OverflowError, ValueError):
+            # Infinite or NaN arguments, which cannot be quantized
+            return self._func(*args)
+        return self._cached(*key)
+
+    def stats(self):
+        """Cache statistics
+
+        Returns:
+            Dictionary with the number of hits, misses, current size and
+            maximum size of the cache.
+
+        """
+        info = self._cached.cache_info()
+        return {
+            'hits': info.hits,
+            'misses': info.misses,
+            'size': info.currsize,
+            'maxsize': info.maxsize
+        }
+
+    def clear(self):
+        """Clear the cache entries and statistics"""
+        self._cached.cache_clear()
+
+
+def _late_bound(module, name):
+    """Function calling module.name, looked up on each call
+
+    Such that replacing the module attribute (e.g., by the profiler
+    instrumentation) also applies to the caches created beforehand.
+
+    """
+    def func(*args):
+        return getattr(module, name)(*args)
+    return func
+
+
+class LinkBudgetCache:
+    """Cache of look angles and dish gains used by budget.compute
+
+    Args:
+        maxsize     : Maximum number of entries on each cache.
+        angle_res   : Quantization step of longitudes and latitudes in
+                      degrees.
+        length_res  : Quantization step of the dish diameter and the
+                      satellite altitude in meters.
+        freq_res    : Quantization step of the frequency in Hz.
+
+    """
+    def __init__(self, maxsize=4096, angle_res=1e-6, length_res=1e-3,
+                 freq_res=1.0):
+        self.look_angles = QuantizedLRUCache(
+            _late_bound(pointing, 'look_angles'), maxsize,
+            (angle_res, angle_res, angle_res, length_res))
+        self.dish_gain = QuantizedLRUCache(
+            _late_bound(calc, 'dish_gain'), maxsize, (length_res, freq_res))
+
+    def stats(self):
+        """Hit/miss statistics of the look angle and dish gain caches"""
+        return {
+            'look_angles': self.look_angles.stats(),
+            'dish_gain': self.dish_gain.stats()
+        }
+
+    def clear(self):
+        """Clear all cache entries and statistics"""
+        self.look_angles.clear()
+        self.dish_gain.clear()
@@ -7,9 +7,14 @@ References:
  [2] Lindgren, M. (2015). A 1296 MHz Earth–Moon–Earth Communication System
      (Master's thesis).
 
+All functions accept either scalar or NumPy array arguments. Array arguments
+are processed element-wise, following the NumPy broadcasting rules, in which
+case the results are arrays too. Scalar arguments produce scalar results.
+
+The functions do not log their results. See the report module instead.
+
 """
-import logging
-from math import log10, pi, log2
+from math import pi
 from . import util
 
 
@@ -65,24 +70,25 @@ def path_loss(d, freq, radar=False, rcs=None, bistatic=False, d_rx=None):
         Path loss in dB.
 
     """
+    xp = util.array_namespace(d, freq, rcs, d_rx)
     wavelength = SPEED_OF_LIGHT / freq
 
     # Eq. 8-11 from [1], or Eq. 3.16 from [2]:
-    Lfs_one_way_db = 20*log10(4*pi*d/wavelength)
+    Lfs_one_way_db = 20*xp.log10(4*pi*d/wavelength)
 
     if (radar):
         if (rcs is None):
             raise ValueError("Radar cross section required in radar mode")
 
         # Radar object gain in dB, equation 3.23 in [2]:
-        G_obj_db = 10*log10(4*pi*rcs/(wavelength**2))
+        G_obj_db = 10*xp.log10(4*pi*rcs/(wavelength**2))
 
         if (bistatic):
             if (d_rx is None):
                 raise ValueError("Rx distance required in bistatic radar mode")
 
             Lfs_tx_db = Lfs_one_way_db
-            Lfs_rx_db = 20*log10(4*pi*d_rx/wavelength)
+            Lfs_rx_db = 20*xp.log10(4*pi*d_rx/wavelength)
             # Bistatic radar transmission loss in dB, equation 3.24 in [2]:
             Lfs_db = Lfs_tx_db + Lfs_rx_db - G_obj_db
         else:
@@ -91,7 +97,6 @@ def path_loss(d, freq, radar=False, rcs=None, bistatic=False, d_rx=None):
     else:
         Lfs_db = Lfs_one_way_db
 
-    logging.info("Path loss:          {:6.2f} dB".format(Lfs_db))
     return Lfs_db
 
 
@@ -116,13 +121,14 @@ def dish_gain(diameter, freq):
         Gain in dB
 
     """
+    xp = util.array_namespace(diameter, freq)
     radius = diameter / 2
     face_area = pi * (radius**2)  # assume circle
     wavelength = SPEED_OF_LIGHT / freq
 
     # See Table 8-4 in [1], which assumes a 56% aperture efficiency:
     gain = 7*face_area/(wavelength**2)
-    return 10*log10(gain)
+    return 10*xp.log10(gain)
 
 
 def coax_loss_nf(length_ft, Tl=T0):
@@ -146,10 +152,7 @@ def coax_loss_nf(length_ft, Tl=T0):
     # attenuator) at room temperature will have this property (noise figure =
     # attenuation in dB), see Equation 4.22 in [2].
     noise_factor = 1 + (Tl/T0)*(loss - 1)
-    noise_fig = 10*log10(noise_factor)
-
-    logging.info("Coax loss:          {:6.2f} dB".format(loss_db))
-    logging.info("Coax noise figure:  {:6.2f} dB".format(noise_fig))
+    noise_fig = util.abs_to_db(noise_factor)
 
     return loss_db, noise_fig
 
@@ -165,6 +168,8 @@ def total_noise_figure(nfs, gains):
 
     Note: The list of gains should not include the gain of the last device in
     the chain, as it is irrelevant for the overall noise figure computation.
+    Each list element can be an array, in which case the overall noise figure
+    is computed element-wise.
 
     Returns:
         The overall noise figure in dB
@@ -172,7 +177,6 @@ def total_noise_figure(nfs, gains):
     """
 
     assert(len(nfs) > 0)
-    assert(len(gains) > 0)
     assert(len(gains) == len(nfs) - 1)
 
     if (len(nfs) == 1):
@@ -183,14 +187,51 @@ def total_noise_figure(nfs, gains):
     G_prod = 1
     for i, nf in enumerate(nfs[1:]):
         nf_abs = util.db_to_abs(nf)
-        G_prod *= util.db_to_abs(gains[i])
-        F += (nf_abs - 1) / G_prod
+        G_prod = G_prod * util.db_to_abs(gains[i])
+        F = F + (nf_abs - 1) / G_prod
 
-    F_db = 10*log10(F)
-    logging.info("Rx noise figure:    {:6.2f} dB".format(F_db))
+    F_db = util.abs_to_db(F)
     return F_db
 
 
+def cascade_noise_figure(nfs, gains):
+    """Calculate the overall noise figure of many receiver chains at once
+
+    Batched version of total_noise_figure, which evaluates the Friis formula
+    with a cumulative product of the stage gains along the last axis, rather
+    than with a loop over the stages.
+
+    Args:
+        nfs   : Array with shape (..., N) holding the noise figures (in dB) of
+                the N cascaded devices of each chain.
+        gains : Array with the gains (in dB) of the cascaded devices, with
+                shape (..., N - 1) or (..., N). The gain of the last device is
+                irrelevant and ignored if given.
+
+    Note: Chains with fewer than N devices can be padded with devices of 0 dB
+    noise figure and 0 dB gain, which do not change the overall noise figure.
+
+    Returns:
+        Array with shape (...) holding the overall noise figure in dB of each
+        chain.
+
+    """
+    import numpy as np
+    F = util.db_to_abs(np.asarray(nfs, dtype=float))
+    n_stages = F.shape[-1]
+    if (n_stages == 0):
+        raise ValueError("Noise chains must have at least one device")
+    G = util.db_to_abs(np.asarray(gains, dtype=float))
+    if (G.shape[-1] not in (n_stages - 1, n_stages)):
+        raise ValueError("Inconsistent number of gains and noise figures")
+
+    # Equation 8-34 from [1], with the gain preceding each device given by
+    # the cumulative product of the previous gains
+    G_prod = np.cumprod(G[..., :n_stages - 1], axis=-1)
+    F_total = F[..., 0] + np.sum((F[..., 1:] - 1) / G_prod, axis=-1)
+    return util.abs_to_db(F_total)
+
+
 def noise_fig_to_noise_temp(nf):
     """Convert noise figure to the effective input-noise temperature
 
@@ -226,7 +267,7 @@ def noise_temp_to_noise_fig(Te):
     # Noise factor
     nf_abs = 1 + Te/T0
     # Return the noise figure
-    return 10*log10(nf_abs)
+    return util.abs_to_db(nf_abs)
 
 
 def rx_sys_noise_temp(Tar, Te):
@@ -273,7 +314,6 @@ def rx_sys_noise_temp(Tar, Te):
 
     # Equation 8-41 from [1], or 4.39 from [2]:
     Tsyst = Tar + Te
-    logging.info("System noise temp:  {:6.2f} K".format(Tsyst))
     return Tsyst
 
 
@@ -298,22 +338,15 @@ def cnr(eirp_db, path_loss_db, rx_ant_gain_db, T_sys_db, bw):
     # denominator, we can simply subtract k_db, Tsyst_db, and B_db. See
     # Equation 8-43 in [1].
     k_db = -228.6  # Boltzmann’s constant (of 1.38e-23) in dB
-    bw_db = 10*log10(bw)
-
-    # The received power level at the antenna terminals is of interest, so
-    # print it it out:
-    P_rx_dbw = eirp_db - path_loss_db + rx_ant_gain_db
-    P_rx_dbm = P_rx_dbw + 30
-    logging.info("Rx Power:           {:6.2f} dBm".format(P_rx_dbm))
+    bw_db = util.abs_to_db(bw)
 
     # The ratio between the Rx antenna gain and the receiver noise temperature,
-    # usually known as G/T, is also a metric of interest. Print it:
+    # usually known as G/T. See LinkBudgetResult.g_over_t_db and
+    # LinkBudgetResult.rx_power_dbw for the reported metrics.
     g_over_t_db = rx_ant_gain_db - T_sys_db
-    logging.info("(G/T):              {:6.2f} dB/K".format(g_over_t_db))
 
     # C/N, as computed in Equation 8-43 from [1]:
     cnr_db = eirp_db - path_loss_db + g_over_t_db - k_db - bw_db
-    logging.info("(C/N):              {:6.2f} dB".format(cnr_db))
 
     return cnr_db
 
@@ -329,7 +362,7 @@ def capacity(snr_db, bw):
         Capacity in bits per second (bps).
 
     """
+    xp = util.array_namespace(snr_db, bw)
     snr = util.db_to_abs(snr_db)
-    c = bw * log2(1 + snr)
-    logging.info("Capacity:           {}".format(util.format_rate(c)))
+    c = bw * xp.log2(1 + snr)
     return c
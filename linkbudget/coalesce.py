@@ -0,0 +1,280 @@
+"""Coalescing of concurrent link budget evaluations
+
+When many threads or coroutines compute link budgets at the same time, each
+call runs the scalar code path on its own. The coalescers defined here
+collect the concurrent calls over a short window and evaluate them together
+through budget.compute_many, which stacks the inputs into vectorized passes
+through the calc and pointing functions. Each caller still receives its own
+result, so the callers do not need to be restructured.
+
+The coalescing only pays off with many concurrent callers, whose batches are
+large enough to be stacked (see budget.MIN_STACK_SIZE). Otherwise, the
+inputs are still evaluated one by one, and the coalescing only adds the cost
+of handing the calls over between threads. For instance, with the thread
+coalescer, 64 threads reach about 1.1x the throughput of direct
+budget.compute calls, whereas 1 to 4 threads reach about 0.7x (see
+benchmarks/coalesce.py).
+
+Two variants are available:
+
+- Coalescer, for callers running on multiple threads. The batches are
+  evaluated by the calling threads.
+- AsyncCoalescer, for coroutines running on an asyncio event loop. The
+  batches are evaluated on the event loop thread.
+
+Example:
+
+    coalescer = Coalescer(max_batch=256, max_wait=100e-6)
+    # From any number of threads
+    res = coalescer.analyze(inp)
+
+"""
+import asyncio
+import os
+import threading
+import time
+from . import budget
+
+
+class _BaseCoalescer:
+    """Batching parameters, statistics and evaluation of a batch
+
+    Args:
+        max_batch : Maximum number of inputs evaluated in a batch. A batch is
+                    evaluated as soon as it reaches this size.
+        max_wait  : Maximum time in seconds that an input waits for other
+                    inputs before its batch is evaluated.
+        cache     : Optional cache.LinkBudgetCache object used by the inputs
+                    evaluated individually (see budget.compute_many).
+
+    """
+    def __init__(self, max_batch, max_wait, cache):
+        if (max_batch < 1):
+            raise ValueError("max_batch must be positive")
+        if (max_wait < 0):
+            raise ValueError("max_wait must be non-negative")
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.cache = cache
+        self.batches = 0
+        self.inputs = 0
+        self.max_size = 0
+
+    def stats(self):
+        """Number of batches and inputs, and the largest batch size"""
+        return {
+            'batches': self.batches,
+            'inputs': self.inputs,
+            'max_size': self.max_size
+        }
+
+    def _compute(self, inputs):
+        """Evaluate a batch of inputs
+
+        Returns:
+            List with the LinkBudgetResult object or the exception of each
+            input.
+
+        """
+        self.batches += 1
+        self.inputs += len(inputs)
+        self.max_size = max(self.max_size, len(inputs))
+        try:
+            return budget.compute_many(inputs, self.cache)
+        except Exception:
+            pass
+        # Retry the inputs one at a time, such that a failure is only
+        # reported to the caller whose input caused it
+        results = []
+        for inp in inputs:
+            try:
+                results.append(budget.compute_many([inp], self.cache)[0])
+            except Exception as e:
+                results.append(e)
+        return results
+
+
+# Lets the other threads run (releasing the GIL), much faster than
+# time.sleep(0) where available
+_yield = getattr(os, 'sched_yield', lambda: time.sleep(0))
+
+
+class _Call:
+    """Input submitted to a Coalescer and its result
+
+    The lock is held until the result is available or until the caller is
+    promoted to evaluate the next batch.
+
+    """
+    __slots__ = ('inp', 'result', 'lead', 'lock')
+
+    def __init__(self, inp):
+        self.inp = inp
+        self.result = None
+        self.lead = False
+        self.lock = threading.Lock()
+        self.lock.acquire()
+
+
+class Coalescer(_BaseCoalescer):
+    """Thread-safe coalescer of link budget evaluations
+
+    The batches are evaluated by the calling threads themselves, with no
+    background thread: the first caller leads the evaluation of a batch,
+    while the callers arriving in the meantime queue up for the next batch,
+    which is led by the first of them. The other callers block on a lock
+    until their batch is evaluated.
+
+    Before evaluating a batch, the leader yields to the other threads, such
+    that they can submit their inputs (the evaluation holds the GIL), for as
+    long as the number of pending inputs keeps growing. Hence, an isolated
+    call only yields once before being evaluated, while the batches grow
+    with the number of concurrent callers.
+
+    Args:
+        max_batch : Maximum number of inputs evaluated in a batch.
+        max_wait  : Maximum time in seconds that the leader of a batch keeps
+                    yielding to the other threads before evaluating it,
+                    which bounds the latency added to each call. When zero,
+                    a batch only collects the inputs submitted while the
+                    previous batch was evaluated.
+        cache     : Optional cache.LinkBudgetCache object.
+
+    """
+    def __init__(self, max_batch=256, max_wait=100e-6, cache=None):
+        super().__init__(max_batch, max_wait, cache)
+        self._lock = threading.Lock()
+        self._pending = []
+        self._leading = False
+
+    def analyze(self, inp):
+        """Compute the link budget of a LinkBudgetInput object
+
+        Blocks until the batch holding the input is evaluated.
+
+        Returns:
+            LinkBudgetResult object.
+
+        Raises:
+            ValueError, ArithmeticError: if the computation fails.
+
+        """
+        call = _Call(inp)
+        with self._lock:
+            self._pending.append(call)
+            follower = self._leading
+            self._leading = True
+
+        if (follower):
+            call.lock.acquire()
+        if (not follower or call.lead):
+            self._lead()
+
+        if (isinstance(call.result, Exception)):
+            raise call.result
+        return call.result
+
+    def _lead(self):
+        """Evaluate the next batch and hand over the lead"""
+        # Yield to the other threads for as long as they keep submitting
+        # inputs, such that the window closes as soon as the number of
+        # pending inputs stops growing
+        n_pending = 0
+        deadline = time.monotonic() + self.max_wait
+        while (self.max_wait > 0):
+            with self._lock:
+                size = len(self._pending)
+            if (size <= n_pending or size >= self.max_batch or
+                    time.monotonic() >= deadline):
+                break
+            n_pending = size
+            _yield()
+
+        with self._lock:
+            batch = self._pending[:self.max_batch]
+            del self._pending[:self.max_batch]
+
+        # The leader's own input is the first of the batch
+        results = self._compute([call.inp for call in batch])
+        for call, res in zip(batch, results):
+            call.result = res
+            call.lock.release()
+
+        with self._lock:
+            if (self._pending):
+                nxt = self._pending[0]
+                nxt.lead = True
+                nxt.lock.release()
+            else:
+                self._leading = False
+
+
+class AsyncCoalescer(_BaseCoalescer):
+    """Coalescer of link budget evaluations for asyncio coroutines
+
+    Must be used from the event loop thread. The batches are evaluated on
+    the event loop thread, given that the evaluation of a batch is short.
+
+    Args:
+        max_batch : Maximum number of inputs evaluated in a batch.
+        max_wait  : Maximum time in seconds that an input waits for other
+                    inputs before its batch is evaluated. When zero, the
+                    batch is evaluated on the next iteration of the event
+                    loop, such that it only collects the inputs submitted
+                    concurrently, with no added latency.
+        cache     : Optional cache.LinkBudgetCache object.
+
+    """
+    def __init__(self, max_batch=256, max_wait=0.0, cache=None):
+        super().__init__(max_batch, max_wait, cache)
+        self._pending = []
+        self._handle = None
+
+    def submit(self, inp):
+        """Submit a LinkBudgetInput object for evaluation
+
+        Returns:
+            asyncio.Future resolving to the LinkBudgetResult object, or
+            raising the exception raised by the computation.
+
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((inp, future))
+        if (len(self._pending) >= self.max_batch):
+            self.flush()
+        elif (self._handle is None):
+            if (self.max_wait > 0):
+                self._handle = loop.call_later(self.max_wait, self.flush)
+            else:
+                self._handle = loop.call_soon(self.flush)
+        return future
+
+    async def analyze(self, inp):
+        """Compute the link budget of a LinkBudgetInput object
+
+        Returns:
+            LinkBudgetResult object.
+
+        Raises:
+            ValueError, ArithmeticError: if the computation fails.
+
+        """
+        return await self.submit(inp)
+
+    def flush(self):
+        """Evaluate the pending inputs"""
+        if (self._handle is not None):
+            self._handle.cancel()
+            self._handle = None
+        pending, self._pending = self._pending, []
+        if (not pending):
+            return
+        results = self._compute([inp for inp, _ in pending])
+        for (_, future), res in zip(pending, results):
+            if (future.cancelled()):
+                continue
+            if (isinstance(res, Exception)):
+                future.set_exception(res)
+            else:
+                future.set_result(res)
@@ -0,0 +1,113 @@
+"""Coverage maps
+
+Evaluates the link budget of a satellite over a regular latitude/longitude
+grid of receiver stations. The grid is processed in blocks of rows, each
+computed in a single vectorized pass, and the results are written into a
+compact structured array (optionally memory-mapped to a .npy file), so that
+maps with millions of cells can be generated without holding all
+intermediate results in memory.
+
+"""
+import dataclasses
+import numpy as np
+from . import budget
+
+
+# Fields of each coverage map cell. Single precision is enough for mapping
+# purposes and halves the storage relative to double precision.
+COVERAGE_DTYPE = np.dtype([
+    ('elevation', np.float32),
+    ('azimuth', np.float32),
+    ('slant_range', np.float32),
+    ('path_loss_db', np.float32),
+    ('cnr_db', np.float32),
+    ('capacity_bps', np.float32),
+])
+
+# Fields that are masked (set to NaN) on cells below the minimum elevation
+_MASKED_FIELDS = ('slant_range', 'path_loss_db', 'cnr_db', 'capacity_bps')
+
+
+def grid_axes(bbox, resolution):
+    """Latitudes and longitudes of the coverage map grid
+
+    Args:
+        bbox       : Bounding box given as a (lat_min, lat_max, long_min,
+                     long_max) tuple in degrees.
+        resolution : Grid spacing in degrees.
+
+    Returns:
+        Tuple with the 1-D arrays of latitudes (one per row, from north to
+        south) and longitudes (one per column, from west to east). Both
+        include the bounding box edges.
+
+    """
+    lat_min, lat_max, long_min, long_max = bbox
+    if (resolution <= 0):
+        raise ValueError("Resolution must be positive")
+    if (lat_min > lat_max or long_min > long_max):
+        raise ValueError("Invalid bounding box {}".format(bbox))
+
+    n_lat = int(round((lat_max - lat_min) / resolution)) + 1
+    n_long = int(round((long_max - long_min) / resolution)) + 1
+    lats = lat_max - resolution * np.arange(n_lat)
+    longs = long_min + resolution * np.arange(n_long)
+    return lats, longs
+
+
+def coverage(inp, bbox, resolution, min_elevation=0, filename=None,
+             block_cells=2**18):
+    """Compute the coverage map of a satellite
+
+    Args:
+        inp           : LinkBudgetInput object. The receiver coordinates
+                        (rx_long and rx_lat) are ignored and replaced by the
+                        grid coordinates.
+        bbox          : Bounding box given as a (lat_min, lat_max, long_min,
+                        long_max) tuple in degrees.
+        resolution    : Grid spacing in degrees.
+        min_elevation : Minimum elevation in degrees. The link budget fields
+                        of cells below this elevation are set to NaN.
+        filename      : Optional .npy file where the map is saved. The file
+                        is written through a memory map as each block of rows
+                        is computed.
+        block_cells   : Approximate number of cells computed at once, which
+                        bounds the memory used by intermediate results.
+
+    Returns:
+        Structured array (or memory map) of dtype COVERAGE_DTYPE with one row
+        per latitude and one column per longitude, as returned by grid_axes.
+
+    """
+    lats, longs = grid_axes(bbox, resolution)
+    shape = (len(lats), len(longs))
+    if (filename is None):
+        grid = np.empty(shape, dtype=COVERAGE_DTYPE)
+    else:
+        grid = np.lib.format.open_memmap(filename, mode='w+',
+                                         dtype=COVERAGE_DTYPE, shape=shape)
+
+    block_rows = max(1, block_cells // len(longs))
+    for i_start in range(0, len(lats), block_rows):
+        i_end = min(i_start + block_rows, len(lats))
+        # Broadcasting a column of latitudes against a row of longitudes
+        # yields the block of cells, while the location-independent terms of
+        # the link budget remain scalars
+        block_inp = dataclasses.replace(
+            inp, rx_lat=lats[i_start:i_end, np.newaxis],
+            rx_long=longs[np.newaxis, :])
+        with np.errstate(invalid='ignore'):
+            res = budget.compute(block_inp)
+
+        block = grid[i_start:i_end]
+        for name in COVERAGE_DTYPE.names:
+            block[name] = getattr(res, name)
+
+        below = block['elevation'] < min_elevation
+        for name in _MASKED_FIELDS:
+            block[name][below] = np.nan
+
+    if (filename is not None):
+        grid.flush()
+
+    return grid
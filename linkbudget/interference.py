@@ -0,0 +1,211 @@
+"""Adjacent-satellite and co-channel interference
+
+Computes the carrier-to-interference ratio (C/I) and the carrier-to-noise-
+plus-interference ratio (C/(N+I)) of a link subject to interference from
+other satellites operating on the same frequency (e.g., adjacent satellites
+on the geostationary arc).
+
+The interference received from each interfering satellite is computed as a
+link budget of its own, using the interferer's EIRP towards the station,
+the path (and atmospheric) loss over its slant range, and the receive
+antenna gain in the interferer's direction. The latter is given by an
+off-axis gain mask evaluated at the angle between the wanted satellite
+(antenna boresight) and the interferer, as seen from the station (see
+pointing.off_axis_angle). The interference from all satellites is then
+aggregated in linear power.
+
+Supported off-axis gain masks:
+
+- 's465': Sidelobe envelope of Recommendation ITU-R S.465-6 (reference
+  earth station pattern), i.e., 32 - 25 log(phi) dBi up to 48 degrees and
+  -10 dBi beyond.
+- 's580': Design objective of Recommendation ITU-R S.580-6, i.e.,
+  29 - 25 log(phi) dBi up to 20 degrees, followed by -3.5 dBi up to 26.3
+  degrees and by the S.465 envelope beyond.
+
+Within the main lobe, both masks follow the main-lobe model of the Radio
+Regulations Appendix 8, i.e., a parabolic roll-off from the maximum gain
+down to the first sidelobe level, such that the gain is continuous. The
+computation is vectorized across stations (array inputs) and interferers
+(last axis of the per-interferer results).
+
+"""
+from collections import namedtuple
+import dataclasses
+import math
+import numpy as np
+from . import budget, calc, pointing, util
+
+
+MASKS = ('s465', 's580')
+
+# Results of the interference computation. Each per-interferer array has the
+# shape of the link budget results with an extra last axis for the
+# interferers.
+InterferenceResult = namedtuple('InterferenceResult', [
+    'link',                # LinkBudgetResult of the wanted link
+    'off_axis',            # off-axis angle of each interferer in degrees
+    'interference_dbw',    # interference received from each interferer
+    'total_interference_dbw',  # aggregate interference power in dBW
+    'cir_db',              # carrier-to-interference ratio (C/I) in dB
+    'cnir_db',             # carrier-to-noise-plus-interference in dB
+    'capacity_bps',        # capacity given the C/(N+I)
+])
+
+
+def diameter_to_wavelength(max_gain_db):
+    """Dish diameter-to-wavelength ratio (D/lambda) implied by its gain
+
+    Inverts calc.dish_gain, i.e., assumes the same aperture efficiency.
+
+    """
+    return np.sqrt(10**(np.asarray(max_gain_db) / 10) / (7 * math.pi / 4))
+
+
+def off_axis_gain(max_gain_db, off_axis, mask='s465'):
+    """Receive antenna gain in an off-axis direction
+
+    Args:
+        max_gain_db : Maximum (boresight) antenna gain in dBi.
+        off_axis    : Off-axis angle(s) in degrees.
+        mask        : Off-axis gain mask ('s465' or 's580').
+
+    Returns:
+        Gain(s) in dBi.
+
+    """
+    if (mask not in MASKS):
+        raise ValueError("Unknown off-axis gain mask \"{}\"".format(mask))
+    g_max = np.asarray(max_gain_db, dtype=float)
+    phi = np.abs(np.asarray(off_axis, dtype=float))
+    d_lambda = diameter_to_wavelength(g_max)
+
+    # Main lobe and first sidelobe (Radio Regulations Appendix 8)
+    g1 = np.where(d_lambda >= 100, 2 + 15 * np.log10(d_lambda),
+                  -18 + 25 * np.log10(d_lambda))
+    phi_m = 20 / d_lambda * np.sqrt(np.maximum(g_max - g1, 0))
+    main_lobe = g_max - 2.5e-3 * (d_lambda * phi)**2
+
+    # Sidelobe envelope
+    with np.errstate(divide='ignore'):
+        log_phi = np.log10(phi)
+    if (mask == 's465'):
+        envelope = np.where(phi < 48, 32 - 25 * log_phi, -10)
+    else:
+        envelope = np.select(
+            [phi <= 20, phi <= 26.3, phi < 48],
+            [29 - 25 * log_phi, -3.5, 32 - 25 * log_phi], -10)
+
+    return np.where(phi < phi_m, main_lobe, np.minimum(g1, envelope))
+
+
+def _expand(val):
+    """Append an axis for the interferers to an array parameter"""
+    return val if util.is_scalar(val) else np.expand_dims(val, -1)
+
+
+def compute(inp, int_sat_long, int_eirp, isolation_db=0, mask='s465'):
+    """Compute the C/I and C/(N+I) of a link under interference
+
+    Args:
+        inp          : LinkBudgetInput object of the wanted link. Its
+                       parameters can be arrays (e.g., receiver coordinates
+                       of many stations), as in budget.compute.
+        int_sat_long : Array with the longitude of each interfering
+                       (geostationary) satellite in degrees.
+        int_eirp     : EIRP of each interfering satellite towards the
+                       station in dBW, within the bandwidth of the wanted
+                       carrier. Given as an array with one value per
+                       interferer or as a scalar.
+        isolation_db : Additional isolation of each interferer in dB (e.g.,
+                       polarization discrimination), given as an array with
+                       one value per interferer or as a scalar.
+        mask         : Off-axis gain mask of the receive antenna (see
+                       MASKS).
+
+    Returns:
+        InterferenceResult tuple. Interferers below the horizon do not
+        contribute to the aggregate interference.
+
+    Raises:
+        ValueError: if the parameters are inconsistent.
+
+    """
+    if (inp.radar):
+        raise ValueError("Interference is not supported in radar mode")
+    if (mask not in MASKS):
+        raise ValueError("Unknown off-axis gain mask \"{}\"".format(mask))
+    int_sat_long = np.atleast_1d(np.asarray(int_sat_long, dtype=float))
+    if (int_sat_long.ndim != 1 or len(int_sat_long) == 0):
+        raise ValueError("The interferer longitudes must be a non-empty 1-D "
+                         "array")
+    int_eirp, isolation_db = np.broadcast_arrays(
+        np.asarray(int_eirp, dtype=float),
+        np.asarray(isolation_db, dtype=float), int_sat_long)[:2]
+
+    link = budget.compute(inp)
+
+    # Look angles of the interferers from each station, with the
+    # interferers on the last axis
+    rx_long = _expand(inp.rx_long)
+    rx_lat = _expand(inp.rx_lat)
+    elevation, azimuth, slant_range = pointing.look_angles_batch(
+        int_sat_long, rx_long, rx_lat)
+    off_axis = pointing.off_axis_angle(
+        _expand(np.asarray(link.elevation)), _expand(np.asarray(link.azimuth)),
+        elevation, azimuth)
+    rx_gain = off_axis_gain(_expand(np.asarray(link.rx_dish_gain_db)),
+                            off_axis, mask)
+
+    # Link budget of each interferer, with its off-axis gain
+    changes = {f.name: _expand(getattr(inp, f.name))
+               for f in dataclasses.fields(inp)
+               if isinstance(getattr(inp, f.name), np.ndarray)}
+    changes.update(eirp=int_eirp, tx_power=None, tx_dish_size=None,
+                   tx_dish_gain=None, rx_dish_size=None, rx_dish_gain=rx_gain)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        int_link = budget.compute(dataclasses.replace(inp, **changes),
+                                  geometry=(elevation, azimuth, slant_range))
+        interference_dbw = np.where(
+            elevation > 0, int_link.rx_power_dbw - isolation_db, -np.inf)
+        total_dbw = 10 * np.log10(
+            np.sum(10**(interference_dbw / 10), axis=-1))
+    cir_db = link.rx_power_dbw - total_dbw
+    cnir_db = -10 * np.log10(10**(-np.asarray(link.cnr_db) / 10) +
+                             10**(-cir_db / 10))
+    return InterferenceResult(
+        link=link,
+        off_axis=off_axis,
+        interference_dbw=interference_dbw,
+        total_interference_dbw=total_dbw,
+        cir_db=cir_db,
+        cnir_db=cnir_db,
+        capacity_bps=calc.capacity(cnir_db, inp.if_bw))
+
+
+def to_dict(res):
+    """Summary of the interference results of a single station
+
+    Args:
+        res : InterferenceResult tuple computed for scalar inputs.
+
+    Returns:
+        JSON-serializable dictionary with the off-axis angle and the
+        interference received from each interferer, and the aggregate
+        results. The interference from satellites below the horizon and the
+        C/I without interference are reported as None.
+
+    """
+    def _finite(val):
+        # Infinite values (no interference) are reported as None
+        val = float(val)
+        return None if math.isinf(val) else val
+
+    return {
+        'off_axis': np.asarray(res.off_axis).tolist(),
+        'interference_dbw': [_finite(x) for x in res.interference_dbw],
+        'total_interference_dbw': _finite(res.total_interference_dbw),
+        'cir_db': _finite(res.cir_db),
+        'cnir_db': float(res.cnir_db),
+        'capacity_bps': float(res.capacity_bps)
+    }
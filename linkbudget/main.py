@@ -1,25 +1,66 @@
 """Link budget analysis"""
+import dataclasses
 import json
 import logging
+import math
 import argparse
-from . import calc, pointing, util
+import sys
+import time
+from . import budget, noise, report, solve
 
 
 __version__ = "0.1.1"
 
 
+def _noise_chain(spec):
+    """Parse the argument of option --noise-chain"""
+    if (spec.startswith('@')):
+        try:
+            with open(spec[1:]) as fd:
+                spec = fd.read()
+        except OSError as e:
+            raise argparse.ArgumentTypeError(str(e))
+    try:
+        return noise.parse_chain(spec)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def _float_list(spec):
+    """Parse a comma-separated list of numbers"""
+    try:
+        return [float(x) for x in spec.split(',')]
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            "invalid list of numbers: '{}'".format(spec))
+
+
 def get_parser():
     """Command-line arguments"""
     parser = argparse.ArgumentParser(
         description="Link Budget Calculator",
+        epilog="Run \"link-budget serve --help\" for the options of the "
+        "HTTP/JSON service mode.",
         formatter_class=argparse.ArgumentDefaultsHelpFormatter
     )
+    parser.add_argument(
+        '--profile',
+        nargs='?',
+        const='-',
+        metavar='FILE',
+        help='Profile the computation and report the call counts and wall '
+        'times of each stage of the link budget and of the underlying '
+        'functions, aggregated over the whole run (e.g., over all scenarios '
+        'of a batch). The breakdown is logged to stderr or, if FILE is '
+        'given, saved in JSON format on FILE. With --workers > 1, the '
+        'worker processes are not profiled.'
+    )
     parser.add_argument(
         '--json',
         action='store_true',
         help='Return results in a JSON-formatted string.'
     )
-    tx_pwr_group = parser.add_mutually_exclusive_group(required=True)
+    tx_pwr_group = parser.add_mutually_exclusive_group()
     tx_pwr_group.add_argument(
         '--eirp',
         type=float,
@@ -46,7 +87,6 @@ def get_parser():
     )
     parser.add_argument(
         '--freq',
-        required=True,
         type=float,
         help='Downlink carrier frequency in Hz for satellite signals or '
         'simply the signal frequency in Hz for radar (passively reflected) '
@@ -54,11 +94,10 @@ def get_parser():
     )
     parser.add_argument(
         '--if-bw',
-        required=True,
         type=float,
         help='IF bandwidth in Hz.'
     )
-    rx_dish_group = parser.add_mutually_exclusive_group(required=True)
+    rx_dish_group = parser.add_mutually_exclusive_group()
     rx_dish_group.add_argument(
         '--rx-dish-size',
         type=float,
@@ -71,11 +110,10 @@ def get_parser():
     )
     parser.add_argument(
         '--antenna-noise-temp',
-        required=True,
         type=float,
         help='Receive antenna\'s noise temperature in K.'
     )
-    lnb_noise_group = parser.add_mutually_exclusive_group(required=True)
+    lnb_noise_group = parser.add_mutually_exclusive_group()
     lnb_noise_group.add_argument(
         '--lnb-noise-fig',
         type=float,
@@ -88,26 +126,34 @@ def get_parser():
     )
     parser.add_argument(
         '--lnb-gain',
-        required=True,
         type=float,
         help='LNB\'s gain.'
     )
     parser.add_argument(
         '--coax-length',
-        required=True,
         type=float,
         help='Length of the coaxial transmission line between the LNB and the '
         'receiver in ft.'
     )
     parser.add_argument(
         '--rx-noise-fig',
-        required=True,
         type=float,
         help='Receiver\'s noise figure in dB.'
     )
+    parser.add_argument(
+        '--noise-chain',
+        type=_noise_chain,
+        metavar='SPEC',
+        help='Receiver noise chain given as a JSON list of devices in signal '
+        'order, or as @FILE to read the list from a JSON file. Each device '
+        'is defined by its noise figure ("nf", in dB) or noise temperature '
+        '("noise_temp", in K) and gain ("gain", in dB), by its loss ("loss", '
+        'in dB) for passive devices, or by its length ("coax_length", in ft) '
+        'for coaxial lines. Replaces options --lnb-noise-fig, '
+        '--lnb-noise-temp, --lnb-gain, --coax-length and --rx-noise-fig.'
+    )
     parser.add_argument(
         '--sat-long',
-        required=True,
         type=float,
         help='Satellite\'s longitude. Negative to the West and positive to '
         'the East'
@@ -120,18 +166,36 @@ def get_parser():
     )
     parser.add_argument(
         '--rx-long',
-        required=True,
         type=float,
         help='Receive station\'s longitude. Negative to the West and positive '
         'to the East'
     )
     parser.add_argument(
         '--rx-lat',
-        required=True,
         type=float,
         help='Receive station\'s latitude. Positive to the North and negative '
         'to the South'
     )
+    atm_p = parser.add_argument_group('atmospheric options')
+    atm_p.add_argument(
+        '--atmosphere',
+        default=False,
+        action='store_true',
+        help='Include the atmospheric losses (gaseous absorption and, if '
+        'defined, the rain and cloud attenuation). Implied by options '
+        '--rain-rate and --cloud-liquid. Supported from 1 to 50 GHz.'
+    )
+    atm_p.add_argument(
+        '--rain-rate',
+        type=float,
+        help='Rain rate in mm/h for the rain attenuation.'
+    )
+    atm_p.add_argument(
+        '--cloud-liquid',
+        type=float,
+        help='Total columnar content of cloud liquid water in kg/m2 for the '
+        'cloud attenuation.'
+    )
     radar_p = parser.add_argument_group('radar options')
     radar_p.add_argument(
         '--radar',
@@ -157,21 +221,432 @@ def get_parser():
         help='Bistatic radar scenario, i.e., radar transmitter and receiver '
         'are not collocated'
     )
+    sweep_p = parser.add_argument_group('sweep options')
+    sweep_p.add_argument(
+        '--sweep',
+        action='append',
+        metavar='PARAM=VALUES',
+        help='Sweep a numeric parameter over a list of comma-separated '
+        'values (e.g., rx-dish-size=0.45,0.6,0.9) or over a range given as '
+        'start:stop:num (e.g., freq=11.7e9:12.2e9:6). Can be repeated, in '
+        'which case the analysis covers the Cartesian product of all swept '
+        'parameters. A swept parameter replaces the corresponding regular '
+        'option. The results are printed in columnar form, as CSV or as '
+        'JSON (with option --json).'
+    )
+    sweep_p.add_argument(
+        '--sweep-output',
+        metavar='DIR',
+        help='Write the sweep results into a columnar store created on '
+        'directory DIR, with one binary file per result field, instead of '
+        'printing them. The results are computed and written in chunks, so '
+        'that the memory usage does not depend on the sweep size.'
+    )
+    sweep_p.add_argument(
+        '--sweep-chunk-size',
+        type=int,
+        default=2**16,
+        help='Number of grid points computed at once when using option '
+        '--sweep-output.'
+    )
+    batch_p = parser.add_argument_group('batch options')
+    batch_p.add_argument(
+        '--batch',
+        nargs='?',
+        const='-',
+        metavar='FILE',
+        help='Batch mode: read scenarios from FILE (or from stdin, if FILE is '
+        'omitted or set to "-") and print one JSON-formatted result per '
+        'line. Each scenario uses the same keys as the command-line options '
+        '(e.g., "rx-dish-size"). Options given in the command line serve as '
+        'defaults for the parameters not defined in the scenarios.'
+    )
+    batch_p.add_argument(
+        '--batch-format',
+        choices=['jsonl', 'csv'],
+        help='Format of the batch input: JSON Lines (one JSON object per '
+        'line) or CSV with a header row. Inferred from the file extension '
+        'by default, falling back to JSON Lines.'
+    )
+    batch_p.add_argument(
+        '--workers',
+        type=int,
+        default=1,
+        help='Number of worker processes used to evaluate the batch or the '
+        'Monte Carlo draws in parallel. Set to 0 to use one worker per CPU.'
+    )
+    batch_p.add_argument(
+        '--chunk-size',
+        type=int,
+        default=1000,
+        help='Number of scenarios sent to a worker process at once.'
+    )
+    batch_p.add_argument(
+        '--cache-size',
+        type=int,
+        default=0,
+        help='Number of look angle and dish gain results memoized across '
+        'scenarios (per worker process). Set to 0 to disable caching.'
+    )
+    coverage_p = parser.add_argument_group('coverage map options')
+    coverage_p.add_argument(
+        '--coverage',
+        metavar='FILE',
+        help='Compute the coverage map over the grid of Rx stations defined '
+        'by options --bbox and --resolution and save it in FILE (.npy '
+        'format). Options --rx-long and --rx-lat are not used.'
+    )
+    coverage_p.add_argument(
+        '--bbox',
+        type=float,
+        nargs=4,
+        metavar=('LAT_MIN', 'LAT_MAX', 'LONG_MIN', 'LONG_MAX'),
+        help='Bounding box of the coverage map in degrees.'
+    )
+    coverage_p.add_argument(
+        '--resolution',
+        type=float,
+        default=0.1,
+        help='Grid spacing of the coverage map in degrees.'
+    )
+    coverage_p.add_argument(
+        '--min-elevation',
+        type=float,
+        default=0,
+        help='Minimum elevation in degrees. The link budget results of the '
+        'coverage map cells below this elevation are set to NaN. With '
+        '--best-server, the satellites below this elevation are not '
+        'considered.'
+    )
+    best_p = parser.add_argument_group('best-server options')
+    best_p.add_argument(
+        '--best-server',
+        metavar='STATIONS',
+        help='Select the satellite with the highest C/N for each ground '
+        'station listed on the CSV file STATIONS (with columns "rx-long" and '
+        '"rx-lat"), among the satellites listed on the file given by option '
+        '--satellites, and print one JSON-formatted result per station. '
+        'Options --sat-long, --rx-long and --rx-lat are not used.'
+    )
+    best_p.add_argument(
+        '--satellites',
+        metavar='FILE',
+        help='CSV file with the satellites considered by --best-server, '
+        'with a "sat-long" column and, optionally, per-satellite "eirp" and '
+        '"freq" columns, which replace options --eirp and --freq.'
+    )
+    best_p.add_argument(
+        '--required-cnr',
+        type=float,
+        default=0,
+        help='Required C/N in dB, relative to which --best-server computes '
+        'the margin of the best satellite.'
+    )
+    interf_p = parser.add_argument_group('interference options')
+    interf_p.add_argument(
+        '--interferers',
+        metavar='FILE',
+        help='Compute the C/I and C/(N+I) of the link under the interference '
+        'of the satellites listed on the CSV file FILE, with columns '
+        '"sat-long" and "eirp" (EIRP towards the station in dBW, within the '
+        'carrier bandwidth) and, optionally, "isolation" (additional '
+        'isolation in dB, e.g., due to polarization discrimination).'
+    )
+    interf_p.add_argument(
+        '--antenna-mask',
+        choices=['s465', 's580'],
+        default='s465',
+        help='Off-axis gain mask of the Rx antenna used to compute the '
+        'interference, following ITU-R S.465 or S.580.'
+    )
+    acm_p = parser.add_argument_group('ACM options')
+    acm_p.add_argument(
+        '--modcod-table',
+        metavar='TABLE',
+        help='Report the most efficient MODCOD supported by the link and its '
+        'net bitrate, based on a built-in MODCOD table ("dvb-s2" or '
+        '"dvb-s2x") or on a CSV file with columns "modcod", "esno-db" '
+        '(Es/N0 threshold in dB) and "efficiency" (bits/symbol). Supported '
+        'in the regular and batch modes. With --interferers, the MODCOD is '
+        'selected based on the C/(N+I).'
+    )
+    acm_p.add_argument(
+        '--rolloff',
+        type=float,
+        default=0.2,
+        help='Roll-off factor of the carrier, which is assumed to occupy the '
+        'IF bandwidth (--if-bw), used to compute its symbol rate and Es/N0.'
+    )
+    mc_p = parser.add_argument_group('Monte Carlo options')
+    mc_p.add_argument(
+        '--monte-carlo',
+        type=int,
+        metavar='DRAWS',
+        help='Monte Carlo mode: evaluate the link budget over DRAWS random '
+        'draws of the parameters given by option --sample and report the '
+        'statistics of the C/N and capacity.'
+    )
+    mc_p.add_argument(
+        '--sample',
+        action='append',
+        metavar='PARAM=DIST:ARGS',
+        help='Sample a numeric parameter from a distribution in Monte Carlo '
+        'mode, e.g., antenna-noise-temp=normal:20,5. Supported '
+        'distributions: const:VALUE, normal:MEAN,STD, uniform:LOW,HIGH, '
+        'triangular:LOW,MODE,HIGH, lognormal:MEAN,SIGMA, exponential:SCALE '
+        'and rayleigh:SCALE. Besides the numeric parameters, the pointing '
+        'error loss (pointing-loss) and any extra attenuation (extra-loss) '
+        'can be sampled in dB. Can be repeated. A sampled parameter '
+        'replaces the corresponding regular option.'
+    )
+    mc_p.add_argument(
+        '--seed',
+        type=int,
+        help='Seed of the random number generator used in Monte Carlo mode. '
+        'Random by default, in which case the seed is reported along with '
+        'the results.'
+    )
+    mc_p.add_argument(
+        '--percentiles',
+        type=_float_list,
+        default=[1, 5, 50, 95, 99],
+        help='Comma-separated list of C/N and capacity percentiles reported '
+        'in Monte Carlo mode.'
+    )
+    mc_p.add_argument(
+        '--outage-cnr',
+        type=float,
+        metavar='DB',
+        help='C/N threshold below which the link is in outage, used to '
+        'compute the outage probability in Monte Carlo mode.'
+    )
+    mc_p.add_argument(
+        '--outage-capacity',
+        type=float,
+        metavar='BPS',
+        help='Capacity threshold below which the link is in outage, used to '
+        'compute the outage probability in Monte Carlo mode.'
+    )
+    mc_p.add_argument(
+        '--mc-chunk-size',
+        type=int,
+        default=2**16,
+        help='Number of draws evaluated at once in Monte Carlo mode.'
+    )
+    solve_p = parser.add_argument_group('inverse solver options')
+    solve_p.add_argument(
+        '--solve',
+        type=lambda x: x.strip().lstrip('-').replace('-', '_'),
+        choices=list(solve.FREE_PARAMS),
+        metavar='PARAM',
+        help='Solve for the value of parameter PARAM that achieves the '
+        'target C/N (--target-cnr) or capacity (--target-capacity), instead '
+        'of evaluating the link budget. Supported parameters: {}. The '
+        'option of the solved parameter, if given, is ignored. Can be '
+        'combined with the batch mode.'.format(
+            ", ".join(solve.FREE_PARAMS))
+    )
+    solve_p.add_argument(
+        '--target-cnr',
+        type=float,
+        help='Target C/N in dB for the inverse solver.'
+    )
+    solve_p.add_argument(
+        '--target-capacity',
+        type=float,
+        help='Target channel capacity in bps for the inverse solver.'
+    )
     return parser
 
 
+def _opt(dest):
+    """Command-line option corresponding to an argparse destination"""
+    return '--' + dest.replace('_', '-')
+
+
 def validate(parser, args):
     """Validate command-line arguments"""
-    if (args.tx_power and args.tx_dish_size is None and
-            args.tx_dish_gain is None):
+    # The required and mutually exclusive parameters are checked here instead
+    # of by argparse, given that swept parameters replace the regular options
+    if (args.solve is not None):
+        if ((args.target_cnr is None) == (args.target_capacity is None)):
+            parser.error("either --target-cnr or --target-capacity is "
+                         "required with --solve")
+        if (args.sweep or args.coverage is not None):
+            parser.error("argument --solve is not supported with --sweep "
+                         "or --coverage")
+    elif (args.target_cnr is not None or args.target_capacity is not None):
+        parser.error("arguments --target-cnr and --target-capacity require "
+                     "--solve")
+
+    if (args.monte_carlo is not None):
+        if (args.batch is not None or args.sweep or
+                args.coverage is not None or args.solve is not None):
+            parser.error("argument --monte-carlo is not supported with "
+                         "--batch, --sweep, --coverage or --solve")
+        if (args.monte_carlo < 1 or args.mc_chunk_size < 1):
+            parser.error("arguments --monte-carlo and --mc-chunk-size must "
+                         "be positive")
+        if (args.workers < 0):
+            parser.error("argument --workers must be non-negative")
+        if (not all(0 <= q <= 100 for q in args.percentiles)):
+            parser.error("argument --percentiles must be between 0 and 100")
+    elif (args.sample):
+        parser.error("argument --sample requires --monte-carlo")
+
+    if (args.modcod_table is not None):
+        if (args.sweep or args.coverage is not None or
+                args.solve is not None or args.monte_carlo is not None or
+                args.best_server is not None):
+            parser.error("argument --modcod-table is not supported with "
+                         "--sweep, --coverage, --solve, --monte-carlo or "
+                         "--best-server")
+        if (args.radar):
+            parser.error("argument --modcod-table is not supported in radar "
+                         "mode")
+        if (args.rolloff < 0):
+            parser.error("argument --rolloff must be non-negative")
+        from . import modcod
+        try:
+            modcod.get_table(args.modcod_table)
+        except (OSError, ValueError) as e:
+            parser.error(str(e))
+
+    if (args.batch is not None):
+        # Each scenario is validated individually in batch mode
+        if (args.sweep):
+            parser.error("argument --sweep is not supported in batch mode")
+        if (args.coverage is not None):
+            parser.error("argument --coverage is not supported in batch "
+                         "mode")
+        if (args.best_server is not None):
+            parser.error("argument --best-server is not supported in batch "
+                         "mode")
+        if (args.interferers is not None):
+            parser.error("argument --interferers is not supported in batch "
+                         "mode")
+        if (args.workers < 0):
+            parser.error("argument --workers must be non-negative")
+        if (args.chunk_size < 1):
+            parser.error("argument --chunk-size must be positive")
+        return
+
+    defined = {k for k, v in vars(args).items() if v is not None}
+    if (args.solve is not None):
+        # The solved parameter replaces its option and its alternatives
+        for alternatives in budget.EXCLUSIVE_PARAMS:
+            if (args.solve in alternatives):
+                defined.difference_update(alternatives)
+        defined.add(args.solve)
+    if (args.coverage is not None):
+        if (args.sweep):
+            parser.error("argument --sweep is not supported in coverage "
+                         "mode")
+        if (args.bbox is None):
+            parser.error("argument --bbox is required in coverage mode "
+                         "(--coverage)")
+        if (args.resolution <= 0):
+            parser.error("argument --resolution must be positive")
+        # The Rx coordinates are given by the coverage map grid
+        defined.update(('rx_long', 'rx_lat'))
+
+    if (args.best_server is not None):
+        if (args.sweep or args.coverage is not None or
+                args.solve is not None or args.monte_carlo is not None):
+            parser.error("argument --best-server is not supported with "
+                         "--sweep, --coverage, --solve or --monte-carlo")
+        if (args.satellites is None):
+            parser.error("argument --satellites is required with "
+                         "--best-server")
+        from . import bestserver
+        try:
+            sats = bestserver.read_table(args.satellites)
+            stations = bestserver.read_table(args.best_server)
+        except (OSError, ValueError) as e:
+            parser.error(str(e))
+        if ('sat_long' not in sats):
+            parser.error("the satellites file must have a \"sat-long\" "
+                         "column")
+        if (not {'rx_long', 'rx_lat'}.issubset(stations)):
+            parser.error("the stations file must have \"rx-long\" and "
+                         "\"rx-lat\" columns")
+        defined.update(('sat_long', 'rx_long', 'rx_lat'))
+        defined.update(x for x in ('eirp', 'freq') if x in sats)
+    elif (args.satellites is not None):
+        parser.error("argument --satellites requires --best-server")
+
+    if (args.interferers is not None):
+        if (args.sweep or args.coverage is not None or
+                args.solve is not None or args.monte_carlo is not None or
+                args.best_server is not None):
+            parser.error("argument --interferers is not supported with "
+                         "--sweep, --coverage, --solve, --monte-carlo or "
+                         "--best-server")
+        if (args.radar):
+            parser.error("argument --interferers is not supported in radar "
+                         "mode")
+        from . import bestserver
+        try:
+            interferers = bestserver.read_table(args.interferers)
+        except (OSError, ValueError) as e:
+            parser.error(str(e))
+        if (not {'sat_long', 'eirp'}.issubset(interferers) or
+                len(interferers['sat_long']) == 0):
+            parser.error("the interferers file must have \"sat-long\" and "
+                         "\"eirp\" columns and at least one row")
+
+    if (args.sample):
+        from . import montecarlo
+        try:
+            sampled = montecarlo.parse_sample_opts(args.sample, args)
+        except ValueError as e:
+            parser.error(str(e))
+        defined.update(sampled)
+
+    swept = {}
+    if (args.sweep):
+        if (args.sweep_chunk_size < 1):
+            parser.error("argument --sweep-chunk-size must be positive")
+        from . import sweep
+        try:
+            swept = sweep.parse_sweep_opts(args.sweep, args)
+        except ValueError as e:
+            parser.error(str(e))
+        defined.update(swept)
+
+    missing = [alternatives for alternatives in budget.REQUIRED_PARAMS
+               if not defined.intersection(alternatives)]
+    if (missing):
+        parser.error("the following arguments are required: {}".format(
+            ", ".join(" or ".join(_opt(dest) for dest in alternatives)
+                      for alternatives in missing)))
+
+    for alternatives in budget.EXCLUSIVE_PARAMS:
+        if (len(defined.intersection(alternatives)) > 1):
+            parser.error("arguments {} are mutually exclusive".format(
+                " and ".join(_opt(dest) for dest in alternatives)))
+
+    if ('tx_power' in defined and
+            not defined.intersection(('tx_dish_size', 'tx_dish_gain'))):
         parser.error("Define either --tx-dish-size or --tx-dish-gain  "
                      "using option --tx-power")
 
+    # Including the swept frequencies, and the atmospheric losses enabled
+    # by a swept or sampled rain rate or cloud liquid
+    freqs = [] if args.freq is None else [args.freq]
+    if ('freq' in swept):
+        freqs += swept['freq'].tolist()
+    if ((args.atmosphere or 'rain_rate' in defined or
+            'cloud_liquid' in defined) and
+            not all(1e9 <= freq <= 50e9 for freq in freqs)):
+        parser.error("the atmospheric losses are only modeled from 1 to 50 "
+                     "GHz")
+
     if (args.radar):
-        if (args.radar_alt is None):
+        if ('radar_alt' not in defined):
             parser.error("Argument --radar-alt is required in radar mode "
                          "(--radar)")
-        if (args.radar_cross_section is None):
+        if ('radar_cross_section' not in defined):
             parser.error("Argument --radar-cross-section is required in radar "
                          "mode (--radar)")
 
@@ -186,103 +661,212 @@ def analyze(args):
         Dictionary with the main link budget results.
 
     """
-    if (not args.json):
-        logging.basicConfig(level=logging.INFO)
+    inp = budget.LinkBudgetInput.from_args(args)
+    interf = None
+    if (args.interferers is not None):
+        from . import bestserver, interference
+        table = bestserver.read_table(args.interferers)
+        interf = interference.compute(
+            inp, table['sat_long'], table['eirp'],
+            isolation_db=table.get('isolation', 0), mask=args.antenna_mask)
+        res = interf.link
+    else:
+        res = budget.compute(inp)
 
-    sat_alt = 35786e3 if not args.radar else args.radar_alt
+    out = res.to_dict()
+    if (interf is not None):
+        out['interference'] = interference.to_dict(interf)
 
-    elevation, azimuth, slant_range = pointing.look_angles(
-        args.sat_long, args.rx_long, args.rx_lat, sat_alt)
+    sel = None
+    if (args.modcod_table is not None):
+        from . import modcod
+        cnr_db = res.cnr_db if interf is None else float(interf.cnir_db)
+        sel = modcod.select(cnr_db, inp.if_bw,
+                            modcod.get_table(args.modcod_table),
+                            args.rolloff)
+        out['modcod'] = modcod.to_dict(sel)
 
-    # Compute the EIRP
-    if (args.eirp is None):
-        if args.tx_dish_gain is None:
-            tx_gain = calc.dish_gain(args.tx_dish_size, args.freq)
-            logging.info("Tx dish gain:       {:6.2f} dB".format(tx_gain))
-        else:
-            tx_gain = args.tx_dish_gain
-        eirp = calc.eirp(args.tx_power, tx_gain)
-        logging.info("Tx Power:           {:6.2f} kW".format(
-            util.db_to_abs(args.tx_power)/1e3))
+    if (args.json):
+        print(json.dumps(out))
     else:
-        eirp = args.eirp
+        logging.basicConfig(level=logging.INFO)
+        report.log(inp, res, interf, sel)
+
+    return out
+
+
+def run_batch(args):
+    """Run the batch mode (option --batch)"""
+    from . import batch
+    defaults = {f.name: getattr(args, f.name)
+                for f in dataclasses.fields(budget.LinkBudgetInput)
+                if getattr(args, f.name) is not None}
+
+    fmt = args.batch_format
+    if (fmt is None):
+        fmt = 'csv' if args.batch.lower().endswith('.csv') else 'jsonl'
+
+    solve_for = None
+    if (args.solve is not None):
+        solve_for = {
+            'param': args.solve,
+            'cnr_db': args.target_cnr,
+            'capacity_bps': args.target_capacity
+        }
+
+    modcod_sel = None
+    if (args.modcod_table is not None):
+        from . import modcod
+        modcod_sel = {
+            'table': modcod.get_table(args.modcod_table),
+            'rolloff': args.rolloff
+        }
+
+    workers = args.workers or None  # 0 means one worker per CPU
+    if (args.batch == '-'):
+        batch.run(sys.stdin, sys.stdout, fmt, defaults, workers,
+                  args.chunk_size, args.cache_size, solve_for, modcod_sel)
+    else:
+        with open(args.batch, newline='') as fd:
+            batch.run(fd, sys.stdout, fmt, defaults, workers,
+                      args.chunk_size, args.cache_size, solve_for,
+                      modcod_sel)
 
-    logging.info("EIRP:               {:6.2f} dBW ({:6.2f} kW)".format(
-        eirp, util.db_to_abs(eirp)/1e3))
 
-    path_loss_db = calc.path_loss(slant_range, args.freq, args.radar,
-                                  args.radar_cross_section,
-                                  args.radar_bistatic)
-    # TODO support bistatic radar. Add distance from radar object to rx
-    # station.
+def run_solve(args):
+    """Run the inverse solver (option --solve)
 
-    if (args.rx_dish_gain is None):
-        dish_gain_db = calc.dish_gain(args.rx_dish_size, args.freq)
-        logging.info("Rx dish gain:       {:6.2f} dB".format(dish_gain_db))
-    else:
-        dish_gain_db = args.rx_dish_gain
+    Returns:
+        Required value of the solved parameter (NaN if not achievable).
 
-    coax_loss_db, coax_noise_fig_db = calc.coax_loss_nf(args.coax_length)
+    """
+    inp = budget.LinkBudgetInput.from_args(args)
+    value = solve.solve(inp, args.solve, args.target_cnr,
+                        args.target_capacity)
+    achievable = not math.isnan(value)
 
-    if (args.lnb_noise_fig is None):
-        lnb_noise_fig = calc.noise_temp_to_noise_fig(args.lnb_noise_temp)
+    if (args.json):
+        print(json.dumps({args.solve: value if achievable else None}))
     else:
-        lnb_noise_fig = args.lnb_noise_fig
-
-    logging.info("LNB noise figure:   {:6.2f} dB".format(lnb_noise_fig))
-
-    noise_fig_db = calc.total_noise_figure(
-        [lnb_noise_fig, coax_noise_fig_db, args.rx_noise_fig],
-        [args.lnb_gain, -coax_loss_db]
-    )
-
-    effective_input_noise_temp = calc.noise_fig_to_noise_temp(noise_fig_db)
-
-    logging.info("Antenna noise temp: {:6.2f} K".format(
-        args.antenna_noise_temp))
-    logging.info("Input-noise temp:   {:6.2f} K".format(
-        effective_input_noise_temp))
-
-    T_syst = calc.rx_sys_noise_temp(args.antenna_noise_temp,
-                                    effective_input_noise_temp)
-    T_syst_db = util.abs_to_db(T_syst)  # in dBK (for T_syst in K)
-
-    cnr = calc.cnr(eirp, path_loss_db, dish_gain_db, T_syst_db, args.if_bw)
-
-    capacity = calc.capacity(cnr, args.if_bw)
-
-    # Results
-    res = {
-        'pointing': {
-            'elevation': elevation,
-            'azimuth': azimuth,
-            'slant_range': slant_range
-        },
-        'eirp_db': eirp,
-        'path_loss_db': path_loss_db,
-        'rx_dish_gain_db': dish_gain_db,
-        'noise_fig_db': {
-            'lnb': lnb_noise_fig,
-            'coax': coax_noise_fig_db,
-            'total': noise_fig_db
-        },
-        'noise_temp_k': {
-            'effective_input': effective_input_noise_temp,
-            'system': T_syst
-        },
-        'cnr_db': cnr,
-        'capacity_bps': capacity
-
-    }
+        logging.basicConfig(level=logging.INFO)
+        if (achievable):
+            logging.info("Required {}: {:.6g}".format(
+                _opt(args.solve), value))
+        else:
+            logging.info("The target is not achievable by adjusting "
+                         "{}".format(_opt(args.solve)))
+    return value
+
+
+def run_monte_carlo(args):
+    """Run the Monte Carlo mode (option --monte-carlo)
+
+    Returns:
+        Dictionary with the Monte Carlo statistics (see montecarlo.run).
+
+    """
+    from . import montecarlo
+    inp = budget.LinkBudgetInput.from_args(args)
+    dists = montecarlo.parse_sample_opts(args.sample or [], inp)
+    stats = montecarlo.run(
+        inp, dists, args.monte_carlo, args.seed, args.mc_chunk_size,
+        args.workers or None, args.percentiles, args.outage_cnr,
+        args.outage_capacity)
 
     if (args.json):
-        print(json.dumps(res))
+        print(json.dumps(stats))
+    else:
+        logging.basicConfig(level=logging.INFO)
+        for line in montecarlo.render(stats):
+            logging.info(line)
+    return stats
+
+
+def run_coverage(args):
+    """Compute the coverage map (option --coverage)"""
+    from . import coverage
+    inp = budget.LinkBudgetInput.from_args(args)
+    grid = coverage.coverage(inp, args.bbox, args.resolution,
+                             args.min_elevation, args.coverage)
+    logging.basicConfig(level=logging.INFO)
+    logging.info("Coverage map with {} x {} cells saved in {}".format(
+        *grid.shape, args.coverage))
+
+
+def run_best_server(args):
+    """Select the best satellite for each station (option --best-server)"""
+    from . import bestserver
+    sats = bestserver.read_table(args.satellites)
+    stations = bestserver.read_table(args.best_server)
+    inp = budget.LinkBudgetInput.from_args(args)
+    res = bestserver.best_server(
+        inp, sats['sat_long'], stations['rx_long'], stations['rx_lat'],
+        eirp=sats.get('eirp'), freq=sats.get('freq'),
+        min_elevation=args.min_elevation, required_cnr=args.required_cnr)
+    for rx_long, rx_lat, record in zip(stations['rx_long'],
+                                       stations['rx_lat'], res):
+        out = {'rx_long': float(rx_long), 'rx_lat': float(rx_lat)}
+        for name in bestserver.BEST_SERVER_DTYPE.names:
+            val = record[name].item()
+            # Undefined satellite indexes (-1) and C/N values (NaN)
+            undefined = val < 0 if isinstance(val, int) else math.isnan(val)
+            out[name] = None if undefined else val
+        print(json.dumps(out))
+
+
+def run(args):
+    """Run the mode selected by the command-line arguments"""
+    if (args.batch is not None):
+        run_batch(args)
+    elif (args.coverage is not None):
+        run_coverage(args)
+    elif (args.best_server is not None):
+        run_best_server(args)
+    elif (args.solve is not None):
+        run_solve(args)
+    elif (args.monte_carlo is not None):
+        run_monte_carlo(args)
+    elif (args.sweep):
+        from . import sweep
+        sweep.print_sweep(args)
+    else:
+        analyze(args)
+
+
+def run_profile(args):
+    """Run with profiling enabled (option --profile)
+
+    Returns:
+        Profiler object with the recorded timings.
 
-    return res
+    """
+    from . import profiler
+    start = time.perf_counter()
+    with profiler.profiling() as prof:
+        run(args)
+    elapsed = time.perf_counter() - start
+
+    if (args.profile == '-'):
+        logging.basicConfig(level=logging.INFO)
+        logging.info("Total run time: {:.3f} ms".format(elapsed * 1e3))
+        for line in prof.render():
+            logging.info(line)
+    else:
+        with open(args.profile, 'w') as fd:
+            json.dump({'total_s': elapsed, 'timings': prof.to_dict()}, fd,
+                      indent=2)
+    return prof
 
 
 def main():
+    if (sys.argv[1:2] == ['serve']):
+        from . import server
+        server.main(sys.argv[2:])
+        return
     parser = get_parser()
     args = parser.parse_args()
     validate(parser, args)
-    analyze(args)
+    if (args.profile is not None):
+        run_profile(args)
+    else:
+        run(args)
@@ -0,0 +1,286 @@
+"""Adaptive coding and modulation (ACM)
+
+Maps the C/N of a link to the most efficient MODCOD (modulation and coding
+scheme) that it supports and to the corresponding net bitrate, as achieved
+by an ACM modem, instead of the Shannon bound returned by calc.capacity.
+
+A MODCOD table lists the Es/N0 threshold (in dB) and the spectral efficiency
+(in information bits per transmitted symbol) of each MODCOD. Built-in tables
+are available for DVB-S2 and DVB-S2X (see TABLES), with the ideal Es/N0
+thresholds of normal frames (64800 bits) over the AWGN channel and the
+spectral efficiencies of normal frames without pilots [1, 2]. The DVB-S2X
+table also includes the DVB-S2 MODCODs. Tables can also be read from CSV
+files (see read_csv), e.g., with the thresholds measured on a given modem,
+which typically exceed the ideal ones by a few tenths of dB.
+
+The carrier is assumed to occupy the IF bandwidth, such that its symbol rate
+is if_bw / (1 + rolloff) and its Es/N0 is C/N + 10 log10(1 + rolloff). The
+selection is a binary search over the sorted thresholds, with bisect for
+scalar inputs and numpy.searchsorted for arrays, such that millions of C/N
+values are classified in one vectorized call.
+
+References:
+
+ [1] ETSI EN 302 307-1: DVB-S2, Part 1, Table 13.
+ [2] ETSI EN 302 307-2: DVB-S2X, Part 2, Table 20a.
+
+"""
+import bisect
+import csv
+import math
+from collections import namedtuple
+from . import util
+
+
+# (MODCOD, ideal Es/N0 threshold in dB, spectral efficiency in bits/symbol)
+_DVB_S2 = (
+    ('QPSK 1/4', -2.35, 0.490243),
+    ('QPSK 1/3', -1.24, 0.656448),
+    ('QPSK 2/5', -0.30, 0.789412),
+    ('QPSK 1/2', 1.00, 0.988858),
+    ('QPSK 3/5', 2.23, 1.188304),
+    ('QPSK 2/3', 3.10, 1.322253),
+    ('QPSK 3/4', 4.03, 1.487473),
+    ('QPSK 4/5', 4.68, 1.587196),
+    ('QPSK 5/6', 5.18, 1.654663),
+    ('QPSK 8/9', 6.20, 1.766451),
+    ('QPSK 9/10', 6.42, 1.788612),
+    ('8PSK 3/5', 5.50, 1.779991),
+    ('8PSK 2/3', 6.62, 1.980636),
+    ('8PSK 3/4', 7.91, 2.228124),
+    ('8PSK 5/6', 9.35, 2.478562),
+    ('8PSK 8/9', 10.69, 2.646012),
+    ('8PSK 9/10', 10.98, 2.679207),
+    ('16APSK 2/3', 8.97, 2.637201),
+    ('16APSK 3/4', 10.21, 2.966728),
+    ('16APSK 4/5', 11.03, 3.165623),
+    ('16APSK 5/6', 11.61, 3.300184),
+    ('16APSK 8/9', 12.89, 3.523143),
+    ('16APSK 9/10', 13.13, 3.567342),
+    ('32APSK 3/4', 12.73, 3.703295),
+    ('32APSK 4/5', 13.64, 3.951571),
+    ('32APSK 5/6', 14.28, 4.119540),
+    ('32APSK 8/9', 15.69, 4.397854),
+    ('32APSK 9/10', 16.05, 4.453027),
+)
+
+# MODCODs introduced by DVB-S2X ("-L" denotes the low-SNR variants)
+_DVB_S2X = (
+    ('QPSK 13/45', -2.03, 0.5678),
+    ('QPSK 9/20', 0.22, 0.8891),
+    ('QPSK 11/20', 1.45, 1.0886),
+    ('8APSK 5/9-L', 4.73, 1.6472),
+    ('8APSK 26/45-L', 5.13, 1.7136),
+    ('8PSK 23/36', 6.12, 1.8962),
+    ('8PSK 25/36', 7.02, 2.0621),
+    ('8PSK 13/18', 7.49, 2.1451),
+    ('16APSK 1/2-L', 5.97, 1.9723),
+    ('16APSK 8/15-L', 6.55, 2.1048),
+    ('16APSK 5/9-L', 6.84, 2.1932),
+    ('16APSK 26/45', 7.51, 2.2816),
+    ('16APSK 3/5', 7.80, 2.3700),
+    ('16APSK 3/5-L', 7.41, 2.3700),
+    ('16APSK 28/45', 8.10, 2.4584),
+    ('16APSK 23/36', 8.38, 2.5247),
+    ('16APSK 2/3-L', 8.43, 2.6352),
+    ('16APSK 25/36', 9.27, 2.7457),
+    ('16APSK 13/18', 9.71, 2.8562),
+    ('16APSK 7/9', 10.65, 3.0772),
+    ('16APSK 77/90', 11.99, 3.3866),
+    ('32APSK 2/3-L', 11.10, 3.2895),
+    ('32APSK 32/45', 11.75, 3.5102),
+    ('32APSK 11/15', 12.17, 3.6205),
+    ('32APSK 7/9', 13.05, 3.8412),
+    ('64APSK 32/45-L', 13.98, 4.2064),
+    ('64APSK 11/15', 14.81, 4.3387),
+    ('64APSK 7/9', 15.47, 4.6031),
+    ('64APSK 4/5', 15.87, 4.7354),
+    ('64APSK 5/6', 16.55, 4.9337),
+    ('128APSK 3/4', 17.73, 5.1699),
+    ('128APSK 7/9', 18.53, 5.3624),
+    ('256APSK 29/45-L', 16.98, 5.0657),
+    ('256APSK 2/3-L', 17.24, 5.2415),
+    ('256APSK 31/45-L', 18.10, 5.4173),
+    ('256APSK 32/45', 18.59, 5.5932),
+    ('256APSK 11/15-L', 18.84, 5.7690),
+    ('256APSK 3/4', 19.57, 5.9009),
+)
+
+DEFAULT_ROLLOFF = 0.2
+
+# Results of the MODCOD selection. For array inputs, each field is an array
+# (of objects, in the case of the MODCOD names).
+ModcodSelection = namedtuple('ModcodSelection', [
+    'index',         # index of the MODCOD in the table, or -1 if none
+    'modcod',        # name of the MODCOD, or None if none
+    'esno_db',       # Es/N0 of the carrier in dB
+    'efficiency',    # spectral efficiency in bits/symbol (0 if none)
+    'bitrate_bps',   # net bitrate in bps (0 if none)
+    'margin_db',     # Es/N0 margin relative to the MODCOD threshold
+])
+
+
+class ModcodTable:
+    """Table of MODCODs sorted by Es/N0 threshold
+
+    Args:
+        rows : Iterable of (name, Es/N0 threshold in dB, spectral efficiency
+               in bits/symbol) tuples, in any order.
+        name : Optional name of the table.
+
+    Raises:
+        ValueError: if the table is empty or holds invalid values.
+
+    """
+    def __init__(self, rows, name=None):
+        rows = sorted(rows, key=lambda row: row[1])
+        if (not rows):
+            raise ValueError("Empty MODCOD table")
+        for modcod, esno_db, efficiency in rows:
+            if (not math.isfinite(esno_db) or not efficiency > 0):
+                raise ValueError("Invalid threshold or efficiency of MODCOD "
+                                 "\"{}\"".format(modcod))
+        self.name = name
+        self.modcods = tuple(row[0] for row in rows)
+        self.esno_db = tuple(float(row[1]) for row in rows)
+        self.efficiency = tuple(float(row[2]) for row in rows)
+
+        # Most efficient MODCOD among those with a threshold up to that of
+        # each row, given that a more robust MODCOD can be more efficient
+        # than a less robust one (e.g., among the DVB-S2X MODCODs)
+        best = []
+        for i, efficiency in enumerate(self.efficiency):
+            if (best and self.efficiency[best[-1]] >= efficiency):
+                best.append(best[-1])
+            else:
+                best.append(i)
+        self.best = tuple(best)
+
+    def __len__(self):
+        return len(self.modcods)
+
+    def __repr__(self):
+        return "ModcodTable(name={!r}, {} MODCODs)".format(self.name,
+                                                           len(self))
+
+
+TABLES = {
+    'dvb-s2': _DVB_S2,
+    'dvb-s2x': _DVB_S2 + _DVB_S2X,
+}
+
+
+def read_csv(filename):
+    """Read a MODCOD table from a CSV file
+
+    The file has a header row and columns "modcod" (name), "esno-db" (Es/N0
+    threshold in dB) and "efficiency" (spectral efficiency in bits/symbol).
+
+    Returns:
+        ModcodTable object.
+
+    Raises:
+        ValueError: if the file is not a valid MODCOD table.
+
+    """
+    rows = []
+    with open(filename, newline='') as fd:
+        reader = csv.DictReader(fd)
+        fieldnames = {key.strip().replace('-', '_'): key
+                      for key in reader.fieldnames or []}
+        missing = {'modcod', 'esno_db', 'efficiency'} - set(fieldnames)
+        if (missing):
+            raise ValueError("{}: missing column(s) {}".format(
+                filename, ", ".join(sorted(missing))))
+        for row in reader:
+            try:
+                rows.append((row[fieldnames['modcod']].strip(),
+                             float(row[fieldnames['esno_db']]),
+                             float(row[fieldnames['efficiency']])))
+            except (TypeError, ValueError):
+                raise ValueError("{}:{}: invalid MODCOD definition".format(
+                    filename, reader.line_num))
+    return ModcodTable(rows, name=filename)
+
+
+def get_table(name):
+    """Get a built-in MODCOD table by name (see TABLES) or read it from a CSV
+    file (see read_csv)
+
+    Returns:
+        ModcodTable object.
+
+    Raises:
+        ValueError: if the table is not valid.
+        OSError: if the file cannot be read.
+
+    """
+    if (name in TABLES):
+        return ModcodTable(TABLES[name], name=name)
+    return read_csv(name)
+
+
+def select(cnr_db, if_bw, table, rolloff=DEFAULT_ROLLOFF):
+    """Select the most efficient MODCOD supported by a given C/N
+
+    Args:
+        cnr_db  : C/N (or C/(N+I)) within the IF bandwidth in dB. Scalar or
+                  array.
+        if_bw   : IF bandwidth in Hz occupied by the carrier.
+        table   : ModcodTable object.
+        rolloff : Roll-off factor of the carrier's pulse shaping filter.
+
+    Returns:
+        ModcodSelection tuple. When no MODCOD is supported, the margin is
+        relative to the threshold of the most robust MODCOD, i.e., it is the
+        (negative) Es/N0 increase required to close the link. NaN C/N values
+        select no MODCOD and produce NaN margins.
+
+    """
+    sym_rate = if_bw / (1 + rolloff)
+    offset_db = 10 * math.log10(1 + rolloff)
+
+    if (util.is_scalar(cnr_db, if_bw)):
+        esno_db = cnr_db + offset_db
+        if (math.isnan(esno_db)):
+            return ModcodSelection(-1, None, esno_db, 0.0, 0.0, math.nan)
+        pos = bisect.bisect_right(table.esno_db, esno_db) - 1
+        if (pos < 0):
+            return ModcodSelection(-1, None, esno_db, 0.0, 0.0,
+                                   esno_db - table.esno_db[0])
+        index = table.best[pos]
+        efficiency = table.efficiency[index]
+        return ModcodSelection(index, table.modcods[index], esno_db,
+                               efficiency, efficiency * sym_rate,
+                               esno_db - table.esno_db[index])
+
+    import numpy as np
+    esno_db = np.asarray(cnr_db, dtype=float) + offset_db
+    thresholds = np.array(table.esno_db)
+    pos = np.searchsorted(thresholds, esno_db, side='right') - 1
+    supported = (pos >= 0) & ~np.isnan(esno_db)
+    index = np.where(supported,
+                     np.array(table.best)[np.maximum(pos, 0)], -1)
+    efficiency = np.where(supported,
+                          np.array(table.efficiency)[index], 0.0)
+    names = np.array(table.modcods + (None,), dtype=object)
+    return ModcodSelection(
+        index=index,
+        modcod=names[index],
+        esno_db=esno_db,
+        efficiency=efficiency,
+        bitrate_bps=efficiency * sym_rate,
+        margin_db=esno_db - thresholds[np.maximum(index, 0)])
+
+
+def to_dict(sel):
+    """Convert the MODCOD selection of a single C/N value into a
+    JSON-serializable dictionary"""
+    margin_db = float(sel.margin_db)
+    return {
+        'name': sel.modcod,
+        'esno_db': float(sel.esno_db),
+        'efficiency': float(sel.efficiency),
+        'bitrate_bps': float(sel.bitrate_bps),
+        'margin_db': None if math.isnan(margin_db) else margin_db
+    }
@@ -0,0 +1,406 @@
+"""Monte Carlo link availability
+
+Samples uncertain link budget parameters (e.g., the antenna noise
+temperature or the LNB noise figure) from probability distributions and
+evaluates the resulting C/N and capacity over a large number of random draws.
+Besides the link budget inputs, the following losses in dB can be sampled,
+which reduce the C/N dB for dB:
+
+- pointing_loss: antenna pointing error loss.
+- extra_loss: any other attenuation (e.g., rain fade or polarization loss).
+
+The draws are evaluated in vectorized chunks, and only streaming statistics
+are kept across chunks (counts, mean, variance, extremes and fixed-bin
+histograms). Hence, the memory usage depends on the chunk size, not on the
+number of draws. The percentiles are interpolated from the histograms, with
+a resolution given by CNR_BINS and CAPACITY_BINS.
+
+The draws of the i-th chunk are generated from the i-th child of a
+numpy.random.SeedSequence created from the seed. Hence, the draws depend on
+the seed and on the chunk size, but not on the number of worker processes.
+
+"""
+import collections
+import dataclasses
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from . import budget, calc, util
+
+
+# Sampled losses in dB that are not link budget inputs
+LOSSES = ('pointing_loss', 'extra_loss')
+
+# Supported distributions and their parameters, in the order given in the
+# specifications. Except for "const", the distributions are sampled with the
+# numpy.random.Generator method of the same name.
+DISTRIBUTIONS = {
+    'const': ('value',),
+    'normal': ('mean', 'std'),
+    'uniform': ('low', 'high'),
+    'triangular': ('low', 'mode', 'high'),
+    'lognormal': ('mean', 'sigma'),
+    'exponential': ('scale',),
+    'rayleigh': ('scale',),
+}
+
+# Histogram bins given as (lower edge, upper edge, bin width). The capacity
+# histogram covers log10 of the capacity in bps.
+CNR_BINS = (-50.0, 100.0, 0.005)
+CAPACITY_BINS = (0.0, 13.0, 1e-4)
+
+DEFAULT_PERCENTILES = (1, 5, 50, 95, 99)
+
+Distribution = collections.namedtuple('Distribution', ['name', 'args'])
+
+
+def _sample(dist, rng, size):
+    """Draw samples from a distribution"""
+    if (dist.name == 'const'):
+        return np.full(size, dist.args[0])
+    return getattr(rng, dist.name)(*dist.args, size=size)
+
+
+def parse_distribution(spec):
+    """Parse a distribution specification
+
+    Args:
+        spec : Distribution name followed by its comma-separated parameters
+               (see DISTRIBUTIONS), e.g., "normal:20,5" for a normal
+               distribution with mean 20 and standard deviation 5.
+
+    Returns:
+        Distribution tuple.
+
+    Raises:
+        ValueError: if the specification is invalid.
+
+    """
+    name, _, params = spec.partition(':')
+    name = name.strip()
+    if (name not in DISTRIBUTIONS):
+        raise ValueError("Unknown distribution \"{}\" (expected one of "
+                         "{})".format(name, ", ".join(DISTRIBUTIONS)))
+    try:
+        args = tuple(float(x) for x in params.split(',')) if params else ()
+    except ValueError:
+        raise ValueError("Invalid distribution \"{}\"".format(spec))
+    expected = DISTRIBUTIONS[name]
+    if (len(args) != len(expected)):
+        raise ValueError("Distribution \"{}\" expects parameters {}".format(
+            name, ", ".join(expected)))
+
+    dist = Distribution(name, args)
+    try:
+        # Let numpy check the parameters (e.g., a negative std)
+        _sample(dist, np.random.default_rng(0), 1)
+    except ValueError:
+        raise ValueError("Invalid parameters for distribution \"{}\"".format(
+            spec))
+    return dist
+
+
+def parse_sample_opts(opts, inp=None):
+    """Parse the "PARAM=DIST:ARGS" specifications given through option --sample
+
+    Args:
+        opts : List of sample specifications.
+        inp  : Optional argparse namespace or LinkBudgetInput object used to
+               check that the sampled parameters exist and are numeric.
+
+    Returns:
+        Dictionary mapping each sampled parameter (argparse destination) to
+        its distribution.
+
+    """
+    dists = {}
+    for opt in opts:
+        name, sep, spec = opt.partition('=')
+        if (not sep):
+            raise ValueError("Invalid sample \"{}\" (expected "
+                             "PARAM=DIST:ARGS)".format(opt))
+        name = name.strip().lstrip('-').replace('-', '_')
+        if (name not in LOSSES and (name not in budget.NUMERIC_PARAMS or (
+                inp is not None and isinstance(getattr(inp, name), bool)))):
+            raise ValueError("Parameter \"{}\" cannot be sampled".format(
+                name))
+        if (name in dists):
+            raise ValueError("Parameter \"{}\" sampled more than once".format(
+                name))
+        dists[name] = parse_distribution(spec)
+    return dists
+
+
+class _Stats:
+    """Streaming statistics of a quantity
+
+    Keeps the count, the mean and the sum of squared deviations (merged with
+    Chan's parallel algorithm), the extremes and a fixed-bin histogram with
+    underflow and overflow bins.
+
+    """
+    def __init__(self, bins, log=False):
+        self.lo, self.hi, self.width = bins
+        self.log = log
+        self.n_bins = int(round((self.hi - self.lo) / self.width))
+        self.hist = np.zeros(self.n_bins + 2, dtype=np.int64)
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def _merge_moments(self, count, mean, m2):
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean += delta * count / total
+        self.m2 += m2 + delta**2 * self.count * count / total
+        self.count = total
+
+    def add(self, x):
+        """Add an array of finite values"""
+        if (x.size == 0):
+            return
+        mean = x.mean()
+        self._merge_moments(x.size, mean, np.sum((x - mean)**2))
+        self.min = min(self.min, x.min())
+        self.max = max(self.max, x.max())
+        h = np.log10(x) if self.log else x
+        idx = np.floor((h - self.lo) / self.width) + 1
+        idx = np.clip(idx, 0, self.n_bins + 1).astype(np.int64)
+        self.hist += np.bincount(idx, minlength=self.n_bins + 2)
+
+    def merge(self, other):
+        """Merge the statistics accumulated by another _Stats object"""
+        if (other.count == 0):
+            return
+        self._merge_moments(other.count, other.mean, other.m2)
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.hist += other.hist
+
+    def percentile(self, q):
+        """Percentile interpolated linearly within the histogram bins"""
+        rank = q / 100 * self.count
+        cum = np.cumsum(self.hist)
+        i = min(int(np.searchsorted(cum, rank)), self.n_bins + 1)
+        if (i == 0 or self.hist[i] == 0):
+            return float(self.min)
+        if (i == self.n_bins + 1):
+            return float(self.max)
+        frac = (rank - (cum[i] - self.hist[i])) / self.hist[i]
+        val = self.lo + (i - 1 + frac) * self.width
+        if (self.log):
+            val = 10**val
+        return float(min(max(val, self.min), self.max))
+
+    def summary(self, percentiles):
+        """Dictionary with the mean, std, extremes and percentiles"""
+        if (self.count == 0):
+            return {
+                'mean': None, 'std': None, 'min': None, 'max': None,
+                'percentiles': {'{:g}'.format(q): None for q in percentiles}
+            }
+        return {
+            'mean': float(self.mean),
+            'std': math.sqrt(self.m2 / self.count),
+            'min': float(self.min),
+            'max': float(self.max),
+            'percentiles': {'{:g}'.format(q): self.percentile(q)
+                            for q in percentiles}
+        }
+
+
+class _Accumulator:
+    """Statistics accumulated over chunks of draws"""
+    def __init__(self, outage_cnr=None, outage_capacity=None):
+        self.outage_cnr = outage_cnr
+        self.outage_capacity = outage_capacity
+        self.draws = 0
+        self.invalid = 0
+        self.outages = 0
+        self.cnr = _Stats(CNR_BINS)
+        self.capacity = _Stats(CAPACITY_BINS, log=True)
+
+    def add(self, cnr_db, capacity_bps):
+        valid = np.isfinite(cnr_db) & np.isfinite(capacity_bps)
+        outage = ~valid
+        if (self.outage_cnr is not None):
+            outage |= cnr_db < self.outage_cnr
+        if (self.outage_capacity is not None):
+            outage |= capacity_bps < self.outage_capacity
+        self.draws += cnr_db.size
+        self.invalid += int(cnr_db.size - np.count_nonzero(valid))
+        self.outages += int(np.count_nonzero(outage))
+        self.cnr.add(cnr_db[valid])
+        self.capacity.add(capacity_bps[valid])
+
+    def merge(self, other):
+        self.draws += other.draws
+        self.invalid += other.invalid
+        self.outages += other.outages
+        self.cnr.merge(other.cnr)
+        self.capacity.merge(other.capacity)
+
+
+def _replaced_params(inp, dists):
+    """Input parameters cleared due to the sampled alternatives"""
+    replaced = {}
+    for name in dists:
+        for alternatives in budget.EXCLUSIVE_PARAMS:
+            if (name in alternatives):
+                replaced.update({other: None for other in alternatives})
+    return replaced
+
+
+def _run_chunks(inp, dists, seeds, sizes, outage_cnr, outage_capacity):
+    """Evaluate chunks of draws and accumulate their statistics"""
+    replaced = _replaced_params(inp, dists)
+    acc = _Accumulator(outage_cnr, outage_capacity)
+    for seed, size in zip(seeds, sizes):
+        rng = np.random.default_rng(seed)
+        samples = {name: _sample(dist, rng, size)
+                   for name, dist in dists.items()}
+        loss_db = 0
+        for name, val in samples.items():
+            if (name in LOSSES):
+                loss_db = loss_db + val
+            else:
+                replaced[name] = val
+        chunk_inp = dataclasses.replace(inp, **replaced)
+
+        # Invalid draws (e.g., a negative dish size) produce NaN and are
+        # counted as outages
+        with np.errstate(invalid='ignore', divide='ignore'):
+            res = budget.compute(chunk_inp)
+            cnr_db = np.broadcast_to(res.cnr_db - loss_db, (size,))
+            capacity_bps = np.broadcast_to(
+                calc.capacity(cnr_db, chunk_inp.if_bw), (size,))
+            acc.add(cnr_db, capacity_bps)
+    return acc
+
+
+def run(inp, dists, n_draws, seed=None, chunk_size=2**16, workers=1,
+        percentiles=DEFAULT_PERCENTILES, outage_cnr=None,
+        outage_capacity=None):
+    """Run a Monte Carlo link availability analysis
+
+    Args:
+        inp             : LinkBudgetInput object with the fixed parameters.
+        dists           : Dictionary mapping each sampled parameter (a
+                          numeric LinkBudgetInput field or one of LOSSES) to
+                          its Distribution. A sampled parameter replaces the
+                          value defined on inp for the same parameter and
+                          for its mutually exclusive alternatives.
+        n_draws         : Number of random draws.
+        seed            : Seed of the random number generator. If None, a
+                          fresh seed is drawn from the OS entropy and
+                          returned in the results.
+        chunk_size      : Number of draws evaluated at once.
+        workers         : Number of worker processes, or None to use one
+                          worker per CPU. With a single worker, the draws
+                          are evaluated in the calling process.
+        percentiles     : Percentiles of the C/N and capacity to report.
+        outage_cnr      : C/N threshold in dB below which the link is in
+                          outage.
+        outage_capacity : Capacity threshold in bps below which the link is
+                          in outage.
+
+    Returns:
+        Dictionary with the number of draws, the seed, the number of invalid
+        draws (producing NaN), the statistics of the C/N ("cnr_db") and of
+        the capacity ("capacity_bps"), and the outage probability (None if
+        no outage threshold is defined). Invalid draws are excluded from the
+        statistics and counted as outages.
+
+    Raises:
+        ValueError: if the parameters are inconsistent.
+
+    """
+    if (n_draws < 1 or chunk_size < 1):
+        raise ValueError("The number of draws and the chunk size must be "
+                         "positive")
+    for name in dists:
+        if (name not in LOSSES and name not in budget.NUMERIC_PARAMS):
+            raise ValueError("Parameter \"{}\" cannot be sampled".format(
+                name))
+    for q in percentiles:
+        if (not 0 <= q <= 100):
+            raise ValueError("Percentiles must be between 0 and 100")
+
+    # Validate the input with a single draw of each sampled parameter
+    rng = np.random.default_rng(0)
+    replaced = _replaced_params(inp, dists)
+    replaced.update({name: _sample(dist, rng, 1)
+                     for name, dist in dists.items() if name not in LOSSES})
+    dataclasses.replace(inp, **replaced).validate()
+
+    seed_seq = np.random.SeedSequence(seed)
+    n_chunks = -(-n_draws // chunk_size)
+    seeds = seed_seq.spawn(n_chunks)
+    sizes = [chunk_size] * (n_chunks - 1) + \
+        [n_draws - chunk_size * (n_chunks - 1)]
+
+    workers = workers or os.cpu_count() or 1
+    if (workers == 1 or n_chunks == 1):
+        acc = _run_chunks(inp, dists, seeds, sizes, outage_cnr,
+                          outage_capacity)
+    else:
+        # Contiguous shards of chunks, a few per worker for load balancing
+        n_shards = min(n_chunks, 4 * workers)
+        bounds = np.linspace(0, n_chunks, n_shards + 1).astype(int)
+        acc = _Accumulator(outage_cnr, outage_capacity)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(_run_chunks, inp, dists, seeds[a:b],
+                                sizes[a:b], outage_cnr, outage_capacity)
+                for a, b in zip(bounds[:-1], bounds[1:])
+            ]
+            for future in futures:
+                acc.merge(future.result())
+
+    outage = outage_cnr is not None or outage_capacity is not None
+    return {
+        'draws': acc.draws,
+        'seed': seed_seq.entropy,
+        'invalid': acc.invalid,
+        'cnr_db': acc.cnr.summary(percentiles),
+        'capacity_bps': acc.capacity.summary(percentiles),
+        'outage_probability': acc.outages / acc.draws if outage else None
+    }
+
+
+def render(stats):
+    """Render the Monte Carlo statistics as human-readable lines
+
+    Args:
+        stats : Dictionary returned by run.
+
+    Returns:
+        List of strings, one per reported quantity.
+
+    """
+    lines = ["Draws:              {:d}".format(stats['draws'])]
+    if (stats['invalid']):
+        lines.append("Invalid draws:      {:d}".format(stats['invalid']))
+
+    cnr = stats['cnr_db']
+    capacity = stats['capacity_bps']
+    if (cnr['mean'] is not None):
+        lines += [
+            "(C/N) mean:         {:6.2f} dB".format(cnr['mean']),
+            "(C/N) std:          {:6.2f} dB".format(cnr['std'])
+        ]
+        lines += ["(C/N) P{:<13s}{:6.2f} dB".format(q + ':', val)
+                  for q, val in cnr['percentiles'].items()]
+        lines.append("Capacity mean:      {}".format(
+            util.format_rate(capacity['mean'])))
+        lines += ["Capacity P{:<10s}{}".format(q + ':',
+                                               util.format_rate(val))
+                  for q, val in capacity['percentiles'].items()]
+
+    if (stats['outage_probability'] is not None):
+        lines.append("Outage probability: {:.4%}".format(
+            stats['outage_probability']))
+    return lines
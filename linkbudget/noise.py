@@ -0,0 +1,149 @@
+"""Receiver noise chains
+
+A noise chain is a list of cascaded receiver devices (e.g., LNB, filters,
+splitters, line amplifiers, coax runs and downconverters), given in signal
+order. Each device is a dictionary defined by one of the following
+combinations of keys:
+
+- "nf" (noise figure in dB) or "noise_temp" (noise temperature in K), with an
+  optional "gain" in dB (0 dB by default). For active devices, such as LNBs
+  and amplifiers.
+- "loss" in dB. For passive lossy devices at the standard temperature (290
+  K), such as filters and splitters, whose noise figure equals the loss.
+- "coax_length" in ft. For RG6 coaxial cables (see calc.coax_loss_nf).
+
+Devices can also have a "name" key, which is ignored by the computations.
+For example, the chain used by default by the command-line interface is:
+
+    [{"name": "lnb", "nf": 0.6, "gain": 40},
+     {"name": "coax", "coax_length": 110},
+     {"name": "receiver", "nf": 10}]
+
+"""
+import json
+import numbers
+from . import calc
+
+
+_KEYS = {
+    'nf': ('gain',),
+    'noise_temp': ('gain',),
+    'loss': (),
+    'coax_length': (),
+}
+
+
+def _check_number(device, key):
+    val = device[key]
+    if (not isinstance(val, numbers.Number) or isinstance(val, bool)):
+        raise ValueError("Invalid value for \"{}\" in noise chain device "
+                         "{}".format(key, device))
+    return val
+
+
+def device_figures(device):
+    """Noise figure and gain of a noise chain device
+
+    Args:
+        device : Dictionary defining the device.
+
+    Returns:
+        Tuple with the noise figure and the gain of the device in dB.
+
+    Raises:
+        ValueError: if the device definition is invalid.
+
+    """
+    if (not isinstance(device, dict)):
+        raise ValueError("Invalid noise chain device {}".format(device))
+
+    keys = set(device) - {'name'}
+    main_keys = keys.intersection(_KEYS)
+    if (len(main_keys) != 1):
+        raise ValueError("Noise chain device {} must define exactly one of "
+                         "{}".format(device, ", ".join(_KEYS)))
+    key = main_keys.pop()
+    unknown = keys - {key} - set(_KEYS[key])
+    if (unknown):
+        raise ValueError("Unexpected keys {} in noise chain device {}".format(
+            ", ".join(sorted(unknown)), device))
+
+    val = _check_number(device, key)
+    if (key == 'loss'):
+        return val, -val
+    if (key == 'coax_length'):
+        loss_db, nf_db = calc.coax_loss_nf(val)
+        return nf_db, -loss_db
+
+    gain = _check_number(device, 'gain') if 'gain' in device else 0
+    if (key == 'noise_temp'):
+        return calc.noise_temp_to_noise_fig(val), gain
+    return val, gain
+
+
+def parse_chain(spec):
+    """Parse and validate a noise chain specification
+
+    Args:
+        spec : List of device dictionaries or the equivalent JSON string.
+
+    Returns:
+        List of device dictionaries.
+
+    Raises:
+        ValueError: if the specification is invalid.
+
+    """
+    if (isinstance(spec, str)):
+        try:
+            spec = json.loads(spec)
+        except ValueError:
+            raise ValueError("Invalid noise chain (expected a JSON list)")
+    if (not isinstance(spec, (list, tuple)) or len(spec) == 0):
+        raise ValueError("The noise chain must be a non-empty list of "
+                         "devices")
+    for device in spec:
+        device_figures(device)
+    return list(spec)
+
+
+def chain_figures(chain):
+    """Noise figures and gains of the devices of a noise chain
+
+    Returns:
+        Tuple with the list of noise figures and the list of gains in dB.
+
+    """
+    figures = [device_figures(device) for device in chain]
+    return [nf for nf, _ in figures], [gain for _, gain in figures]
+
+
+def noise_figure(chain):
+    """Overall noise figure of a noise chain in dB"""
+    nfs, gains = chain_figures(chain)
+    return calc.total_noise_figure(nfs, gains[:-1])
+
+
+def cascade(chains):
+    """Overall noise figure of many noise chains at once
+
+    The chains can have distinct lengths, in which case the shorter chains
+    are padded with noiseless unit-gain devices. The overall noise figures
+    are computed in a single vectorized pass (see calc.cascade_noise_figure).
+
+    Args:
+        chains : Sequence of noise chains.
+
+    Returns:
+        Array with the overall noise figure in dB of each chain.
+
+    """
+    import numpy as np
+    figures = [chain_figures(chain) for chain in chains]
+    n_stages = max((len(nfs) for nfs, _ in figures), default=1)
+    nfs = np.zeros((len(figures), n_stages))
+    gains = np.zeros((len(figures), n_stages))
+    for i, (chain_nfs, chain_gains) in enumerate(figures):
+        nfs[i, :len(chain_nfs)] = chain_nfs
+        gains[i, :len(chain_gains)] = chain_gains
+    return calc.cascade_noise_figure(nfs, gains)
@@ -0,0 +1,138 @@
+"""Non-geostationary orbits
+
+Keplerian propagation of satellite orbits into earth-centered earth-fixed
+(ECEF) coordinates and time-series link budget evaluation over a pass. All
+epochs are processed in a single vectorized pass.
+
+The propagator is a two-body model (no perturbations), which is adequate for
+link budget purposes over short time spans (e.g., a few days).
+
+"""
+import numpy as np
+from . import budget, pointing
+
+
+MU = 3.986004418e14         # earth's gravitational parameter in m^3/s^2
+EARTH_ROT_RATE = 7.2921150e-5  # earth's rotation rate in rad/s
+R_EQ = 6378.137e3           # equatorial radius in meters
+
+
+def _eccentric_anomaly(M, ecc, tol=1e-12, max_iter=20):
+    """Solve Kepler's equation (M = E - e*sin(E)) by Newton's method"""
+    E = M if ecc < 0.8 else np.full_like(M, np.pi)
+    for _ in range(max_iter):
+        delta = (E - ecc*np.sin(E) - M) / (1 - ecc*np.cos(E))
+        E = E - delta
+        if (np.max(np.abs(delta)) < tol):
+            break
+    return E
+
+
+def propagate(t, semi_major_axis, eccentricity=0, inclination=0, raan=0,
+              arg_perigee=0, mean_anomaly=0, gmst=0):
+    """Propagate a Keplerian orbit into ECEF positions
+
+    Args:
+        t               : Array of epochs in seconds relative to the epoch
+                          of the orbital elements.
+        semi_major_axis : Semi-major axis in meters (i.e., the earth's
+                          radius plus the altitude for a circular orbit).
+        eccentricity    : Eccentricity (0 for a circular orbit).
+        inclination     : Inclination in degrees.
+        raan            : Right ascension of the ascending node in degrees.
+        arg_perigee     : Argument of perigee in degrees.
+        mean_anomaly    : Mean anomaly at epoch t=0 in degrees.
+        gmst            : Greenwich mean sidereal angle at epoch t=0 in
+                          degrees, i.e., the rotation between the inertial
+                          and earth-fixed frames at t=0.
+
+    Returns:
+        Tuple with the arrays of ECEF x, y and z coordinates in meters.
+
+    """
+    if (semi_major_axis <= R_EQ):
+        raise ValueError("Semi-major axis below the earth's radius")
+    if (not 0 <= eccentricity < 1):
+        raise ValueError("Eccentricity must be in the [0, 1) interval")
+
+    t = np.asarray(t, dtype=float)
+    a = semi_major_axis
+    n = np.sqrt(MU / a**3)  # mean motion in rad/s
+    M = np.radians(mean_anomaly) + n*t
+
+    # Position on the orbital plane, with the x-axis towards the perigee
+    if (eccentricity == 0):
+        x_orb = a * np.cos(M)
+        y_orb = a * np.sin(M)
+    else:
+        E = _eccentric_anomaly(np.mod(M, 2*np.pi), eccentricity)
+        x_orb = a * (np.cos(E) - eccentricity)
+        y_orb = a * np.sqrt(1 - eccentricity**2) * np.sin(E)
+
+    # Rotation from the orbital plane into the inertial frame
+    w = np.radians(arg_perigee)
+    i = np.radians(inclination)
+    W = np.radians(raan)
+    cos_w, sin_w = np.cos(w), np.sin(w)
+    cos_i, sin_i = np.cos(i), np.sin(i)
+    cos_W, sin_W = np.cos(W), np.sin(W)
+    x_eci = ((cos_W*cos_w - sin_W*sin_w*cos_i) * x_orb +
+             (-cos_W*sin_w - sin_W*cos_w*cos_i) * y_orb)
+    y_eci = ((sin_W*cos_w + cos_W*sin_w*cos_i) * x_orb +
+             (-sin_W*sin_w + cos_W*cos_w*cos_i) * y_orb)
+    z_eci = sin_w*sin_i * x_orb + cos_w*sin_i * y_orb
+
+    # Rotation from the inertial into the earth-fixed frame
+    theta = np.radians(gmst) + EARTH_ROT_RATE*t
+    cos_t, sin_t = np.cos(theta), np.sin(theta)
+    x = cos_t*x_eci + sin_t*y_eci
+    y = -sin_t*x_eci + cos_t*y_eci
+    return x, y, z_eci
+
+
+def circular_orbit(t, altitude, inclination=0, raan=0, arg_latitude=0,
+                   gmst=0):
+    """Propagate a circular orbit into ECEF positions
+
+    Args:
+        t            : Array of epochs in seconds.
+        altitude     : Orbit altitude above the equatorial radius in meters.
+        inclination  : Inclination in degrees.
+        raan         : Right ascension of the ascending node in degrees.
+        arg_latitude : Argument of latitude (angle from the ascending node)
+                       at epoch t=0 in degrees.
+        gmst         : Greenwich mean sidereal angle at t=0 in degrees.
+
+    Returns:
+        Tuple with the arrays of ECEF x, y and z coordinates in meters.
+
+    """
+    return propagate(t, R_EQ + altitude, 0, inclination, raan, 0,
+                     arg_latitude, gmst)
+
+
+def time_series(inp, sat_x, sat_y, sat_z, rx_height=0):
+    """Evaluate the link budget over a series of satellite positions
+
+    Args:
+        inp       : LinkBudgetInput object. The satellite longitude (and the
+                    radar altitude) are ignored, given that the satellite
+                    position comes from the ECEF coordinates.
+        sat_x     : Array of satellite ECEF x coordinates in meters.
+        sat_y     : Array of satellite ECEF y coordinates in meters.
+        sat_z     : Array of satellite ECEF z coordinates in meters.
+        rx_height : Ellipsoidal height of the receiver station in meters.
+
+    Returns:
+        LinkBudgetResult object holding one element per epoch on its array
+        attributes. Epochs with the satellite below the horizon have negative
+        elevation and can be filtered out based on it.
+
+    Note:
+        Satellite positions given as geodetic samples (longitude, latitude
+        and altitude) can be converted first with pointing.geodetic_to_ecef.
+
+    """
+    geometry = pointing.look_angles_ecef(sat_x, sat_y, sat_z, inp.rx_long,
+                                         inp.rx_lat, rx_height)
+    return budget.compute(inp, geometry=geometry)
@@ -0,0 +1,111 @@
+"""Multi-process execution of large scenario batches
+
+Shards the scenarios into chunks and evaluates the chunks on a pool of worker
+processes. The results are returned in the same order as the inputs. Only a
+bounded number of chunks is in flight at any time, so the input can be an
+arbitrarily long stream.
+
+"""
+import itertools
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from . import batch, budget
+from .cache import LinkBudgetCache
+
+
+# Cache held by each worker process (see _worker_cache)
+_cache = None
+
+
+def _chunks(iterable, chunk_size):
+    """Split an iterable into lists of up to chunk_size elements"""
+    it = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(it, chunk_size))
+        if (not chunk):
+            return
+        yield chunk
+
+
+def _compute_chunk(inputs):
+    """Compute the link budget for a chunk of LinkBudgetInput objects"""
+    return [budget.compute(inp) for inp in inputs]
+
+
+def _worker_cache(cache_size):
+    """Get the cache of the current worker process, if enabled"""
+    global _cache
+    if (cache_size <= 0):
+        return None
+    if (_cache is None):
+        _cache = LinkBudgetCache(cache_size)
+    return _cache
+
+
+def _evaluate_chunk(scenarios, defaults, cache_size, solve_for, modcod):
+    """Evaluate a chunk of batch scenarios"""
+    return list(batch.evaluate(scenarios, defaults,
+                               _worker_cache(cache_size), solve_for, modcod))
+
+
+def _map_chunks(func, chunks, workers, *args):
+    """Map func over chunks on a process pool, preserving the order
+
+    Keeps up to two chunks per worker in flight, so that the workers stay
+    busy while the memory usage remains bounded.
+
+    """
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(executor.submit(func, chunk, *args))
+            if (len(pending) >= 2 * workers):
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+def compute(inputs, workers=None, chunk_size=1000):
+    """Compute the link budget of many inputs on multiple processes
+
+    Args:
+        inputs     : Iterable of LinkBudgetInput objects.
+        workers    : Number of worker processes (defaults to the number of
+                     CPUs).
+        chunk_size : Number of inputs processed by a worker at once.
+
+    Returns:
+        Generator of LinkBudgetResult objects, in the same order as the
+        inputs.
+
+    """
+    return _map_chunks(_compute_chunk, _chunks(inputs, chunk_size), workers)
+
+
+def evaluate(scenarios, defaults=None, workers=None, chunk_size=1000,
+             cache_size=0, solve_for=None, modcod=None):
+    """Parallel counterpart of batch.evaluate
+
+    Args:
+        scenarios  : Iterable of (line number, scenario) tuples, as produced
+                     by batch.read_jsonl or batch.read_csv.
+        defaults   : Optional dictionary with default parameters.
+        workers    : Number of worker processes (defaults to the number of
+                     CPUs).
+        chunk_size : Number of scenarios processed by a worker at once.
+        cache_size : Size of the look angle and dish gain caches held by
+                     each worker process, or 0 to disable caching.
+        solve_for  : Optional arguments of the inverse solver (see
+                     batch.evaluate).
+        modcod     : Optional arguments of the MODCOD selection (see
+                     batch.evaluate).
+
+    Returns:
+        Generator with one result dictionary per scenario, in the same order
+        as the scenarios.
+
+    """
+    return _map_chunks(_evaluate_chunk, _chunks(scenarios, chunk_size),
+                       workers, defaults, cache_size, solve_for, modcod)
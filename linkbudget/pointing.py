@@ -7,10 +7,9 @@ References:
  [2] https://en.wikipedia.org/wiki/Earth_radius.
 
 """
-import logging
 from math import sqrt, sin, asin, cos, acos, tan, atan, atan2, degrees, \
     radians
-import numpy as np
+from . import util
 
 
 def _look_angles_ellipsoidal(sat_long, rx_long, rx_lat, rx_height=0,
@@ -69,31 +68,33 @@ def _look_angles_ellipsoidal(sat_long, rx_long, rx_lat, rx_height=0,
     z_s = 0
 
     # Step 3: SATELLITE COMPONENTS ON LOCAL (x, y, z) COORDINATES
-    rect_coor = np.array([x_s, y_s, z_s]) - np.array([x_p, y_p, z_p])
+    dx = x_s - x_p
+    dy = y_s - y_p
+    dz = z_s - z_p
 
-    # rect_coor is a vector starting on the receiver position P and ending on
-    # the satellite S (i.e., the topocentric range PS). In other words, it
+    # (dx, dy, dz) is a vector starting on the receiver position P and ending
+    # on the satellite S (i.e., the topocentric range PS). In other words, it
     # represents the satellite rectangular coordinates referenced to the
     # receiver position. The Euclidean norm of the vector is the slant (or
     # topocentric) range:
-    slant_range = np.linalg.norm(rect_coor)
+    slant_range = sqrt(dx**2 + dy**2 + dz**2)
 
     # Step 4: SATELLITE COMPONENTS ON LOCAL (e, n, u)
     #
     # e-axis points to (geodetic) east; n to (geodetic) north; and u to
     # (geodetic) zenith.
-
-    # Rotation matrix - Eq. 9b from [1]:
-    rot_mtx = np.array([
-        [-sin(rx_long), cos(rx_long), 0],
-        [-sin(rx_lat)*cos(rx_long), -sin(rx_lat)*sin(rx_long), cos(rx_lat)],
-        [cos(rx_lat)*cos(rx_long), cos(rx_lat)*sin(rx_long), sin(rx_lat)]
-    ])
-    # Conversion using Eq. 10 [1]:
-    geodetic_coor = np.dot(rot_mtx, rect_coor)
+    #
+    # Conversion using Eq. 10 [1], with the rotation matrix of Eq. 9b [1]
+    # written out component by component:
+    sin_lat = sin(rx_lat)
+    cos_lat = cos(rx_lat)
+    sin_long = sin(rx_long)
+    cos_long = cos(rx_long)
+    e = -sin_long*dx + cos_long*dy
+    n = -sin_lat*cos_long*dx - sin_lat*sin_long*dy + cos_lat*dz
+    u = cos_lat*cos_long*dx + cos_lat*sin_long*dy + sin_lat*dz
 
     # Step 5: GEODETIC AZIMUTH AND GEODETIC VERTICAL ANGLE
-    e, n, u = geodetic_coor
     azimuth = atan2(e, n)
     vert_angle = atan(u / sqrt(e**2 + n**2))  # elevation
 
@@ -170,6 +171,216 @@ def _look_angles_spherical(sat_long, rx_long, rx_lat, sat_alt=35786e3):
     return v, alpha, d
 
 
+def geodetic_to_ecef(long, lat, height=0):
+    """Convert geodetic coordinates into earth-centered earth-fixed (ECEF)
+
+    Uses the GRS80 ellipsoid and Eq. 12 from [1]. Accepts scalars or arrays,
+    which are broadcast against each other.
+
+    Args:
+        long   : Geodetic longitude(s) in degrees
+        lat    : Geodetic latitude(s) in degrees
+        height : Ellipsoidal height(s) in meters
+
+    Returns:
+        Tuple with the x, y and z coordinates in meters.
+
+    """
+    import numpy as np
+    long = np.radians(long)
+    lat = np.radians(lat)
+
+    # Ellipsoid parameters from GRS80
+    f_inv = 298.257222100882711  # reciprocal flattening
+    f = 1 / f_inv  # flattening
+    e_sq = 2*f - f**2  # eccentricity squared
+    R_eq = 6378.137e3   # equatorial radius in meters (see [4])
+
+    sin_lat = np.sin(lat)
+    cos_lat = np.cos(lat)
+
+    # Principal radius of curvature in the prime vertical
+    N = R_eq / np.sqrt(1 - e_sq * sin_lat**2)
+    x = (N + height) * np.cos(long) * cos_lat
+    y = (N + height) * np.sin(long) * cos_lat
+    z = (N*(1 - e_sq) + height) * sin_lat
+    return x, y, z
+
+
+def look_angles_ecef(sat_x, sat_y, sat_z, rx_long, rx_lat, rx_height=0):
+    """Calculate look angles and slant ranges towards ECEF positions
+
+    Unlike look_angles, the reflector can be anywhere (e.g., on a non-
+    geostationary orbit), as given by its earth-centered earth-fixed (ECEF)
+    coordinates. Accepts scalars or arrays, which are broadcast against each
+    other. For example, the positions of a satellite over N epochs and a
+    single receiver station produce N look angles.
+
+    Args:
+        sat_x      : Satellite/reflector ECEF x coordinate(s) in meters
+        sat_y      : Satellite/reflector ECEF y coordinate(s) in meters
+        sat_z      : Satellite/reflector ECEF z coordinate(s) in meters
+        rx_long    : Longitude(s) of the receiver station(s) in degrees
+        rx_lat     : Geodetic latitute(s) of the receiver station(s) in degrees
+        rx_height  : Ellipsoidal height(s) of the receiver station(s) in
+                     meters
+
+    Returns:
+        Tuple with the arrays of elevation (degrees), azimuth (degrees) and
+        slant range (m).
+
+    """
+    import numpy as np
+    x_p, y_p, z_p = geodetic_to_ecef(rx_long, rx_lat, rx_height)
+
+    # Topocentric range PS:
+    dx = sat_x - x_p
+    dy = sat_y - y_p
+    dz = sat_z - z_p
+    slant_range = np.sqrt(dx**2 + dy**2 + dz**2)
+
+    # Local (e, n, u) components, i.e., Eq. 10 from [1] with the rotation
+    # matrix of Eq. 9b written out:
+    rx_long = np.radians(rx_long)
+    rx_lat = np.radians(rx_lat)
+    sin_lat = np.sin(rx_lat)
+    cos_lat = np.cos(rx_lat)
+    sin_long = np.sin(rx_long)
+    cos_long = np.cos(rx_long)
+    e = -sin_long*dx + cos_long*dy
+    n = -sin_lat*cos_long*dx - sin_lat*sin_long*dy + cos_lat*dz
+    u = cos_lat*cos_long*dx + cos_lat*sin_long*dy + sin_lat*dz
+
+    azimuth_degrees = np.degrees(np.arctan2(e, n)) % 360
+    elevation_degrees = np.degrees(np.arctan2(u, np.hypot(e, n)))
+    return elevation_degrees, azimuth_degrees, slant_range
+
+
+def _look_angles_ellipsoidal_batch(sat_long, rx_long, rx_lat, rx_height=0,
+                                   sat_alt=35786e3):
+    """Vectorized version of the ellipsoidal look angle computation
+
+    Implements the same steps as _look_angles_ellipsoidal, but with
+    element-wise operations over arrays. The rotation to local (e, n, u)
+    coordinates is expanded into the scalar components of Eq. 10 from [1]
+    (see look_angles_ecef), such that no matrix product is required per
+    station.
+
+    """
+    import numpy as np
+    R_eq = 6378.137e3   # equatorial radius in meters (see [4])
+    r = R_eq + sat_alt  # from the earth's center to the spacecraft
+
+    # Rectangular coordinates of the satellite over the equator:
+    sat_long = np.radians(sat_long)
+    return look_angles_ecef(r * np.cos(sat_long), r * np.sin(sat_long), 0,
+                            rx_long, rx_lat, rx_height)
+
+
+def _look_angles_spherical_batch(sat_long, rx_long, rx_lat, sat_alt=35786e3):
+    """Vectorized version of the spherical look angle computation
+
+    Implements the same steps as _look_angles_spherical, but with element-wise
+    operations over arrays.
+
+    """
+    import numpy as np
+    sat_long = np.radians(sat_long)
+    rx_long = np.radians(rx_long)
+    rx_lat = np.radians(rx_lat)
+
+    # Constants
+    R = 6371e3          # mean radius of the earth in meters
+    R_eq = 6378.137e3   # equatorial radius in meters (see [4])
+    r = R_eq + sat_alt  # from the earth's center to the spacecraft
+
+    # Equations (1), (2) and (4) from [1]:
+    cos_gamma = np.cos(rx_lat) * np.cos(sat_long - rx_long)
+    gamma = np.arccos(cos_gamma)
+    d = r * np.sqrt(1 + (R/r)**2 - 2*(R/r)*cos_gamma)
+    z = np.arcsin((r/d)*np.sin(gamma))
+    v = 90 - np.degrees(z)
+
+    # Angle of Equation (6) from [1] and the azimuth on each quadrant:
+    beta = np.degrees(np.arccos(np.tan(rx_lat)/np.tan(gamma)))
+    sat_to_west = sat_long < rx_long
+    alpha = np.where(
+        rx_lat > 0,
+        np.where(sat_to_west, 180 + beta, 180 - beta),
+        np.where(sat_to_west, 360 - beta, beta)
+    )
+
+    return v, alpha, d
+
+
+def look_angles_batch(sat_long, rx_long, rx_lat, rx_height=0,
+                      sat_alt=35786e3, implementation='ellipsoidal'):
+    """Calculate look angles (elevation, azimuth) and slant ranges in batch
+
+    Vectorized counterpart of look_angles. The satellite and receiver
+    coordinates can be given as arrays, which are broadcast against each
+    other. For example, an array of satellite longitudes with shape (1, S)
+    and receiver coordinates with shape (M, 1) produce the M x S matrix of
+    look angles for each station and satellite pair.
+
+    Args:
+        sat_long   : Subsatellite point's geodetic longitude(s)
+        rx_long    : Longitude(s) of the receiver station(s) in degrees
+        rx_lat     : Geodetic latitute(s) of the receiver station(s) in degrees
+        rx_height  : Orthometric height(s) (height above sea-evel). Only
+                     supported by the ellipsoidal implementation.
+        sat_alt    : Satellite/reflector altitude in meters (default to
+                     the geosynchronous altitude)
+
+    Returns:
+        Tuple with the arrays of elevation (degrees), azimuth (degrees) and
+        slant range (m).
+
+    """
+    if (implementation == 'ellipsoidal'):
+        return _look_angles_ellipsoidal_batch(sat_long, rx_long, rx_lat,
+                                              rx_height, sat_alt)
+    else:
+        return _look_angles_spherical_batch(sat_long, rx_long, rx_lat,
+                                            sat_alt)
+
+
+def off_axis_angle(elevation, azimuth, elevation_2, azimuth_2):
+    """Angle between two pointing directions seen from the same station
+
+    Computes the great-circle separation between the directions given by
+    two pairs of look angles, e.g., between the wanted satellite (the
+    antenna boresight) and an interfering satellite. Accepts scalars or
+    arrays, which are broadcast against each other.
+
+    Args:
+        elevation   : Elevation(s) of the first direction in degrees
+        azimuth     : Azimuth(s) of the first direction in degrees
+        elevation_2 : Elevation(s) of the second direction in degrees
+        azimuth_2   : Azimuth(s) of the second direction in degrees
+
+    Returns:
+        Off-axis angle(s) in degrees, from 0 to 180.
+
+    """
+    # Haversine formula, which is well-conditioned for small angles
+    if (util.is_scalar(elevation, azimuth, elevation_2, azimuth_2)):
+        el_1 = radians(elevation)
+        el_2 = radians(elevation_2)
+        d_az = radians(azimuth_2 - azimuth)
+        h = sin((el_2 - el_1) / 2)**2 + cos(el_1) * cos(el_2) * \
+            sin(d_az / 2)**2
+        return degrees(2 * asin(sqrt(min(max(h, 0), 1))))
+
+    import numpy as np
+    el_1 = np.radians(elevation)
+    el_2 = np.radians(elevation_2)
+    d_az = np.radians(np.subtract(azimuth_2, azimuth))
+    h = np.sin((el_2 - el_1) / 2)**2 + np.cos(el_1) * np.cos(el_2) * \
+        np.sin(d_az / 2)**2
+    return np.degrees(2 * np.arcsin(np.sqrt(np.clip(h, 0, 1))))
+
+
 def look_angles(sat_long, rx_long, rx_lat, sat_alt=35786e3,
                 implementation='ellipsoidal'):
     """Calculate look angles (elevation, azimuth) and slant range
@@ -188,11 +399,18 @@ def look_angles(sat_long, rx_long, rx_lat, sat_alt=35786e3,
     Note:
         - Positive longitudes are east, whereas negative longitudes are to the
           west.
+        - Scalar coordinates are processed with the math module only, which
+          is the fastest option for a single station. Array coordinates are
+          dispatched to look_angles_batch.
 
     Returns:
         Tuple with elevation (degrees), azimuth (degrees) and slant range (m).
 
     """
+    if (not util.is_scalar(sat_long, rx_long, rx_lat, sat_alt)):
+        return look_angles_batch(sat_long, rx_long, rx_lat, sat_alt=sat_alt,
+                                 implementation=implementation)
+
     if (implementation == 'ellipsoidal'):
         elev, azt, d = _look_angles_ellipsoidal(sat_long, rx_long, rx_lat,
                                                 sat_alt=sat_alt)
@@ -200,8 +418,4 @@ def look_angles(sat_long, rx_long, rx_lat, sat_alt=35786e3,
         elev, azt, d = _look_angles_spherical(sat_long, rx_long, rx_lat,
                                               sat_alt=sat_alt)
 
-    logging.info("Elevation:          {:6.2f} degrees".format(elev))
-    logging.info("Azimuth:            {:6.2f} degrees".format(azt))
-    logging.info("Distance:           {:8.2f} km".format(d/1e3))
-
     return elev, azt, d
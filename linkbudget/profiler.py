@@ -0,0 +1,150 @@
+"""Opt-in profiling of the link budget computation
+
+Records the wall time and the number of calls of each stage of the link
+budget computation (see budget.STAGES), of budget.compute, and of the public
+functions of the calc, pointing, noise and atmosphere modules.
+
+The instrumentation is installed only while a profiling() context is active,
+by replacing the module attributes with timed wrappers, and removed on exit.
+Hence, the computation runs the original functions, with no overhead at all,
+when profiling is disabled. The timings are inclusive (e.g., the time of a
+stage includes the time of the calc functions it calls) and are aggregated
+over all calls, e.g., over all scenarios of a batch. A Profiler object can
+also be reused across several profiling() contexts to aggregate the timings
+of multiple runs.
+
+Note the instrumentation is process-wide: while active, it records the calls
+made from all threads of the process, but not the calls made by other
+processes (e.g., the worker processes of the parallel module).
+
+"""
+import contextlib
+import functools
+import inspect
+import time
+from . import atmosphere, budget, calc, noise, pointing
+
+
+# Modules whose public functions are instrumented
+_MODULES = (calc, pointing, noise, atmosphere)
+
+# Profiler receiving the timings while a profiling() context is active
+_active = None
+
+
+class Profiler:
+    """Aggregated call counts and wall times
+
+    Attributes:
+        timings : Dictionary mapping each instrumented name (e.g.,
+                  'stage.noise' or 'calc.dish_gain') to a list with the number
+                  of calls and the total wall time in seconds.
+
+    """
+    def __init__(self):
+        self.timings = {}
+
+    def record(self, name, elapsed):
+        """Record one call taking the given wall time in seconds"""
+        timing = self.timings.get(name)
+        if (timing is None):
+            self.timings[name] = [1, elapsed]
+        else:
+            timing[0] += 1
+            timing[1] += elapsed
+
+    def reset(self):
+        """Discard the recorded timings"""
+        self.timings.clear()
+
+    def to_dict(self):
+        """Timing breakdown sorted by decreasing total time
+
+        Returns:
+            Dictionary mapping each instrumented name to a dictionary with
+            the number of calls, the total time in seconds and the mean time
+            per call in microseconds.
+
+        """
+        return {
+            name: {
+                'calls': calls,
+                'total_s': total,
+                'mean_us': total / calls * 1e6
+            }
+            for name, (calls, total) in sorted(
+                self.timings.items(), key=lambda item: -item[1][1])
+        }
+
+    def render(self):
+        """Render the timing breakdown as human-readable lines"""
+        lines = ["{:<40s} {:>10s} {:>12s} {:>12s}".format(
+            "Function", "Calls", "Total (ms)", "Mean (us)")]
+        for name, timing in self.to_dict().items():
+            lines.append("{:<40s} {:>10d} {:>12.3f} {:>12.3f}".format(
+                name, timing['calls'], timing['total_s'] * 1e3,
+                timing['mean_us']))
+        return lines
+
+
+def _timed(profiler, name, func):
+    """Wrap a function such that its calls are recorded by the profiler"""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            profiler.record(name, time.perf_counter() - start)
+    return wrapper
+
+
+def _public_functions(module):
+    """Public functions defined in a module"""
+    return [name for name, obj in vars(module).items()
+            if inspect.isfunction(obj) and not name.startswith('_') and
+            obj.__module__ == module.__name__]
+
+
+@contextlib.contextmanager
+def profiling(profiler=None):
+    """Context manager enabling the profiling
+
+    Args:
+        profiler : Optional Profiler object receiving the timings, e.g., to
+                   aggregate the timings of multiple runs. A new Profiler is
+                   created by default.
+
+    Yields:
+        The Profiler object receiving the timings.
+
+    Raises:
+        RuntimeError: if profiling is already active.
+
+    """
+    global _active
+    if (_active is not None):
+        raise RuntimeError("Profiling is already active")
+    profiler = Profiler() if profiler is None else profiler
+
+    originals = [(budget, 'STAGES', budget.STAGES),
+                 (budget, 'compute', budget.compute)]
+    for module in _MODULES:
+        originals += [(module, name, getattr(module, name))
+                      for name in _public_functions(module)]
+
+    _active = profiler
+    try:
+        budget.STAGES = tuple(
+            stage._replace(func=_timed(profiler, 'stage.' + stage.name,
+                                       stage.func))
+            for stage in budget.STAGES)
+        for module, name, func in originals[1:]:
+            short_name = module.__name__.rsplit('.', 1)[-1]
+            setattr(module, name,
+                    _timed(profiler, short_name + '.' + name, func))
+        yield profiler
+    finally:
+        for module, name, original in originals:
+            setattr(module, name, original)
+        _active = None
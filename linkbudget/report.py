@@ -0,0 +1,127 @@
+"""Human-readable link budget reports"""
+import logging
+from . import util
+
+
+def render(inp, res):
+    """Render the link budget results as human-readable lines
+
+    Args:
+        inp : LinkBudgetInput object.
+        res : LinkBudgetResult object computed for the given input.
+
+    Returns:
+        List of strings, one per reported quantity.
+
+    """
+    lines = [
+        "Elevation:          {:6.2f} degrees".format(res.elevation),
+        "Azimuth:            {:6.2f} degrees".format(res.azimuth),
+        "Distance:           {:8.2f} km".format(res.slant_range/1e3)
+    ]
+
+    if (inp.eirp is None):
+        if (inp.tx_dish_gain is None):
+            lines.append("Tx dish gain:       {:6.2f} dB".format(
+                res.tx_dish_gain_db))
+        lines.append("Tx Power:           {:6.2f} kW".format(
+            util.db_to_abs(inp.tx_power)/1e3))
+
+    lines.append("EIRP:               {:6.2f} dBW ({:6.2f} kW)".format(
+        res.eirp_db, util.db_to_abs(res.eirp_db)/1e3))
+    lines.append("Path loss:          {:6.2f} dB".format(res.path_loss_db))
+
+    if (inp.atmosphere or inp.rain_rate is not None or
+            inp.cloud_liquid is not None):
+        lines.append("Gaseous loss:       {:6.2f} dB".format(res.gas_loss_db))
+        if (inp.cloud_liquid is not None):
+            lines.append("Cloud loss:         {:6.2f} dB".format(
+                res.cloud_loss_db))
+        if (inp.rain_rate is not None):
+            lines.append("Rain loss:          {:6.2f} dB".format(
+                res.rain_loss_db))
+
+    if (inp.rx_dish_gain is None):
+        lines.append("Rx dish gain:       {:6.2f} dB".format(
+            res.rx_dish_gain_db))
+
+    if (inp.noise_chain is None):
+        lines += [
+            "Coax loss:          {:6.2f} dB".format(res.coax_loss_db),
+            "Coax noise figure:  {:6.2f} dB".format(res.coax_noise_fig_db),
+            "LNB noise figure:   {:6.2f} dB".format(res.lnb_noise_fig_db)
+        ]
+    else:
+        lines.append("Noise chain:        {:d} devices".format(
+            len(inp.noise_chain)))
+
+    lines += [
+        "Rx noise figure:    {:6.2f} dB".format(res.noise_fig_db),
+        "Antenna noise temp: {:6.2f} K".format(inp.antenna_noise_temp),
+        "Input-noise temp:   {:6.2f} K".format(res.input_noise_temp_k),
+        "System noise temp:  {:6.2f} K".format(res.sys_noise_temp_k),
+        "Rx Power:           {:6.2f} dBm".format(res.rx_power_dbw + 30),
+        "(G/T):              {:6.2f} dB/K".format(res.g_over_t_db),
+        "(C/N):              {:6.2f} dB".format(res.cnr_db),
+        "Capacity:           {}".format(util.format_rate(res.capacity_bps))
+    ]
+    return lines
+
+
+def render_interference(res):
+    """Render the interference results of a single station
+
+    Args:
+        res : interference.InterferenceResult tuple computed for scalar
+              inputs.
+
+    Returns:
+        List of strings, one per reported quantity.
+
+    """
+    return [
+        "Interferers:        {:d}".format(len(res.off_axis)),
+        "Min off-axis angle: {:6.2f} degrees".format(min(res.off_axis)),
+        "Interference:       {:6.2f} dBm".format(
+            res.total_interference_dbw + 30),
+        "(C/I):              {:6.2f} dB".format(res.cir_db),
+        "(C/(N+I)):          {:6.2f} dB".format(res.cnir_db),
+        "Capacity w/ interf: {}".format(util.format_rate(res.capacity_bps))
+    ]
+
+
+def render_modcod(sel):
+    """Render the MODCOD selected for a single C/N value
+
+    Args:
+        sel : modcod.ModcodSelection tuple computed for a scalar C/N.
+
+    Returns:
+        List of strings, one per reported quantity.
+
+    """
+    return [
+        "MODCOD:             {}".format(sel.modcod or "None"),
+        "(Es/N0):            {:6.2f} dB".format(sel.esno_db),
+        "MODCOD margin:      {:6.2f} dB".format(sel.margin_db),
+        "Net bitrate:        {}".format(util.format_rate(sel.bitrate_bps))
+    ]
+
+
+def log(inp, res, interference=None, modcod=None):
+    """Log the human-readable link budget report
+
+    Args:
+        inp          : LinkBudgetInput object.
+        res          : LinkBudgetResult object computed for the given input.
+        interference : Optional InterferenceResult tuple to be reported.
+        modcod       : Optional ModcodSelection tuple to be reported.
+
+    """
+    lines = render(inp, res)
+    if (interference is not None):
+        lines += render_interference(interference)
+    if (modcod is not None):
+        lines += render_modcod(modcod)
+    for line in lines:
+        logging.info(line)
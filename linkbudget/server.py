@@ -0,0 +1,432 @@
+"""HTTP/JSON service mode
+
+Long-running server exposing the link budget analysis over HTTP/1.1, such
+that clients calling it repeatedly do not pay the start-up cost of a new
+process per call. The process stays warm: the modules (including NumPy and
+the atmospheric tables) are imported once on start-up, and the look angles
+and dish gains are memoized across requests (see the cache module).
+
+Endpoints:
+    POST /analyze : Body with a JSON object defining one scenario, with the
+                    same keys as the batch mode (e.g., "rx-dish-size").
+                    Returns the result dictionary of main.analyze.
+    POST /batch   : Body with a JSON array of scenarios. Returns an array
+                    with one result dictionary per scenario, or a dictionary
+                    with a single "error" key for invalid scenarios.
+    GET /health   : Liveness check.
+    GET /stats    : Request counters, micro-batching and cache statistics.
+
+Connections are persistent (keep-alive) and support pipelining: the requests
+received on a connection are processed concurrently, while the responses are
+sent back in the order of the requests.
+
+Concurrent /analyze requests, whether from different connections or
+pipelined on the same connection, are micro-batched: the requests received
+within the same event loop iteration (or within an optional wait window) are
+evaluated together by a coalesce.AsyncCoalescer, which vectorizes the
+evaluation when enough requests are pending. Under light load, a request is
+evaluated right away on the scalar path.
+
+The server is implemented on asyncio streams, with the standard library
+only.
+
+"""
+import argparse
+import asyncio
+import dataclasses
+import json
+import logging
+import time
+from . import atmosphere, batch, budget
+from .cache import LinkBudgetCache
+from .coalesce import AsyncCoalescer
+
+
+logger = logging.getLogger(__name__)
+
+MAX_HEADERS = 100  # maximum number of header lines per request
+
+_REASONS = {
+    200: 'OK',
+    400: 'Bad Request',
+    404: 'Not Found',
+    405: 'Method Not Allowed',
+    411: 'Length Required',
+    413: 'Payload Too Large',
+    500: 'Internal Server Error',
+}
+
+
+class HTTPError(Exception):
+    """Error reported to the client with the given HTTP status code"""
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+async def _read_request(reader, max_body):
+    """Read one HTTP request from the stream
+
+    Returns:
+        Tuple with the method, the path, the body and whether the connection
+        should be kept alive, or None if the client closed the connection.
+
+    Raises:
+        HTTPError: if the request is malformed or not supported. The
+            connection must be closed afterwards, given that the rest of the
+            request is not consumed.
+
+    """
+    try:
+        line = await reader.readline()
+    except ValueError:  # line longer than the stream limit
+        raise HTTPError(400, "Request line too long")
+    if (not line.endswith(b'\n')):
+        return None
+    try:
+        method, target, version = line.decode('latin-1').split()
+    except ValueError:
+        raise HTTPError(400, "Malformed request line")
+    if (not version.startswith('HTTP/1.')):
+        raise HTTPError(400, "Unsupported protocol version")
+
+    headers = {}
+    for _ in range(MAX_HEADERS):
+        try:
+            line = await reader.readline()
+        except ValueError:
+            raise HTTPError(400, "Header line too long")
+        if (not line.endswith(b'\n')):
+            return None
+        if (line in (b'\r\n', b'\n')):
+            break
+        name, sep, value = line.decode('latin-1').partition(':')
+        if (not sep):
+            raise HTTPError(400, "Malformed header line")
+        headers[name.strip().lower()] = value.strip()
+    else:
+        raise HTTPError(400, "Too many header lines")
+
+    if ('transfer-encoding' in headers):
+        raise HTTPError(411, "Chunked requests are not supported")
+    try:
+        length = int(headers.get('content-length', 0))
+    except ValueError:
+        raise HTTPError(400, "Invalid Content-Length")
+    if (length < 0):
+        raise HTTPError(400, "Invalid Content-Length")
+    if (length > max_body):
+        raise HTTPError(413, "Request body larger than {} bytes".format(
+            max_body))
+    try:
+        body = await reader.readexactly(length)
+    except asyncio.IncompleteReadError:
+        return None
+
+    connection = headers.get('connection', '').lower()
+    if (version == 'HTTP/1.0'):
+        keep_alive = connection == 'keep-alive'
+    else:
+        keep_alive = connection != 'close'
+    return method, target.split('?', 1)[0], body, keep_alive
+
+
+def _response(status, payload, keep_alive):
+    """Serialize an HTTP response with a JSON body"""
+    body = json.dumps(payload).encode()
+    head = ("HTTP/1.1 {} {}\r\n"
+            "Content-Type: application/json\r\n"
+            "Content-Length: {}\r\n"
+            "Connection: {}\r\n\r\n").format(
+                status, _REASONS[status], len(body),
+                'keep-alive' if keep_alive else 'close')
+    return head.encode('latin-1') + body
+
+
+def _parse_json(body):
+    try:
+        return json.loads(body)
+    except ValueError:
+        raise HTTPError(400, "Invalid JSON body")
+
+
+def _evaluate_batch(scenarios, cache):
+    """Evaluate the scenarios of a /batch request"""
+    outputs = [None] * len(scenarios)
+    inputs = []
+    indexes = []
+    for i, scenario in enumerate(scenarios):
+        try:
+            inputs.append(batch.to_input(scenario))
+            indexes.append(i)
+        except ValueError as e:
+            outputs[i] = {'error': "scenario {}: {}".format(i + 1, e)}
+    for i, res in zip(indexes, budget.compute_many(inputs, cache)):
+        if (isinstance(res, Exception)):
+            outputs[i] = {'error': "scenario {}: {}".format(i + 1, res)}
+        else:
+            outputs[i] = res.to_dict()
+    return outputs
+
+
+def warm_up(cache=None):
+    """Load the lazily imported modules and tables and fill the cache
+
+    Evaluates a reference scenario on the scalar and on the vectorized code
+    paths, such that the first requests do not pay the import costs.
+
+    """
+    atmosphere.gas_loss(12e9, 45)  # builds the atmospheric tables
+    inp = budget.LinkBudgetInput(
+        eirp=52, freq=12.45e9, if_bw=24e6, rx_dish_size=0.46,
+        antenna_noise_temp=20, lnb_noise_fig=0.6, lnb_gain=40,
+        coax_length=110, rx_noise_fig=10, sat_long=-101, rx_long=-82.43,
+        rx_lat=29.71, rain_rate=10)
+    budget.compute(inp, cache)
+    budget.compute_many([dataclasses.replace(inp, rx_lat=lat)
+                         for lat in range(budget.MIN_STACK_SIZE)])
+
+
+class LinkBudgetServer:
+    """Link budget HTTP/JSON server
+
+    Args:
+        host         : Address to listen on.
+        port         : Port to listen on. Set to 0 to pick a free port (see
+                       the port attribute once started).
+        max_batch    : Maximum micro-batch size (see
+                       coalesce.AsyncCoalescer).
+        max_wait     : Micro-batching window in seconds (see
+                       coalesce.AsyncCoalescer).
+        cache_size   : Number of look angle and dish gain results memoized
+                       across requests. Set to 0 to disable caching.
+        max_body     : Maximum request body size in bytes.
+        max_pipeline : Maximum number of requests in flight per connection.
+                       Further pipelined requests are only read once the
+                       earlier responses are sent.
+
+    """
+    def __init__(self, host='127.0.0.1', port=8000, max_batch=256,
+                 max_wait=0.0, cache_size=4096, max_body=2**24,
+                 max_pipeline=64):
+        self.host = host
+        self.port = port
+        self.max_body = max_body
+        self.max_pipeline = max_pipeline
+        self.cache = LinkBudgetCache(cache_size) if cache_size > 0 else None
+        self.coalescer = AsyncCoalescer(max_batch, max_wait, self.cache)
+        self._routes = {
+            '/analyze': ('POST', self._analyze),
+            '/batch': ('POST', self._batch),
+            '/health': ('GET', self._health),
+            '/stats': ('GET', self._stats),
+        }
+        self._requests = {path: 0 for path in self._routes}
+        self._errors = 0
+        self._connections = 0
+        self._open = {}  # open connections, as handler task -> writer
+        self._start_time = None
+        self._server = None
+
+    async def start(self):
+        """Warm up and start listening"""
+        warm_up(self.cache)
+        self._server = await asyncio.start_server(
+            self._handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._start_time = time.monotonic()
+        logger.info("Serving on http://{}:{}".format(self.host, self.port))
+
+    async def serve_forever(self):
+        """Start (if not started yet) and serve until cancelled"""
+        if (self._server is None):
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        """Stop listening, close the open connections and wait for them"""
+        self._server.close()
+        handlers = list(self._open)
+        for writer in self._open.values():
+            writer.close()
+        await asyncio.gather(*handlers, return_exceptions=True)
+        await self._server.wait_closed()
+
+    def stats(self):
+        """Server statistics returned by the /stats endpoint"""
+        return {
+            'uptime_s': time.monotonic() - self._start_time,
+            'connections': self._connections,
+            'requests': dict(self._requests),
+            'errors': self._errors,
+            'micro_batches': self.coalescer.stats(),
+            'cache': None if self.cache is None else self.cache.stats()
+        }
+
+    async def _handle_connection(self, reader, writer):
+        self._connections += 1
+        handler = asyncio.current_task()
+        self._open[handler] = writer
+        # Responses in the order of the requests, as (task, keep-alive)
+        queue = asyncio.Queue(self.max_pipeline)
+        sender = asyncio.ensure_future(self._send_responses(writer, queue))
+        try:
+            try:
+                await self._read_requests(reader, queue)
+            except ConnectionError:
+                pass
+            await queue.put(None)
+            await sender
+        except asyncio.CancelledError:
+            sender.cancel()
+            raise
+        finally:
+            del self._open[handler]
+            writer.close()
+
+    async def _read_requests(self, reader, queue):
+        """Read the requests of a connection and queue their handlers"""
+        while True:
+            try:
+                request = await _read_request(reader, self.max_body)
+            except HTTPError as e:
+                error = asyncio.get_running_loop().create_future()
+                error.set_result((e.status, {'error': e.message}))
+                self._errors += 1
+                await queue.put((error, False))
+                return
+            if (request is None):
+                return
+            method, path, body, keep_alive = request
+            task = asyncio.ensure_future(self._dispatch(method, path, body))
+            await queue.put((task, keep_alive))
+            if (not keep_alive):
+                return
+
+    async def _send_responses(self, writer, queue):
+        closed = False
+        while True:
+            item = await queue.get()
+            if (item is None):
+                return
+            task, keep_alive = item
+            status, payload = await task
+            if (closed):
+                continue
+            try:
+                writer.write(_response(status, payload, keep_alive))
+                # Write the responses to pipelined requests together
+                if (queue.empty()):
+                    await writer.drain()
+            except ConnectionError:
+                closed = True
+
+    async def _dispatch(self, method, path, body):
+        """Run the endpoint handler
+
+        Returns:
+            Tuple with the HTTP status code and the JSON-serializable
+            response payload.
+
+        """
+        try:
+            route = self._routes.get(path)
+            if (route is None):
+                raise HTTPError(404, "Unknown endpoint {}".format(path))
+            self._requests[path] += 1
+            if (method != route[0]):
+                raise HTTPError(405, "Use {} on {}".format(route[0], path))
+            return 200, await route[1](body)
+        except HTTPError as e:
+            self._errors += 1
+            return e.status, {'error': e.message}
+        except Exception:
+            logger.exception("Failed to process {} {}".format(method, path))
+            self._errors += 1
+            return 500, {'error': "Internal server error"}
+
+    async def _analyze(self, body):
+        try:
+            inp = batch.to_input(_parse_json(body))
+            res = await self.coalescer.analyze(inp)
+        except (ValueError, ArithmeticError) as e:
+            raise HTTPError(400, str(e))
+        return res.to_dict()
+
+    async def _batch(self, body):
+        scenarios = _parse_json(body)
+        if (not isinstance(scenarios, list)):
+            raise HTTPError(400, "Expected a JSON array of scenarios")
+        # Evaluated on a separate thread, so that large batches do not block
+        # the other requests
+        return await asyncio.get_running_loop().run_in_executor(
+            None, _evaluate_batch, scenarios, self.cache)
+
+    async def _health(self, body):
+        return {'status': 'ok'}
+
+    async def _stats(self, body):
+        return self.stats()
+
+
+def get_parser():
+    """Command-line arguments of the serve mode"""
+    parser = argparse.ArgumentParser(
+        prog='link-budget serve',
+        description="Link budget HTTP/JSON server",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter
+    )
+    parser.add_argument('--host', default='127.0.0.1',
+                        help='Address to listen on.')
+    parser.add_argument('--port', type=int, default=8000,
+                        help='Port to listen on.')
+    parser.add_argument(
+        '--max-batch',
+        type=int,
+        default=256,
+        help='Maximum number of concurrent /analyze requests evaluated '
+        'together in a vectorized batch.'
+    )
+    parser.add_argument(
+        '--max-wait',
+        type=float,
+        default=0,
+        help='Time in microseconds that an /analyze request waits for '
+        'other requests to batch with. By default, only the requests '
+        'received concurrently are batched, with no added latency.'
+    )
+    parser.add_argument(
+        '--cache-size',
+        type=int,
+        default=4096,
+        help='Number of look angle and dish gain results memoized across '
+        'requests. Set to 0 to disable caching.'
+    )
+    parser.add_argument(
+        '--max-body',
+        type=int,
+        default=2**24,
+        help='Maximum request body size in bytes.'
+    )
+    return parser
+
+
+def main(argv=None):
+    """Entry point of the serve mode (link-budget serve)"""
+    parser = get_parser()
+    args = parser.parse_args(argv)
+    if (args.max_batch < 1 or args.max_wait < 0 or args.cache_size < 0 or
+            args.max_body < 0):
+        parser.error("arguments --max-batch, --max-wait, --cache-size and "
+                     "--max-body must be non-negative (and --max-batch "
+                     "positive)")
+    logging.basicConfig(level=logging.INFO)
+    server = LinkBudgetServer(args.host, args.port, args.max_batch,
+                              args.max_wait * 1e-6, args.cache_size,
+                              args.max_body)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
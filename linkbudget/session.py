@@ -0,0 +1,119 @@
+"""Incremental link budget evaluation
+
+A LinkBudgetSession holds a link budget scenario and the outputs of each
+stage of the computation (see budget.STAGES). When parameters are updated,
+only the stages depending on them, directly or through upstream stages, are
+recomputed. For example, changing the coax length reruns the noise, C/N and
+capacity stages, while the look angles are reused.
+
+"""
+import copy
+import dataclasses
+from . import budget, util
+
+
+_FIELDS = {f.name for f in dataclasses.fields(budget.LinkBudgetInput)}
+
+
+def _changed(old, new):
+    """Check whether a parameter value has changed
+
+    Arrays are compared by identity, so replacing an array by another one
+    with the same values still counts as a change.
+
+    """
+    if (old is new):
+        return False
+    return not (util.is_scalar(old, new) and old == new)
+
+
+class LinkBudgetSession:
+    """Stateful link budget evaluation with per-stage caching
+
+    Args:
+        inp   : LinkBudgetInput object with the initial scenario.
+        cache : Optional cache.LinkBudgetCache object used by the pointing
+                and dish gain computations.
+
+    """
+    def __init__(self, inp, cache=None):
+        inp.validate()
+        self.inp = inp
+        self._cache = cache
+        self._res = {}
+        self._dirty = {stage.name for stage in budget.STAGES}
+        self._computed = {stage.name: 0 for stage in budget.STAGES}
+        self._reused = {stage.name: 0 for stage in budget.STAGES}
+
+    def update(self, **params):
+        """Update parameters of the scenario
+
+        A parameter also replaces its mutually exclusive alternatives (e.g.,
+        setting rx_dish_gain clears rx_dish_size). The stages depending on
+        the changed parameters are invalidated and recomputed on the next
+        call to result().
+
+        Raises:
+            ValueError: if a parameter is unknown or if the updated scenario
+                is inconsistent, in which case the session is not modified.
+
+        """
+        for name in params:
+            if (name not in _FIELDS):
+                raise ValueError("Unknown parameter \"{}\"".format(name))
+
+        replaced = {}
+        for name in params:
+            for alternatives in budget.EXCLUSIVE_PARAMS:
+                if (name in alternatives):
+                    replaced.update({other: None for other in alternatives})
+        replaced.update(params)
+
+        # Shallow copy instead of dataclasses.replace, which is slower
+        inp = copy.copy(self.inp)
+        for name, val in replaced.items():
+            setattr(inp, name, val)
+        inp.validate()
+
+        changed = {name for name, val in replaced.items()
+                   if _changed(getattr(self.inp, name), val)}
+        for stage in budget.STAGES:
+            if (changed.intersection(stage.params)):
+                self._dirty.add(stage.name)
+        self.inp = inp
+
+    def result(self):
+        """Compute the link budget, rerunning only the invalidated stages
+
+        Returns:
+            LinkBudgetResult object.
+
+        """
+        for stage in budget.STAGES:
+            if (stage.name in self._dirty or
+                    self._dirty.intersection(stage.deps)):
+                stage.func(self.inp, self._res, self._cache)
+                self._dirty.add(stage.name)  # invalidates the dependents
+                self._computed[stage.name] += 1
+            else:
+                self._reused[stage.name] += 1
+        self._dirty.clear()
+        return budget.LinkBudgetResult(**self._res)
+
+    def stats(self):
+        """Number of times each stage was computed or reused
+
+        Returns:
+            Dictionary mapping each stage name to a dictionary with the
+            number of evaluations in which the stage was recomputed
+            ("computed") and in which its cached outputs were reused
+            ("reused").
+
+        """
+        return {
+            name: {
+                'computed': self._computed[name],
+                'reused': self._reused[name]
+            }
+            for name in self._computed
+        }
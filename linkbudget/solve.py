@@ -0,0 +1,199 @@
+"""Inverse link budget solver
+
+Finds the value of one free parameter that achieves a target C/N or channel
+capacity, e.g., the smallest dish size that yields 6 dB of C/N at a given
+site. The link budget is first evaluated with the free parameter set to a
+reference value, and the margin relative to the target is then converted
+into the required parameter value:
+
+- With closed-form dB algebra for the parameters on which the C/N depends
+  monotonically and invertibly (EIRP, Tx power, dish size, IF bandwidth for a
+  C/N target, coax length and LNB noise figure).
+- With vectorized bisection for the IF bandwidth under a capacity target,
+  given that the capacity depends on the bandwidth both directly and through
+  the C/N.
+
+Like budget.compute, the solver accepts array parameters (e.g., thousands of
+receiver sites) and processes them element-wise in a single pass. Targets
+that cannot be achieved produce NaN.
+
+"""
+import dataclasses
+import math
+from . import budget, calc, util
+
+
+# Free parameters supported by the solver and the reference values used to
+# evaluate the link budget before solving
+FREE_PARAMS = {
+    'rx_dish_size': 1.0,
+    'eirp': 0.0,
+    'tx_power': 0.0,
+    'coax_length': 0.0,
+    'lnb_noise_fig': 1.0,
+    'if_bw': 1e6,
+}
+
+
+def _feasible_db(val):
+    """Convert factors of at least 1 (0 dB) to dB, with NaN for the others"""
+    if (util.is_scalar(val)):
+        return util.abs_to_db(val) if val >= 1 else math.nan
+    import numpy as np
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(val >= 1, util.abs_to_db(val), np.nan)
+
+
+def _bisect(func, lo, hi, n_iter=100):
+    """Find the roots of an increasing function by vectorized bisection
+
+    Bisects in the logarithmic domain, given that the search interval can
+    span several orders of magnitude. All elements are bisected in lockstep.
+
+    Args:
+        func   : Element-wise increasing function.
+        lo     : Array of lower bounds, where func is negative.
+        hi     : Array of upper bounds, where func is non-negative.
+        n_iter : Number of iterations.
+
+    """
+    import numpy as np
+    log_lo = np.log(lo)
+    log_hi = np.log(hi)
+    for _ in range(n_iter):
+        log_mid = (log_lo + log_hi) / 2
+        below = func(np.exp(log_mid)) < 0
+        log_lo = np.where(below, log_mid, log_lo)
+        log_hi = np.where(below, log_hi, log_mid)
+    return np.exp((log_lo + log_hi) / 2)
+
+
+def _solve_if_bw_capacity(cnr_db, bw, target_capacity):
+    """IF bandwidth achieving a target capacity
+
+    The received power over the noise density (S = C/N0 in Hz) does not
+    depend on the bandwidth. Hence, the capacity B*log2(1 + S/B) increases
+    with the bandwidth B towards S/ln(2), which bounds the achievable
+    capacity.
+
+    """
+    import numpy as np
+    S = np.asarray(util.db_to_abs(cnr_db) * bw, dtype=float)
+    C = np.broadcast_to(np.asarray(target_capacity, dtype=float), S.shape)
+    feasible = (C > 0) & (C < S / np.log(2))
+
+    # Bracket: since log2(1 + x) >= x / ((1 + x) ln(2)), the capacity is at
+    # least C for B >= hi. For the lower bound, the capacity is of the order
+    # of C for B = C / log2(2S/C), given that log2(1 + x) <= log2(2x) for x
+    # >= 1, so it is well below C three orders of magnitude below that.
+    with np.errstate(divide='ignore', invalid='ignore'):
+        hi = np.where(feasible, S / (S / (C * np.log(2)) - 1), 1)
+        lo = np.where(feasible, C / np.maximum(np.log2(2 * S / C), 1) / 1e3,
+                      1)
+        lo = np.minimum(lo, hi / 2)
+
+        def excess(B):
+            return B * np.log2(1 + S / B) - C
+
+        bw_req = _bisect(excess, lo, hi)
+
+    res = np.where(feasible, bw_req, np.nan)
+    return res if res.ndim else float(res)
+
+
+def _noise_chain_terms(res, inp):
+    """Linear quantities of the default LNB -> coax -> receiver chain"""
+    F_lnb = util.db_to_abs(res.lnb_noise_fig_db)
+    G_lnb = util.db_to_abs(inp.lnb_gain)
+    L_coax = util.db_to_abs(res.coax_loss_db)
+    F_rx = util.db_to_abs(inp.rx_noise_fig)
+    return F_lnb, G_lnb, L_coax, F_rx
+
+
+def _required_noise_factor(res, inp, margin_db):
+    """Overall noise factor of the receiver achieving the target C/N"""
+    # The C/N changes dB for dB with the system noise temperature
+    T_sys = res.sys_noise_temp_k * util.db_to_abs(margin_db)
+    Te = T_sys - inp.antenna_noise_temp
+    return 1 + Te / calc.T0
+
+
+def solve(inp, param, cnr_db=None, capacity_bps=None):
+    """Solve for the parameter value achieving a target C/N or capacity
+
+    Args:
+        inp          : LinkBudgetInput object with the fixed parameters. The
+                       value of the free parameter, if defined, is ignored,
+                       as well as the values of its mutually exclusive
+                       alternatives (e.g., rx_dish_gain when solving for
+                       rx_dish_size).
+        param        : Free parameter (see FREE_PARAMS).
+        cnr_db       : Target C/N in dB.
+        capacity_bps : Target channel capacity in bps (alternative to
+                       cnr_db).
+
+    Returns:
+        Required value of the free parameter. For parameters that improve
+        the C/N as they increase (e.g., rx_dish_size), this is the minimum
+        value achieving the target, whereas it is the maximum value for the
+        others (e.g., coax_length). NaN when the target is not achievable
+        (e.g., a target requiring a negative coax length).
+
+    Raises:
+        ValueError: if the parameter is not supported, if the target is not
+            defined or if the remaining parameters are inconsistent.
+
+    """
+    if (param not in FREE_PARAMS):
+        raise ValueError("Cannot solve for parameter \"{}\"".format(param))
+    if ((cnr_db is None) == (capacity_bps is None)):
+        raise ValueError("Define either the target C/N or the target "
+                         "capacity")
+
+    replaced = {}
+    for alternatives in budget.EXCLUSIVE_PARAMS:
+        if (param in alternatives):
+            replaced.update({other: None for other in alternatives})
+    replaced[param] = FREE_PARAMS[param]
+    inp = dataclasses.replace(inp, **replaced)
+    inp.validate()
+    if (param in ('coax_length', 'lnb_noise_fig') and
+            inp.noise_chain is not None):
+        raise ValueError("Cannot solve for {} with a custom noise "
+                         "chain".format(param))
+
+    res = budget.compute(inp)
+
+    if (param == 'if_bw' and capacity_bps is not None):
+        return _solve_if_bw_capacity(res.cnr_db, inp.if_bw, capacity_bps)
+
+    if (capacity_bps is not None):
+        # Shannon's formula inverted for the C/N, given the bandwidth
+        cnr_db = util.abs_to_db(2**(capacity_bps / inp.if_bw) - 1)
+
+    # C/N margin obtained with the reference parameter value
+    margin_db = res.cnr_db - cnr_db
+
+    if (param in ('eirp', 'tx_power')):
+        return getattr(inp, param) - margin_db
+
+    if (param == 'rx_dish_size'):
+        # The gain scales with the square of the diameter
+        return inp.rx_dish_size * util.db_to_abs(-margin_db / 2)
+
+    if (param == 'if_bw'):
+        # The noise power scales linearly with the bandwidth
+        return inp.if_bw * util.db_to_abs(margin_db)
+
+    F_req = _required_noise_factor(res, inp, margin_db)
+    F_lnb, G_lnb, L_coax, F_rx = _noise_chain_terms(res, inp)
+    if (param == 'coax_length'):
+        # With the coax at 290 K, its noise factor equals its loss L, and the
+        # overall noise factor is F_lnb + (L*F_rx - 1)/G_lnb (Friis)
+        L_req = ((F_req - F_lnb) * G_lnb + 1) / F_rx
+        loss_db_per_ft = calc.coax_loss_nf(1)[0]
+        return _feasible_db(L_req) / loss_db_per_ft
+
+    # param == 'lnb_noise_fig'
+    F_lnb_req = F_req - (L_coax * F_rx - 1) / G_lnb
+    return _feasible_db(F_lnb_req)
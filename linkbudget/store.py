@@ -0,0 +1,181 @@
+"""Chunked columnar storage of results
+
+Stores results in a directory holding one raw binary file per column (e.g.,
+"cnr_db.bin" or "pointing.elevation.bin") and a "meta.json" file describing
+the columns. The results are appended chunk by chunk, so the memory used
+while writing is bounded by the chunk size rather than the total number of
+results. The columns are read back as NumPy memory maps, such that slicing
+them only loads the requested elements.
+
+"""
+import json
+import os
+import numpy as np
+
+
+META_FILE = 'meta.json'
+_VERSION = 1
+
+
+def _column_file(name):
+    return name + '.bin'
+
+
+class ColumnWriter:
+    """Incremental writer of a columnar result store
+
+    Args:
+        path    : Directory where the store is created. Created if it does
+                  not exist. Existing columns with the same names are
+                  overwritten.
+        columns : Sequence of column names.
+        dtype   : Data type of the columns.
+
+    The store is finalized (i.e., its metadata is written) by close(). The
+    writer can also be used as a context manager.
+
+    """
+    def __init__(self, path, columns, dtype=np.float64):
+        self.path = path
+        self.columns = list(columns)
+        self.dtype = np.dtype(dtype)
+        self.length = 0
+        os.makedirs(path, exist_ok=True)
+        # Remove the metadata of any previous store, such that a store left
+        # incomplete (e.g., due to an exception) cannot be opened
+        meta_path = os.path.join(path, META_FILE)
+        if (os.path.exists(meta_path)):
+            os.remove(meta_path)
+        self._files = {
+            name: open(os.path.join(path, _column_file(name)), 'wb')
+            for name in self.columns
+        }
+
+    def write(self, chunk):
+        """Append a chunk of results
+
+        Args:
+            chunk : Dictionary mapping each column name to a 1-D array with
+                    the chunk values. All arrays must have the same length.
+
+        """
+        if (set(chunk) != set(self.columns)):
+            raise ValueError("Chunk columns do not match the store columns")
+        lengths = {len(chunk[name]) for name in self.columns}
+        if (len(lengths) != 1):
+            raise ValueError("Chunk columns have distinct lengths")
+
+        for name in self.columns:
+            np.asarray(chunk[name], dtype=self.dtype).tofile(
+                self._files[name])
+        self.length += lengths.pop()
+
+    def close(self):
+        """Flush the columns and write the metadata"""
+        for fd in self._files.values():
+            fd.close()
+        meta = {
+            'version': _VERSION,
+            'length': self.length,
+            'dtype': self.dtype.str,
+            'columns': self.columns
+        }
+        with open(os.path.join(self.path, META_FILE), 'w') as fd:
+            json.dump(meta, fd, indent=2)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if (exc_type is None):
+            self.close()
+        else:
+            for fd in self._files.values():
+                fd.close()
+
+
+def write(path, chunks, columns=None, dtype=np.float64):
+    """Write a stream of result chunks into a columnar store
+
+    Args:
+        path    : Directory where the store is created.
+        chunks  : Iterable of dictionaries mapping column names to 1-D
+                  arrays, such as the chunks produced by sweep.sweep_chunks.
+        columns : Column names. Defaults to the keys of the first chunk.
+        dtype   : Data type of the columns.
+
+    Returns:
+        Total number of results written.
+
+    """
+    chunks = iter(chunks)
+    first = next(chunks, None)
+    if (columns is None):
+        columns = [] if first is None else list(first)
+
+    with ColumnWriter(path, columns, dtype) as writer:
+        if (first is not None):
+            writer.write(first)
+        for chunk in chunks:
+            writer.write(chunk)
+
+    return writer.length
+
+
+class ColumnStore:
+    """Read-only access to a columnar result store
+
+    Behaves as a read-only dictionary mapping each column name to a 1-D
+    memory-mapped array.
+
+    Args:
+        path : Directory of the store.
+
+    """
+    def __init__(self, path):
+        meta_path = os.path.join(path, META_FILE)
+        if (not os.path.exists(meta_path)):
+            raise ValueError("{} is not a complete result store".format(path))
+        with open(meta_path) as fd:
+            meta = json.load(fd)
+        if (meta.get('version') != _VERSION):
+            raise ValueError("Unsupported result store version")
+
+        self.path = path
+        self.columns = meta['columns']
+        self.length = meta['length']
+        self.dtype = np.dtype(meta['dtype'])
+        self._maps = {}
+
+    def __getitem__(self, name):
+        if (name not in self.columns):
+            raise KeyError(name)
+        if (name not in self._maps):
+            filename = os.path.join(self.path, _column_file(name))
+            if (self.length == 0):
+                # Empty files cannot be memory-mapped
+                self._maps[name] = np.empty(0, dtype=self.dtype)
+            else:
+                self._maps[name] = np.memmap(filename, dtype=self.dtype,
+                                             mode='r', shape=(self.length,))
+        return self._maps[name]
+
+    def __contains__(self, name):
+        return name in self.columns
+
+    def __iter__(self):
+        return iter(self.columns)
+
+    def __len__(self):
+        return len(self.columns)
+
+    def keys(self):
+        return list(self.columns)
+
+    def items(self):
+        return [(name, self[name]) for name in self.columns]
+
+
+def open_store(path):
+    """Open a columnar result store for reading (see ColumnStore)"""
+    return ColumnStore(path)
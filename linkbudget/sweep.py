@@ -0,0 +1,195 @@
+"""Parameter sweeps
+
+Evaluates the link budget over the Cartesian product of the values given for
+one or more numeric parameters. The whole grid is evaluated in a single
+vectorized pass through the link budget computation.
+
+"""
+import csv
+import dataclasses
+import json
+import logging
+import numbers
+import sys
+import numpy as np
+from . import budget
+
+
+def parse_values(spec):
+    """Parse the values of a swept parameter
+
+    Args:
+        spec : Either a list of comma-separated values (e.g., "0.45,0.6,0.9")
+               or a range given as "start:stop:num", which is expanded into
+               num evenly spaced values from start to stop (inclusive).
+
+    Returns:
+        1-D array with the parameter values.
+
+    """
+    try:
+        if (':' in spec):
+            start, stop, num = spec.split(':')
+            values = np.linspace(float(start), float(stop), int(num))
+        else:
+            values = np.array([float(x) for x in spec.split(',')])
+    except ValueError:
+        raise ValueError("Invalid sweep values \"{}\"".format(spec))
+
+    if (values.size == 0):
+        raise ValueError("Empty sweep values \"{}\"".format(spec))
+
+    return values
+
+
+def _check_param(inp, name):
+    """Check if the given parameter is numeric and, hence, can be swept"""
+    val = getattr(inp, name, None)
+    if (name not in budget.NUMERIC_PARAMS or isinstance(val, bool) or
+            not isinstance(val, (numbers.Number, type(None)))):
+        raise ValueError("Parameter \"{}\" cannot be swept".format(name))
+
+
+def parse_sweep_opts(opts, args=None):
+    """Parse the "PARAM=VALUES" specifications given through option --sweep
+
+    Args:
+        opts : List of sweep specifications.
+        args : Optional argparse namespace or LinkBudgetInput object used to
+               check that the swept parameters exist and are numeric.
+
+    Returns:
+        Dictionary mapping each swept parameter (argparse destination) to the
+        array of values to sweep.
+
+    """
+    values = {}
+    for opt in opts:
+        name, sep, spec = opt.partition('=')
+        if (not sep):
+            raise ValueError("Invalid sweep \"{}\" (expected PARAM=VALUES)"
+                             "".format(opt))
+        name = name.strip().lstrip('-').replace('-', '_')
+        if (args is not None):
+            _check_param(args, name)
+        if (name in values):
+            raise ValueError("Parameter \"{}\" swept more than once".format(
+                name))
+        values[name] = parse_values(spec)
+    return values
+
+
+def _grid_size(values):
+    """Number of points of the grid defined by the swept values"""
+    n_points = 1
+    for v in values.values():
+        n_points *= np.size(v)
+    return n_points
+
+
+def sweep_chunks(inp, values, chunk_size=2**16):
+    """Evaluate the link budget over a Cartesian grid in chunks of points
+
+    Generates the grid points chunk by chunk (without building the full
+    grid), so that the memory usage is bounded by the chunk size rather than
+    the grid size.
+
+    Args:
+        inp        : LinkBudgetInput object with the fixed (not swept)
+                     parameters.
+        values     : Dictionary mapping each swept parameter to the sequence
+                     of values to sweep (see sweep).
+        chunk_size : Maximum number of grid points per chunk.
+
+    Returns:
+        Generator of dictionaries in the columnar form returned by sweep,
+        each holding the results of up to chunk_size consecutive grid
+        points.
+
+    """
+    replaced = {}
+    for name in values:
+        _check_param(inp, name)
+        for alternatives in budget.EXCLUSIVE_PARAMS:
+            if (name in alternatives):
+                replaced.update({other: None for other in alternatives})
+
+    axes = [np.asarray(v, dtype=float).ravel() for v in values.values()]
+    shape = tuple(len(axis) for axis in axes)
+    n_points = _grid_size(values)
+    for start in range(0, n_points, chunk_size):
+        stop = min(start + chunk_size, n_points)
+        # Multi-dimensional grid indexes of the chunk, with the last swept
+        # parameter varying the fastest
+        indexes = np.unravel_index(np.arange(start, stop), shape) \
+            if shape else ()
+        columns = {}
+        for name, axis, idx in zip(values, axes, indexes):
+            columns[name] = axis[idx]
+            replaced[name] = columns[name]
+
+        res = budget.compute(dataclasses.replace(inp, **replaced))
+        for key, attr in budget.result_keys(res):
+            columns[key] = np.broadcast_to(getattr(res, attr),
+                                           (stop - start,)).copy()
+        yield columns
+
+
+def sweep(inp, values):
+    """Evaluate the link budget over a Cartesian grid of parameters
+
+    Args:
+        inp    : LinkBudgetInput object with the fixed (not swept)
+                 parameters.
+        values : Dictionary mapping each swept parameter (e.g., 'freq' or
+                 'rx_dish_size') to the sequence of values to sweep. A swept
+                 parameter replaces the value defined on inp for the same
+                 parameter and for its mutually exclusive alternatives (e.g.,
+                 a swept 'rx_dish_size' replaces 'rx_dish_gain').
+
+    Returns:
+        Dictionary of 1-D arrays with one element per grid point, i.e., in
+        columnar form. The dictionary has one column per swept parameter and
+        one column per field of the result returned by main.analyze (hence
+        no atmospheric loss columns unless these losses are included), where
+        the keys of nested fields are joined by a dot (e.g.,
+        'pointing.elevation'). The grid points are ordered such that the
+        last swept parameter varies the fastest.
+
+    Note:
+        The whole grid is evaluated in a single vectorized pass. For grids
+        that do not fit in memory, see sweep_chunks and the store module.
+
+    """
+    return next(sweep_chunks(inp, values, max(_grid_size(values), 1)))
+
+
+def print_sweep(args):
+    """Run the sweep defined through option --sweep and print the results
+
+    The results are printed in CSV format (one row per grid point) or, if
+    option --json is used, as a JSON object mapping each column to the list
+    of values. With option --sweep-output, the results are instead written
+    chunk by chunk into a columnar store (see the store module).
+
+    """
+    inp = budget.LinkBudgetInput.from_args(args)
+    values = parse_sweep_opts(args.sweep, inp)
+
+    if (args.sweep_output is not None):
+        from . import store
+        chunks = sweep_chunks(inp, values, args.sweep_chunk_size)
+        n_points = store.write(args.sweep_output, chunks)
+        logging.basicConfig(level=logging.INFO)
+        logging.info("Sweep with {} points saved in {}".format(
+            n_points, args.sweep_output))
+        return
+
+    columns = sweep(inp, values)
+
+    if (args.json):
+        print(json.dumps({k: v.tolist() for k, v in columns.items()}))
+    else:
+        writer = csv.writer(sys.stdout)
+        writer.writerow(columns.keys())
+        writer.writerows(zip(*(v.tolist() for v in columns.values())))
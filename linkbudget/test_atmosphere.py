@@ -0,0 +1,164 @@
+import dataclasses
+import io
+import json
+import math
+import unittest
+import unittest.mock
+import numpy as np
+from . import atmosphere, budget, main
+from .session import LinkBudgetSession
+from .test_budget import sa8_input
+
+
+class TestAtmosphere(unittest.TestCase):
+    def setUp(self):
+        self.inp = sa8_input()
+
+    def test_air_mass(self):
+        self.assertAlmostEqual(atmosphere.air_mass(90, 6), 1)
+        self.assertAlmostEqual(atmosphere.air_mass(30, 6), 2, places=2)
+        self.assertTrue(math.isfinite(atmosphere.air_mass(0, 6)))
+
+    def test_grid_lookup(self):
+        # At the grid nodes, the lookups match the tabulated values
+        self.assertAlmostEqual(atmosphere.gas_loss(12e9, 90), 0.062)
+        self.assertAlmostEqual(
+            atmosphere.cloud_loss(20e9, 45, 1),
+            atmosphere.cloud_specific_attenuation(20) *
+            atmosphere.air_mass(45, atmosphere.CLOUD_SCALE_HEIGHT))
+
+        # Between the nodes, the interpolation error is small
+        for freq, el in [(12.45e9, 37.3), (29.97e9, 5.1)]:
+            self.assertAlmostEqual(
+                atmosphere.cloud_loss(freq, el, 1) /
+                atmosphere.cloud_specific_attenuation(freq / 1e9) /
+                atmosphere.air_mass(el, atmosphere.CLOUD_SCALE_HEIGHT), 1,
+                delta=1e-3)
+
+    def test_scalar_and_array(self):
+        freq = np.array([4e9, 12.45e9, 20e9, 29.5e9, 0.5e9, 60e9])
+        el = np.array([10, 35.2, 49.8, 72.1, 30, 30])
+        lat = np.array([0, 29.7, -40, 60, 0, 0])
+        gas = atmosphere.gas_loss(freq, el)
+        cloud = atmosphere.cloud_loss(freq, el, 0.5)
+        rain = atmosphere.rain_loss(freq, el, lat, 20)
+        for i in range(len(freq)):
+            for arr, scalar in [
+                (gas, atmosphere.gas_loss(freq[i], el[i])),
+                (cloud, atmosphere.cloud_loss(freq[i], el[i], 0.5)),
+                (rain, atmosphere.rain_loss(freq[i], el[i], lat[i], 20))
+            ]:
+                if (math.isnan(scalar)):
+                    self.assertTrue(np.isnan(arr[i]))
+                else:
+                    self.assertAlmostEqual(arr[i], scalar)
+
+        # Out of the supported frequency range
+        self.assertTrue(np.all(np.isnan(gas[4:])))
+        self.assertTrue(np.all(np.isnan(rain[4:])))
+
+    def test_rain(self):
+        # Increases with the rain rate and the frequency, and decreases with
+        # the elevation
+        self.assertLess(atmosphere.rain_loss(12e9, 40, 30, 10),
+                        atmosphere.rain_loss(12e9, 40, 30, 50))
+        self.assertLess(atmosphere.rain_loss(12e9, 40, 30, 10),
+                        atmosphere.rain_loss(20e9, 40, 30, 10))
+        self.assertLess(atmosphere.rain_loss(12e9, 60, 30, 10),
+                        atmosphere.rain_loss(12e9, 20, 30, 10))
+        self.assertEqual(atmosphere.rain_loss(12e9, 40, 30, 0), 0)
+
+        self.assertEqual(atmosphere.rain_height(10), 5)
+        self.assertAlmostEqual(atmosphere.rain_height(43), 3.5)
+        self.assertAlmostEqual(atmosphere.rain_height(-31), 4)
+        self.assertAlmostEqual(atmosphere.rain_height(89), 0.05)
+        np.testing.assert_allclose(
+            atmosphere.rain_height(np.array([10, 43, -31, -80])),
+            [5, 3.5, 4, 0])
+
+    def test_budget(self):
+        ref = budget.compute(self.inp)
+        self.assertIsNone(ref.atm_loss_db)
+        self.assertNotIn('atm_loss_db', ref.to_dict())
+
+        inp = dataclasses.replace(self.inp, rain_rate=20, cloud_liquid=0.5)
+        inp.validate()
+        res = budget.compute(inp)
+        self.assertGreater(res.rain_loss_db, 0)
+        self.assertEqual(res.to_dict()['atm_loss_db']['total'],
+                         res.atm_loss_db)
+        self.assertAlmostEqual(
+            res.atm_loss_db,
+            res.gas_loss_db + res.cloud_loss_db + res.rain_loss_db)
+        self.assertAlmostEqual(res.cnr_db, ref.cnr_db - res.atm_loss_db)
+        self.assertAlmostEqual(res.rx_power_dbw,
+                               ref.rx_power_dbw - res.atm_loss_db)
+        self.assertEqual(res.path_loss_db, ref.path_loss_db)
+
+        # Gaseous absorption only
+        res = budget.compute(dataclasses.replace(self.inp, atmosphere=True))
+        self.assertGreater(res.gas_loss_db, 0)
+        self.assertEqual(res.rain_loss_db, 0)
+        self.assertEqual(res.atm_loss_db, res.gas_loss_db)
+
+        # Vectorized over the rain rate
+        rates = np.array([0, 10, 50])
+        res = budget.compute(dataclasses.replace(self.inp, rain_rate=rates))
+        self.assertEqual(res.cnr_db.shape, (3,))
+        self.assertTrue(np.all(np.diff(res.cnr_db) < 0))
+
+        with self.assertRaises(ValueError):
+            dataclasses.replace(self.inp, freq=70e9,
+                                atmosphere=True).validate()
+
+    def test_session(self):
+        session = LinkBudgetSession(
+            dataclasses.replace(self.inp, rain_rate=10))
+        session.result()
+        session.update(rain_rate=30)
+        session.result()
+        stats = session.stats()
+        for name in ('atmosphere', 'cnr', 'capacity'):
+            self.assertEqual(stats[name]['computed'], 2, name)
+        for name in ('pointing', 'path_loss', 'noise'):
+            self.assertEqual(stats[name]['computed'], 1, name)
+
+    def test_cli(self):
+        parser = main.get_parser()
+        base_args = [
+            '--eirp', '52', '--freq', '12.45e9', '--if-bw', '24e6',
+            '--rx-dish-size', '0.46', '--antenna-noise-temp', '20',
+            '--lnb-noise-fig', '0.6', '--lnb-gain', '40',
+            '--coax-length', '110', '--rx-noise-fig', '10',
+            '--sat-long', '-101', '--rx-long', '-82.43', '--rx-lat', '29.71',
+            '--json'
+        ]
+        args = parser.parse_args(base_args + ['--rain-rate', '20'])
+        main.validate(parser, args)
+        with unittest.mock.patch('sys.stdout', new=io.StringIO()) as out:
+            main.analyze(args)
+        res = json.loads(out.getvalue())
+        self.assertGreater(res['atm_loss_db']['rain'], 0)
+        self.assertEqual(res['atm_loss_db']['cloud'], 0)
+
+        args = parser.parse_args(base_args)
+        with unittest.mock.patch('sys.stdout', new=io.StringIO()) as out:
+            main.analyze(args)
+        self.assertNotIn('atm_loss_db', json.loads(out.getvalue()))
+
+        # Out-of-range frequencies, including swept ones
+        invalid = [
+            ['--atmosphere', '--freq', '0.5e9'],
+            ['--atmosphere', '--sweep', 'freq=12e9,60e9'],
+            ['--sweep', 'freq=12e9:60e9:5', '--sweep', 'rain_rate=0,50'],
+        ]
+        for extra in invalid:
+            with self.assertRaises(SystemExit):
+                args = parser.parse_args(base_args + extra)
+                main.validate(parser, args)
+
+        args = parser.parse_args(base_args + ['--atmosphere', '--sweep',
+                                              'freq=12e9,30e9'])
+        main.validate(parser, args)
+        args = parser.parse_args(base_args + ['--sweep', 'freq=12e9,60e9'])
+        main.validate(parser, args)
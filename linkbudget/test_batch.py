@@ -0,0 +1,151 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+import unittest.mock
+from . import batch, budget, main
+
+
+class TestBatch(unittest.TestCase):
+    def setUp(self):
+        self.defaults = {
+            'freq': 12.45e9,
+            'if_bw': 24e6,
+            'antenna_noise_temp': 20,
+            'lnb_noise_fig': 0.6,
+            'lnb_gain': 40,
+            'coax_length': 110,
+            'rx_noise_fig': 10,
+            'sat_long': -101,
+            'rx_long': -82.43,
+            'rx_lat': 29.71
+        }
+
+    def test_to_input(self):
+        inp = batch.to_input({'eirp': 52, 'rx-dish-size': 0.46},
+                             self.defaults)
+        self.assertEqual(inp.eirp, 52)
+        self.assertEqual(inp.rx_dish_size, 0.46)
+        self.assertEqual(inp.freq, 12.45e9)
+
+        # A scenario parameter overrides the default alternative
+        inp = batch.to_input({'eirp': 52, 'rx_dish_gain': 33},
+                             dict(self.defaults, rx_dish_size=0.46))
+        self.assertEqual(inp.rx_dish_gain, 33)
+        self.assertIsNone(inp.rx_dish_size)
+
+        invalid_scenarios = [
+            {'eirp': 52},  # missing dish
+            {'eirp': 52, 'rx_dish_size': 0.46, 'tx_power': 10},  # exclusive
+            {'eirp': 52, 'rx_dish_size': 0.46, 'unknown': 1},
+            {'eirp': 52, 'rx_dish_size': 'big'},
+            {'eirp': 52, 'rx_dish_size': 0.46, 'radar': 1},
+            [52, 0.46]
+        ]
+        for scenario in invalid_scenarios:
+            with self.assertRaises(ValueError):
+                batch.to_input(scenario, self.defaults)
+
+    def test_run_jsonl(self):
+        fd_in = io.StringIO(
+            '{"eirp": 52, "rx-dish-size": 0.46}\n'
+            '\n'
+            '{"eirp": 52, "rx_dish_size": 0.46, "coax_length": 50}\n'
+            'not json\n'
+            '{"eirp": 52, "rx_dish_size": 0.46, "freq": -1}\n'
+            '{"eirp": 52, "rx_dish_size": 0.46, "freq": 0}\n'
+            '{"eirp": 52, "rx_dish_size": 0.46, "if_bw": 0}\n'
+            '{"eirp": 52, "rx_dish_size": 0.46}\n'
+        )
+        fd_out = io.StringIO()
+        count = batch.run(fd_in, fd_out, 'jsonl', self.defaults)
+        self.assertEqual(count, 7)
+
+        results = [json.loads(x) for x in fd_out.getvalue().splitlines()]
+        self.assertEqual(len(results), 7)
+        # A failing scenario does not stop the stream
+        self.assertEqual(results[4], {
+            'error': 'line 6: Parameter freq must be positive'})
+        self.assertIn('error', results[5])
+        self.assertEqual(results[6], results[0])
+        self.assertAlmostEqual(results[0]['cnr_db'], 15.95, places=2)
+        expected = budget.compute(batch.to_input(
+            {'eirp': 52, 'rx_dish_size': 0.46, 'coax_length': 50},
+            self.defaults))
+        self.assertEqual(results[1], expected.to_dict())
+        self.assertEqual(results[2], {
+            'error': 'line 4: Invalid scenario (expected a JSON object)'})
+        self.assertIn('error', results[3])
+
+    def test_arithmetic_error(self):
+        # Arithmetic errors raised by the computation are reported per
+        # scenario as well
+        scenarios = [(1, {'eirp': 52, 'rx_dish_size': 0.46})] * 2
+        with unittest.mock.patch.object(
+                batch.budget, 'compute',
+                side_effect=[ZeroDivisionError('float division by zero'),
+                             budget.compute(batch.to_input(
+                                 scenarios[0][1], self.defaults))]):
+            results = list(batch.evaluate(scenarios, self.defaults))
+        self.assertEqual(results[0],
+                         {'error': 'line 1: float division by zero'})
+        self.assertNotIn('error', results[1])
+
+    def test_run_csv(self):
+        fd_in = io.StringIO(
+            'eirp,rx-dish-size,rx-dish-gain,radar\n'
+            '52,0.46,,\n'
+            '52,,33.02,false\n'
+            '52,,33.02,maybe\n'
+        )
+        fd_out = io.StringIO()
+        batch.run(fd_in, fd_out, 'csv', self.defaults)
+        results = [json.loads(x) for x in fd_out.getvalue().splitlines()]
+        self.assertEqual(len(results), 3)
+        self.assertAlmostEqual(results[0]['cnr_db'], 15.95, places=2)
+        self.assertAlmostEqual(results[1]['cnr_db'], 15.95, delta=0.01)
+        self.assertEqual(results[2], {
+            'error': 'line 4: Invalid value for parameter "radar"'})
+
+    def test_streaming(self):
+        """Scenarios are evaluated lazily, as they are read"""
+        def scenarios():
+            yield 1, {'eirp': 52, 'rx_dish_size': 0.46}
+            raise RuntimeError("stream interrupted")
+
+        results = batch.evaluate(scenarios(), self.defaults)
+        self.assertIn('cnr_db', next(results))
+        with self.assertRaises(RuntimeError):
+            next(results)
+
+    def test_cli(self):
+        parser = main.get_parser()
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'scenarios.csv')
+            with open(path, 'w') as fd:
+                fd.write('eirp,lnb-noise-fig\n52,0.6\n55,1.0\n')
+
+            # Options given in the command line serve as defaults
+            args = parser.parse_args([
+                '--batch', path,
+                '--freq', '12.45e9',
+                '--if-bw', '24e6',
+                '--rx-dish-size', '0.46',
+                '--antenna-noise-temp', '20',
+                '--lnb-noise-temp', '42.964',
+                '--lnb-gain', '40',
+                '--coax-length', '110',
+                '--rx-noise-fig', '10',
+                '--sat-long', '-101',
+                '--rx-long', '-82.43',
+                '--rx-lat', '29.71'
+            ])
+            main.validate(parser, args)
+            with unittest.mock.patch('sys.stdout', new=io.StringIO()) as out:
+                main.run_batch(args)
+
+        results = [json.loads(x) for x in out.getvalue().splitlines()]
+        self.assertEqual(len(results), 2)
+        self.assertAlmostEqual(results[0]['cnr_db'], 15.95, places=2)
+        self.assertEqual(results[1]['noise_fig_db']['lnb'], 1.0)
@@ -0,0 +1,148 @@
+import dataclasses
+import io
+import json
+import os
+import tempfile
+import unittest
+import unittest.mock
+import numpy as np
+from . import bestserver, budget, main
+from .test_budget import sa8_input
+
+
+class TestBestServer(unittest.TestCase):
+    def setUp(self):
+        self.inp = sa8_input()
+        self.sat_long = np.array([-101, -82, -30, 100])
+        self.eirp = np.array([52, 50, 55, 60])
+        self.freq = np.array([12.45e9, 12.2e9, 12.5e9, 12.5e9])
+        self.rx_long = np.array([-82.43, -100, 120, 10, -60])
+        self.rx_lat = np.array([29.71, 40, 30, 85, -10])
+
+    def reference(self, min_elevation):
+        """C/N matrix computed pair by pair, with -inf on pruned pairs"""
+        cnr_db = np.full((len(self.rx_long), len(self.sat_long)), -np.inf)
+        for i, (rx_long, rx_lat) in enumerate(zip(self.rx_long,
+                                                  self.rx_lat)):
+            for j, sat_long in enumerate(self.sat_long):
+                res = budget.compute(dataclasses.replace(
+                    self.inp, sat_long=sat_long, rx_long=rx_long,
+                    rx_lat=rx_lat, eirp=self.eirp[j], freq=self.freq[j]))
+                if (res.elevation >= min_elevation):
+                    cnr_db[i, j] = res.cnr_db
+        return cnr_db
+
+    def test_best_server(self):
+        res = bestserver.best_server(
+            self.inp, self.sat_long, self.rx_long, self.rx_lat, self.eirp,
+            self.freq, min_elevation=5, required_cnr=10)
+        cnr_db = self.reference(5)
+        self.assertEqual(res.dtype, bestserver.BEST_SERVER_DTYPE)
+        self.assertEqual(len(res), len(self.rx_long))
+
+        for i, record in enumerate(res):
+            order = np.argsort(cnr_db[i])[::-1]
+            visible = np.isfinite(cnr_db[i])
+            if (not visible.any()):
+                self.assertEqual(record['best'], -1)
+                self.assertTrue(np.isnan(record['cnr_db']))
+                self.assertTrue(np.isnan(record['margin_db']))
+                continue
+            self.assertEqual(record['best'], order[0])
+            self.assertAlmostEqual(record['cnr_db'], cnr_db[i, order[0]])
+            self.assertAlmostEqual(record['margin_db'],
+                                   cnr_db[i, order[0]] - 10)
+            if (visible.sum() > 1):
+                self.assertEqual(record['runner_up'], order[1])
+                self.assertAlmostEqual(record['runner_up_cnr_db'],
+                                       cnr_db[i, order[1]])
+            else:
+                self.assertEqual(record['runner_up'], -1)
+                self.assertTrue(np.isnan(record['runner_up_cnr_db']))
+
+        # The near-polar station sees no satellite, and the station in Asia
+        # sees a single one
+        self.assertEqual(res['best'][3], -1)
+        self.assertEqual(res['runner_up'][2], -1)
+
+    def test_blocks(self):
+        kwargs = dict(eirp=self.eirp, freq=self.freq, min_elevation=5)
+        res = bestserver.best_server(self.inp, self.sat_long, self.rx_long,
+                                     self.rx_lat, **kwargs)
+        res_blocks = bestserver.best_server(
+            self.inp, self.sat_long, self.rx_long, self.rx_lat,
+            block_pairs=1, **kwargs)
+        for name in bestserver.BEST_SERVER_DTYPE.names:
+            np.testing.assert_array_equal(res[name], res_blocks[name])
+
+    def test_shared_params(self):
+        # EIRP and frequency from the input, shared by all satellites
+        res = bestserver.best_server(self.inp, self.sat_long, [-82.43],
+                                     [29.71])
+        ref = budget.compute(dataclasses.replace(self.inp, sat_long=-82))
+        self.assertEqual(res['best'][0], 1)
+        self.assertAlmostEqual(res['cnr_db'][0], ref.cnr_db)
+
+    def test_errors(self):
+        with self.assertRaises(ValueError):
+            bestserver.best_server(self.inp, self.sat_long, self.rx_long,
+                                   self.rx_lat, eirp=[50, 52])
+        with self.assertRaises(ValueError):
+            bestserver.best_server(self.inp, [], self.rx_long, self.rx_lat)
+        with self.assertRaises(ValueError):
+            bestserver.best_server(
+                dataclasses.replace(self.inp, atmosphere=True),
+                self.sat_long, self.rx_long, self.rx_lat,
+                freq=[12e9, 12e9, 12e9, 60e9])
+
+    def test_cli(self):
+        parser = main.get_parser()
+        with tempfile.TemporaryDirectory() as tmpdir:
+            sats_file = os.path.join(tmpdir, 'sats.csv')
+            stations_file = os.path.join(tmpdir, 'stations.csv')
+            with open(sats_file, 'w') as fd:
+                fd.write("sat-long,eirp,freq\n")
+                for row in zip(self.sat_long, self.eirp, self.freq):
+                    fd.write("{},{},{}\n".format(*row))
+            with open(stations_file, 'w') as fd:
+                fd.write("rx-long,rx-lat\n")
+                for row in zip(self.rx_long, self.rx_lat):
+                    fd.write("{},{}\n".format(*row))
+
+            base_args = [
+                '--if-bw', '24e6', '--rx-dish-size', '0.46',
+                '--antenna-noise-temp', '20', '--lnb-noise-fig', '0.6',
+                '--lnb-gain', '40', '--coax-length', '110',
+                '--rx-noise-fig', '10'
+            ]
+            args = parser.parse_args(base_args + [
+                '--best-server', stations_file, '--satellites', sats_file,
+                '--min-elevation', '5', '--required-cnr', '10'])
+            main.validate(parser, args)
+            with unittest.mock.patch('sys.stdout',
+                                     new=io.StringIO()) as out:
+                main.run_best_server(args)
+
+            invalid = [
+                ['--best-server', stations_file],  # missing --satellites
+                ['--satellites', sats_file],  # missing --best-server
+                ['--best-server', sats_file, '--satellites', sats_file],
+                ['--best-server', stations_file, '--satellites',
+                 stations_file],
+                ['--best-server', stations_file, '--satellites', sats_file,
+                 '--sweep', 'coax_length=10,20'],
+            ]
+            for extra in invalid:
+                with self.assertRaises(SystemExit):
+                    args = parser.parse_args(base_args + extra)
+                    main.validate(parser, args)
+
+        lines = [json.loads(line) for line in out.getvalue().splitlines()]
+        res = bestserver.best_server(
+            self.inp, self.sat_long, self.rx_long, self.rx_lat, self.eirp,
+            self.freq, min_elevation=5, required_cnr=10)
+        self.assertEqual(len(lines), len(self.rx_long))
+        self.assertEqual(lines[0]['best'], res['best'][0])
+        self.assertAlmostEqual(lines[0]['margin_db'], res['margin_db'][0])
+        self.assertIsNone(lines[3]['best'])
+        self.assertIsNone(lines[2]['runner_up_cnr_db'])
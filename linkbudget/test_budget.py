@@ -0,0 +1,172 @@
+import dataclasses
+import unittest
+import unittest.mock
+import numpy as np
+from . import budget, main
+
+
+def sa8_input(**changes):
+    """LinkBudgetInput of example SA8-1 from Couch, Leon W.. Digital & Analog
+    Communication Systems (see test_main.py), with optional changes"""
+    inp = budget.LinkBudgetInput(
+        eirp=52,
+        freq=12.45e9,
+        if_bw=24e6,
+        rx_dish_size=0.46,
+        antenna_noise_temp=20,
+        lnb_noise_fig=0.6,
+        lnb_gain=40,
+        coax_length=110,
+        rx_noise_fig=10,
+        sat_long=-101,
+        rx_long=-82.43,
+        rx_lat=29.71
+    )
+    return dataclasses.replace(inp, **changes)
+
+
+class TestBudget(unittest.TestCase):
+    def setUp(self):
+        self.inp = sa8_input()
+
+    def test_compute(self):
+        res = budget.compute(self.inp)
+        self.assertIsInstance(res, budget.LinkBudgetResult)
+        self.assertAlmostEqual(res.cnr_db, 15.95, places=2)
+        self.assertAlmostEqual(res.rx_power_dbw + 30, -90.71, places=2)
+        self.assertAlmostEqual(res.g_over_t_db, 14.89, places=2)
+        self.assertIsNone(res.tx_dish_gain_db)
+
+        # EIRP based on the Tx power and the Tx dish size
+        res = budget.compute(dataclasses.replace(
+            self.inp, eirp=None, tx_power=5, tx_dish_size=2.4))
+        self.assertAlmostEqual(res.eirp_db, 52.37, places=2)
+        self.assertAlmostEqual(res.tx_dish_gain_db, 47.37, places=2)
+
+    def test_to_dict(self):
+        """The result dictionary matches the one returned by main.analyze"""
+        parser = main.get_parser()
+        args = parser.parse_args(
+            ['--eirp', '52',
+             '--freq', '12.45e9',
+             '--if-bw', '24e6',
+             '--rx-dish-size', '0.46',
+             '--antenna-noise-temp', '20',
+             '--lnb-noise-fig', '0.6',
+             '--lnb-gain', '40',
+             '--coax-length', '110',
+             '--rx-noise-fig', '10',
+             '--sat-long', '-101',
+             '--rx-long', '-82.43',
+             '--rx-lat', '29.71',
+             '--json']
+        )
+        self.assertEqual(budget.LinkBudgetInput.from_args(args), self.inp)
+        with unittest.mock.patch('builtins.print'):
+            expected = main.analyze(args)
+        self.assertEqual(budget.compute(self.inp).to_dict(), expected)
+
+    def test_validate(self):
+        self.inp.validate()
+
+        with self.assertRaises(ValueError):
+            dataclasses.replace(self.inp, eirp=None).validate()
+
+        with self.assertRaises(ValueError):
+            dataclasses.replace(self.inp, rx_dish_gain=30).validate()
+
+        for changes in ({'freq': 0}, {'freq': -1}, {'if_bw': 0},
+                        {'freq': float('nan')}):
+            with self.assertRaises(ValueError):
+                dataclasses.replace(self.inp, **changes).validate()
+
+        with self.assertRaises(ValueError):
+            dataclasses.replace(self.inp, eirp=None, tx_power=10).validate()
+
+        with self.assertRaises(ValueError):
+            dataclasses.replace(self.inp, radar=True,
+                                radar_alt=355600e3).validate()
+
+    def test_compact_result(self):
+        res = budget.compute(self.inp)
+        # No per-instance dictionary
+        self.assertFalse(hasattr(res, '__dict__'))
+        with self.assertRaises(AttributeError):
+            res.unknown = 0
+
+    def test_records(self):
+        results = [
+            budget.compute(self.inp),
+            budget.compute(dataclasses.replace(
+                self.inp, eirp=None, tx_power=5, tx_dish_size=2.4))
+        ]
+        records = budget.to_records(results)
+        self.assertEqual(records.dtype, budget.RESULT_DTYPE)
+        self.assertEqual(len(records), 2)
+        self.assertEqual(records.itemsize, 8 * len(budget.RESULT_DTYPE))
+
+        # Conversion back to the dictionary (JSON) format
+        dicts = list(budget.records_to_dicts(records))
+        for res, d in zip(results, dicts):
+            self.assertEqual(d, res.to_dict())
+        self.assertIsNone(
+            budget.LinkBudgetResult.from_record(records[0]).tx_dish_gain_db)
+        self.assertEqual(
+            budget.LinkBudgetResult.from_record(records[1]), results[1])
+
+        # Vectorized result
+        res = budget.compute(dataclasses.replace(
+            self.inp, rx_dish_size=np.array([0.46, 0.6, 0.9])))
+        records = res.to_records()
+        self.assertEqual(len(records), 3)
+        for i, size in enumerate([0.46, 0.6, 0.9]):
+            expected = budget.compute(dataclasses.replace(
+                self.inp, rx_dish_size=size))
+            self.assertAlmostEqual(records['cnr_db'][i], expected.cnr_db)
+            self.assertAlmostEqual(records['elevation'][i],
+                                   expected.elevation)
+
+    def test_compute_many(self):
+        inputs = [dataclasses.replace(self.inp, rx_lat=lat) for lat in
+                  range(budget.MIN_STACK_SIZE + 4)]
+        # Not stacked with the others (EIRP given by the Tx power and gain)
+        inputs.append(dataclasses.replace(self.inp, eirp=None, tx_power=5,
+                                          tx_dish_gain=47))
+        # Computation failure on the vectorized path
+        inputs.append(dataclasses.replace(self.inp, freq=-1))
+        results = budget.compute_many(inputs)
+        for inp, res in zip(inputs[:-1], results):
+            ref = budget.compute(inp)
+            for attr in ref.__slots__:
+                if (getattr(ref, attr) is None):
+                    self.assertIsNone(getattr(res, attr))
+                else:
+                    self.assertAlmostEqual(getattr(res, attr),
+                                           getattr(ref, attr))
+        self.assertIsInstance(results[-1], ValueError)
+
+    def test_compute_many_errors(self):
+        n = budget.MIN_STACK_SIZE + 4
+        # Stacked parameter on which the C/N does not depend, given that the
+        # EIRP is defined, such that the C/N stays a scalar
+        inputs = [dataclasses.replace(self.inp, tx_dish_size=i + 1)
+                  for i in range(n)]
+        ref = budget.compute(self.inp)
+        for res in budget.compute_many(inputs):
+            self.assertAlmostEqual(res.cnr_db, ref.cnr_db)
+
+        # Zero frequency, on the vectorized and the individual paths
+        for count in (n, 3):
+            inputs = [dataclasses.replace(self.inp, rx_lat=i)
+                      for i in range(count)]
+            inputs[1] = dataclasses.replace(self.inp, freq=0)
+            results = budget.compute_many(inputs)
+            self.assertIsInstance(results[1], ZeroDivisionError)
+            self.assertAlmostEqual(results[0].cnr_db,
+                                   budget.compute(inputs[0]).cnr_db)
+            self.assertIsInstance(results[-1], budget.LinkBudgetResult)
+
+        # Identical inputs get their own result objects
+        results = budget.compute_many([self.inp] * n)
+        self.assertEqual(len({id(res) for res in results}), n)
+        self.assertEqual(results[0], results[-1])
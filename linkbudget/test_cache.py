@@ -0,0 +1,105 @@
+import dataclasses
+import io
+import json
+import unittest
+import numpy as np
+from . import batch, budget, cache, calc, pointing
+from .test_budget import sa8_input
+
+
+class TestCache(unittest.TestCase):
+    def test_quantized_lru_cache(self):
+        calls = []
+
+        def func(x, y):
+            calls.append((x, y))
+            return x + y
+
+        c = cache.QuantizedLRUCache(func, maxsize=2, resolution=(0.1, 1))
+        self.assertAlmostEqual(c(1.0, 2), 3.0)
+        # Within the resolution of the first call
+        self.assertAlmostEqual(c(1.04, 2.3), 3.0)
+        self.assertEqual(c.stats(), {'hits': 1, 'misses': 1, 'size': 1,
+                                     'maxsize': 2})
+        # The cached value is computed from the quantized inputs
+        self.assertAlmostEqual(c(1.06, 2), 3.1)
+        self.assertEqual(len(calls), 2)
+
+        # LRU eviction: (1.0, 2) is the least-recently used entry
+        c(5.0, 5)
+        self.assertEqual(c.stats()['size'], 2)
+        c(1.0, 2)
+        self.assertEqual(len(calls), 4)
+
+        # Array arguments bypass the cache
+        np.testing.assert_allclose(c(np.array([1, 2]), 1), [2, 3])
+        self.assertEqual(c.stats()['misses'], 4)
+
+        # So do non-finite arguments
+        self.assertEqual(c(float('inf'), 1), float('inf'))
+        self.assertTrue(np.isnan(c(float('nan'), 1)))
+        self.assertEqual(c.stats()['misses'], 4)
+
+        c.clear()
+        self.assertEqual(c.stats(), {'hits': 0, 'misses': 0, 'size': 0,
+                                     'maxsize': 2})
+
+    def test_link_budget_cache(self):
+        lb_cache = cache.LinkBudgetCache(maxsize=16)
+        np.testing.assert_allclose(
+            lb_cache.look_angles(-101, -82.43, 29.71, 35786e3),
+            pointing.look_angles(-101, -82.43, 29.71, 35786e3))
+        self.assertAlmostEqual(lb_cache.dish_gain(0.46, 12.45e9),
+                               calc.dish_gain(0.46, 12.45e9))
+        inp = sa8_input()
+
+        for coax_length in [50, 100, 150]:
+            inp = dataclasses.replace(inp, coax_length=coax_length)
+            res = budget.compute(inp, lb_cache)
+            self.assertAlmostEqual(res.cnr_db, budget.compute(inp).cnr_db)
+
+        stats = lb_cache.stats()
+        self.assertEqual(stats['look_angles']['hits'], 3)
+        self.assertEqual(stats['look_angles']['misses'], 1)
+        self.assertEqual(stats['dish_gain']['hits'], 3)
+        self.assertEqual(stats['dish_gain']['misses'], 1)
+
+    def test_batch(self):
+        defaults = {
+            'freq': 12.45e9, 'if_bw': 24e6, 'antenna_noise_temp': 20,
+            'lnb_noise_fig': 0.6, 'lnb_gain': 40, 'coax_length': 110,
+            'rx_noise_fig': 10, 'sat_long': -101, 'rx_dish_size': 0.46
+        }
+        text = ''.join(
+            json.dumps({'eirp': 50 + i % 3, 'rx_long': -82.43,
+                        'rx_lat': 29.71 + (i % 2)}) + '\n'
+            for i in range(10))
+        out = io.StringIO()
+        cached_out = io.StringIO()
+        batch.run(io.StringIO(text), out, defaults=defaults)
+        batch.run(io.StringIO(text), cached_out, defaults=defaults,
+                  cache_size=8)
+        for line, cached_line in zip(out.getvalue().splitlines(),
+                                     cached_out.getvalue().splitlines()):
+            res, cached_res = json.loads(line), json.loads(cached_line)
+            self.assertAlmostEqual(cached_res['cnr_db'], res['cnr_db'])
+
+        # Non-finite parameters produce the same output with and without
+        # caching
+        text = ('{"eirp": 52, "rx_long": Infinity, "rx_lat": 29.71}\n'
+                '{"eirp": 52, "rx_long": -82.43, "rx_lat": NaN}\n'
+                '{"eirp": 52, "rx_long": -82.43, "rx_lat": 29.71, '
+                '"rx_dish_size": Infinity}\n')
+        out = io.StringIO()
+        cached_out = io.StringIO()
+        batch.run(io.StringIO(text), out, defaults=defaults)
+        batch.run(io.StringIO(text), cached_out, defaults=defaults,
+                  cache_size=8)
+        results = [json.loads(line) for line in out.getvalue().splitlines()]
+        cached_results = [json.loads(line)
+                          for line in cached_out.getvalue().splitlines()]
+        self.assertEqual(len(cached_results), 3)
+        self.assertIn('error', results[0])
+        self.assertEqual(cached_results[0], results[0])
+        for res, cached_res in zip(results[1:], cached_results[1:]):
+            np.testing.assert_allclose(cached_res['cnr_db'], res['cnr_db'])
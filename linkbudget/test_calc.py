@@ -10,6 +10,7 @@ References:
 """
 
 import unittest
+import numpy as np
 from . import calc, util
 
 
@@ -123,3 +124,71 @@ class TestBudgetCalc(unittest.TestCase):
             calc.capacity(snr_db=0, bw=1e3),
             1e3  # expected capacity in bps
         )
+
+    def test_cascade_noise_figure(self):
+        rng = np.random.default_rng(0)
+        nfs = rng.uniform(0.5, 10, (100, 6))
+        gains = rng.uniform(-10, 30, (100, 5))
+        total_nf = calc.cascade_noise_figure(nfs, gains)
+        self.assertEqual(total_nf.shape, (100,))
+        for i in range(100):
+            self.assertAlmostEqual(
+                total_nf[i],
+                calc.total_noise_figure(list(nfs[i]), list(gains[i])))
+
+        # The gain of the last device is ignored
+        gains_n = np.hstack((gains, np.full((100, 1), 50)))
+        np.testing.assert_allclose(calc.cascade_noise_figure(nfs, gains_n),
+                                   total_nf)
+
+        # Padding with 0 dB noise figure and 0 dB gain devices
+        padded = calc.cascade_noise_figure([0.6, 8.8, 10, 0, 0],
+                                           [40, -8.8, 0, 0])
+        self.assertAlmostEqual(
+            padded, calc.total_noise_figure([0.6, 8.8, 10], [40, -8.8]))
+
+        with self.assertRaises(ValueError):
+            calc.cascade_noise_figure(nfs, gains[:, :3])
+
+    def test_vectorized(self):
+        """Array arguments are processed element-wise with broadcasting"""
+        freq = np.array([4e9, 12.45e9])
+        diameter = np.array([[0.45], [3.05]])
+        gain = calc.dish_gain(diameter, freq)
+        self.assertEqual(gain.shape, (2, 2))
+        for i, d in enumerate(diameter[:, 0]):
+            for j, f in enumerate(freq):
+                self.assertAlmostEqual(gain[i, j], calc.dish_gain(d, f))
+
+        d = np.array([40e6, 364288e3])
+        np.testing.assert_allclose(
+            calc.path_loss(d, 11e9),
+            [calc.path_loss(x, 11e9) for x in d])
+
+        loss_db, nf = calc.coax_loss_nf(np.array([10, 110]))
+        np.testing.assert_allclose(loss_db, [0.8, 8.8])
+        np.testing.assert_allclose(nf, [0.8, 8.8])
+
+        total_nf = calc.total_noise_figure(
+            [np.array([0.6, 1.0]), 8.8, 10], [40, -8.8])
+        self.assertAlmostEqual(total_nf[0], 0.63, places=2)
+        self.assertAlmostEqual(
+            total_nf[1], calc.total_noise_figure([1.0, 8.8, 10], [40, -8.8]))
+
+        Te = calc.noise_fig_to_noise_temp(np.array([0, 0.29, 0.56]))
+        np.testing.assert_allclose(Te, [0, 20, 40], atol=0.1)
+        np.testing.assert_allclose(calc.noise_temp_to_noise_fig(Te),
+                                   [0, 0.29, 0.56])
+
+        cnr = calc.cnr(eirp_db=np.array([52, 55]), path_loss_db=205.73,
+                       rx_ant_gain_db=32.96, T_sys_db=18.01, bw=24e6)
+        np.testing.assert_allclose(cnr, [16.03, 19.03], atol=0.1)
+        np.testing.assert_allclose(
+            calc.capacity(snr_db=np.zeros(3), bw=np.array([1e3, 2e3, 3e3])),
+            [1e3, 2e3, 3e3])
+
+    def test_scalar_results(self):
+        """Scalar arguments still produce scalar results"""
+        self.assertIsInstance(calc.dish_gain(0.45, 12.45e9), float)
+        self.assertIsInstance(calc.path_loss(40e6, 11e9), float)
+        self.assertIsInstance(calc.capacity(10, 1e6), float)
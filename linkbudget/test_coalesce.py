@@ -0,0 +1,115 @@
+import asyncio
+import dataclasses
+import threading
+import time
+import unittest
+import unittest.mock
+from concurrent.futures import ThreadPoolExecutor
+from . import budget, coalesce
+from .test_budget import sa8_input
+
+
+class TestCoalesce(unittest.TestCase):
+    def setUp(self):
+        inp = sa8_input()
+        self.inputs = [dataclasses.replace(inp, rx_lat=i / 4)
+                       for i in range(200)]
+        # Computation failures
+        self.inputs[10] = dataclasses.replace(inp, freq=-1)
+        self.inputs[20] = dataclasses.replace(inp, freq=0)
+
+    def check_results(self, results):
+        for inp, res in zip(self.inputs, results):
+            if (inp.freq < 0):
+                self.assertIsInstance(res, ValueError)
+                continue
+            if (inp.freq == 0):
+                self.assertIsInstance(res, ZeroDivisionError)
+                continue
+            ref = budget.compute(inp)
+            self.assertAlmostEqual(res.cnr_db, ref.cnr_db)
+            self.assertAlmostEqual(res.elevation, ref.elevation)
+
+    def test_threads(self):
+        coalescer = coalesce.Coalescer(max_batch=32, max_wait=1e-3)
+
+        def analyze(inp):
+            try:
+                return coalescer.analyze(inp)
+            except (ValueError, ArithmeticError) as e:
+                return e
+
+        with ThreadPoolExecutor(max_workers=32) as executor:
+            results = list(executor.map(analyze, self.inputs))
+        self.check_results(results)
+
+        stats = coalescer.stats()
+        self.assertEqual(stats['inputs'], len(self.inputs))
+        self.assertLess(stats['batches'], len(self.inputs))
+        self.assertLessEqual(stats['max_size'], 32)
+        self.assertGreater(stats['max_size'], 1)
+
+    def test_isolated_call(self):
+        coalescer = coalesce.Coalescer(max_wait=0)
+        self.assertEqual(coalescer.analyze(self.inputs[0]),
+                         budget.compute(self.inputs[0]))
+        with self.assertRaises(ValueError):
+            coalescer.analyze(self.inputs[10])
+        # The lead is released after each batch
+        thread = threading.Thread(target=coalescer.analyze,
+                                  args=(self.inputs[1],))
+        thread.start()
+        thread.join(timeout=10)
+        self.assertFalse(thread.is_alive())
+        self.assertEqual(coalescer.stats()['batches'], 3)
+
+    def test_window(self):
+        """The window closes once the pending inputs stop growing"""
+        coalescer = coalesce.Coalescer(max_wait=10)
+        start = time.monotonic()
+        for inp in self.inputs[:5]:
+            coalescer.analyze(inp)
+        self.assertLess(time.monotonic() - start, 1)
+        self.assertEqual(coalescer.stats()['batches'], 5)
+
+    def test_async(self):
+        async def main():
+            coalescer = coalesce.AsyncCoalescer(max_batch=64)
+            results = await asyncio.gather(
+                *(coalescer.analyze(inp) for inp in self.inputs),
+                return_exceptions=True)
+            return results, coalescer.stats()
+
+        results, stats = asyncio.run(main())
+        self.check_results(results)
+        # Evaluated in full batches, given that all inputs were submitted
+        # concurrently
+        self.assertEqual(stats['batches'], 4)
+        self.assertEqual(stats['max_size'], 64)
+
+    def test_batch_failure(self):
+        # When the evaluation of a whole batch fails, its inputs are
+        # retried one at a time
+        compute_many = budget.compute_many
+
+        def failing_compute_many(inputs, cache=None):
+            if (len(inputs) > 1):
+                raise RuntimeError("batch failure")
+            return compute_many(inputs, cache)
+
+        async def main():
+            coalescer = coalesce.AsyncCoalescer(max_batch=64)
+            return await asyncio.gather(
+                *(coalescer.analyze(inp) for inp in self.inputs[:32]),
+                return_exceptions=True)
+
+        with unittest.mock.patch.object(budget, 'compute_many',
+                                        failing_compute_many):
+            results = asyncio.run(main())
+        self.check_results(results)
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            coalesce.Coalescer(max_batch=0)
+        with self.assertRaises(ValueError):
+            coalesce.AsyncCoalescer(max_wait=-1)
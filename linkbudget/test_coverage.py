@@ -0,0 +1,82 @@
+import os
+import tempfile
+import unittest
+import dataclasses
+import numpy as np
+from . import budget, coverage, main
+
+
+class TestCoverage(unittest.TestCase):
+    def setUp(self):
+        self.inp = budget.LinkBudgetInput(
+            eirp=52, freq=12.45e9, if_bw=24e6, rx_dish_size=0.46,
+            antenna_noise_temp=20, lnb_noise_fig=0.6, lnb_gain=40,
+            coax_length=110, rx_noise_fig=10, sat_long=-101, rx_long=None,
+            rx_lat=None)
+
+    def test_grid_axes(self):
+        lats, longs = coverage.grid_axes((10, 20, -90, -85), 2.5)
+        np.testing.assert_allclose(lats, [20, 17.5, 15, 12.5, 10])
+        np.testing.assert_allclose(longs, [-90, -87.5, -85])
+        with self.assertRaises(ValueError):
+            coverage.grid_axes((20, 10, -90, -85), 2.5)
+        with self.assertRaises(ValueError):
+            coverage.grid_axes((10, 20, -90, -85), 0)
+
+    def test_cells(self):
+        """Each cell should match the link budget of the same station"""
+        bbox = (-10, 30, -120, -60)
+        lats, longs = coverage.grid_axes(bbox, 5)
+        # Small blocks to exercise the processing in multiple blocks
+        grid = coverage.coverage(self.inp, bbox, 5, block_cells=20)
+        self.assertEqual(grid.shape, (len(lats), len(longs)))
+        self.assertEqual(grid.dtype, coverage.COVERAGE_DTYPE)
+
+        for i, j in [(0, 0), (3, 7), (len(lats) - 1, len(longs) - 1)]:
+            res = budget.compute(dataclasses.replace(
+                self.inp, rx_lat=lats[i], rx_long=longs[j]))
+            for name in coverage.COVERAGE_DTYPE.names:
+                self.assertAlmostEqual(grid[i, j][name] / getattr(res, name),
+                                       1, places=5)
+
+    def test_min_elevation(self):
+        grid = coverage.coverage(self.inp, (-80, 80, -180, 0), 2,
+                                 min_elevation=10)
+        below = grid['elevation'] < 10
+        self.assertTrue(below.any() and not below.all())
+        self.assertTrue(np.isnan(grid['cnr_db'][below]).all())
+        self.assertTrue(np.isnan(grid['capacity_bps'][below]).all())
+        self.assertFalse(np.isnan(grid['cnr_db'][~below]).any())
+        self.assertFalse(np.isnan(grid['elevation']).any())
+
+    def test_file_output(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            filename = os.path.join(tmpdir, 'map.npy')
+            grid = coverage.coverage(self.inp, (0, 10, -90, -80), 1,
+                                     filename=filename, block_cells=30)
+            saved = np.load(filename)
+            np.testing.assert_array_equal(saved, grid)
+            del grid
+
+    def test_cli(self):
+        parser = main.get_parser()
+        base_args = [
+            '--eirp', '52',
+            '--freq', '12.45e9',
+            '--if-bw', '24e6',
+            '--rx-dish-size', '0.46',
+            '--antenna-noise-temp', '20',
+            '--lnb-noise-fig', '0.6',
+            '--lnb-gain', '40',
+            '--coax-length', '110',
+            '--rx-noise-fig', '10',
+            '--sat-long', '-101',
+            '--coverage', 'map.npy'
+        ]
+        args = parser.parse_args(base_args + ['--bbox', '0', '10', '-90',
+                                              '-80'])
+        main.validate(parser, args)  # Rx coordinates are not required
+
+        with self.assertRaises(SystemExit):
+            args = parser.parse_args(base_args)  # missing bbox
+            main.validate(parser, args)
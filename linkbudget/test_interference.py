@@ -0,0 +1,164 @@
+import dataclasses
+import io
+import json
+import os
+import tempfile
+import unittest
+import unittest.mock
+import numpy as np
+from . import budget, interference, main, pointing
+from .test_budget import sa8_input
+
+
+class TestInterference(unittest.TestCase):
+    def setUp(self):
+        self.inp = sa8_input()
+        self.int_sat_long = np.array([-103, -99, -105, -97, 100])
+        self.int_eirp = np.array([52, 50, 54, 48, 60])
+
+    def test_off_axis_gain(self):
+        phi = np.linspace(0, 180, 3601)
+        for max_gain in (30, 45, 60):
+            for mask in interference.MASKS:
+                gain = interference.off_axis_gain(max_gain, phi, mask)
+                self.assertAlmostEqual(gain[0], max_gain)
+                # Non-increasing, except for the small steps of the
+                # envelopes at their breakpoints (e.g., 32 - 25 log(48) is
+                # slightly below -10 dBi)
+                self.assertTrue(np.all(np.diff(gain) < 0.03))
+                self.assertEqual(gain[-1], -10)
+
+            # Continuous from the main lobe to the sidelobes
+            fine_phi = np.linspace(0, 10, 100001)
+            gain = interference.off_axis_gain(max_gain, fine_phi)
+            self.assertLess(np.max(np.abs(np.diff(gain))), 0.1)
+
+        # Sidelobe envelopes
+        self.assertAlmostEqual(interference.off_axis_gain(45, 10), 7)
+        self.assertAlmostEqual(
+            interference.off_axis_gain(45, 10, 's580'), 4)
+        self.assertAlmostEqual(
+            interference.off_axis_gain(45, 25, 's580'), -3.5)
+        self.assertAlmostEqual(
+            interference.off_axis_gain(45, 30, 's580'),
+            interference.off_axis_gain(45, 30, 's465'))
+
+        with self.assertRaises(ValueError):
+            interference.off_axis_gain(45, 10, 's999')
+
+    def test_single_interferer(self):
+        res = interference.compute(self.inp, [-99], 50, isolation_db=3)
+        link = budget.compute(self.inp)
+        elevation, azimuth, _ = pointing.look_angles_batch(
+            -99, self.inp.rx_long, self.inp.rx_lat)
+        off_axis = pointing.off_axis_angle(link.elevation, link.azimuth,
+                                           elevation, azimuth)
+        self.assertAlmostEqual(res.off_axis[0], off_axis)
+
+        # Link budget of the interferer with the off-axis gain
+        ref = budget.compute(dataclasses.replace(
+            self.inp, sat_long=-99, eirp=50, rx_dish_size=None,
+            rx_dish_gain=interference.off_axis_gain(link.rx_dish_gain_db,
+                                                    off_axis).item()))
+        self.assertAlmostEqual(res.interference_dbw[0],
+                               ref.rx_power_dbw - 3, places=6)
+        self.assertAlmostEqual(res.total_interference_dbw,
+                               ref.rx_power_dbw - 3, places=6)
+        self.assertAlmostEqual(res.cir_db,
+                               link.rx_power_dbw - ref.rx_power_dbw + 3,
+                               places=6)
+
+    def test_aggregation(self):
+        res = interference.compute(self.inp, self.int_sat_long,
+                                   self.int_eirp)
+        self.assertEqual(res.off_axis.shape, (5,))
+        self.assertAlmostEqual(
+            res.total_interference_dbw,
+            10 * np.log10(np.sum(10**(res.interference_dbw[:4] / 10))))
+        # The satellite at 100 E is below the horizon
+        self.assertEqual(res.interference_dbw[4], -np.inf)
+        self.assertLess(res.cnir_db, min(res.link.cnr_db, res.cir_db))
+        self.assertLess(res.capacity_bps, res.link.capacity_bps)
+
+        # Closer and stronger interferers degrade the C/I
+        closer = interference.compute(self.inp, [-100], 52)
+        farther = interference.compute(self.inp, [-105], 52)
+        stronger = interference.compute(self.inp, [-105], 55)
+        self.assertLess(closer.cir_db, farther.cir_db)
+        self.assertAlmostEqual(stronger.cir_db, farther.cir_db - 3)
+
+        # A larger dish discriminates better
+        larger = interference.compute(
+            dataclasses.replace(self.inp, rx_dish_size=1.2), [-105], 52)
+        self.assertGreater(larger.cir_db, farther.cir_db)
+
+    def test_vectorized(self):
+        rx_long = np.array([-82.43, -100, -60, -120])
+        rx_lat = np.array([29.71, 40, -10, 35])
+        res = interference.compute(
+            dataclasses.replace(self.inp, rx_long=rx_long, rx_lat=rx_lat),
+            self.int_sat_long, self.int_eirp, mask='s580')
+        self.assertEqual(res.interference_dbw.shape, (4, 5))
+        self.assertEqual(res.cnir_db.shape, (4,))
+        for i in range(len(rx_long)):
+            ref = interference.compute(
+                dataclasses.replace(self.inp, rx_long=rx_long[i].item(),
+                                    rx_lat=rx_lat[i].item()),
+                self.int_sat_long, self.int_eirp, mask='s580')
+            np.testing.assert_allclose(res.off_axis[i], ref.off_axis)
+            self.assertAlmostEqual(res.cir_db[i], ref.cir_db)
+            self.assertAlmostEqual(res.cnir_db[i], ref.cnir_db)
+
+    def test_errors(self):
+        with self.assertRaises(ValueError):
+            interference.compute(self.inp, [], 52)
+        with self.assertRaises(ValueError):
+            interference.compute(self.inp, [-99, -103], [50, 51, 52])
+        with self.assertRaises(ValueError):
+            interference.compute(self.inp, [-99], 52, mask='s999')
+
+    def test_cli(self):
+        parser = main.get_parser()
+        base_args = [
+            '--eirp', '52', '--freq', '12.45e9', '--if-bw', '24e6',
+            '--rx-dish-size', '0.46', '--antenna-noise-temp', '20',
+            '--lnb-noise-fig', '0.6', '--lnb-gain', '40', '--coax-length',
+            '110', '--rx-noise-fig', '10', '--sat-long', '-101', '--rx-long',
+            '-82.43', '--rx-lat', '29.71'
+        ]
+        with tempfile.TemporaryDirectory() as tmpdir:
+            interferers_file = os.path.join(tmpdir, 'interferers.csv')
+            with open(interferers_file, 'w') as fd:
+                fd.write("sat-long,eirp,isolation\n")
+                for sat_long, eirp in zip(self.int_sat_long, self.int_eirp):
+                    fd.write("{},{},2\n".format(sat_long, eirp))
+
+            args = parser.parse_args(base_args + [
+                '--interferers', interferers_file, '--json'])
+            main.validate(parser, args)
+            with unittest.mock.patch('sys.stdout',
+                                     new=io.StringIO()) as out:
+                res = main.analyze(args)
+
+            args = parser.parse_args(base_args + [
+                '--interferers', interferers_file])
+            with self.assertLogs(level='INFO') as logs:
+                main.analyze(args)
+
+            invalid = [
+                ['--interferers', interferers_file, '--sweep',
+                 'coax_length=10,20'],
+                ['--interferers', os.path.join(tmpdir, 'missing.csv')],
+            ]
+            for extra in invalid:
+                with self.assertRaises(SystemExit):
+                    args = parser.parse_args(base_args + extra)
+                    main.validate(parser, args)
+
+        ref = interference.compute(self.inp, self.int_sat_long,
+                                   self.int_eirp, isolation_db=2)
+        self.assertEqual(json.loads(out.getvalue()), res)
+        self.assertAlmostEqual(res['interference']['cir_db'], ref.cir_db)
+        self.assertIsNone(res['interference']['interference_dbw'][4])
+        self.assertAlmostEqual(res['cnr_db'], ref.link.cnr_db)
+        self.assertTrue(any('(C/I)' in line for line in logs.output))
@@ -6,6 +6,8 @@ References:
      (Master's thesis).
 
 """
+import subprocess
+import sys
 import unittest
 from . import main
 
@@ -154,3 +156,44 @@ class TestBudgetAnalysis(unittest.TestCase):
             args = parser.parse_args(base_args +
                                      ['--radar', '--radar-cross-section', '0'])
             main.validate(parser, args)
+
+
+class TestStartup(unittest.TestCase):
+    def _imported_modules(self, args):
+        """Run the CLI on a new interpreter and list the imported modules"""
+        res = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c',
+             'from linkbudget.main import main; main()'] + args,
+            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+            universal_newlines=True, check=True)
+        # Lines formatted as "import time: self | cumulative | module"
+        return {line.split('|')[-1].strip()
+                for line in res.stderr.splitlines()
+                if line.startswith('import time:')}
+
+    def test_scalar_path_without_numpy(self):
+        """The scalar CLI path should not pay the NumPy import cost"""
+        args = [
+            '--eirp', '52',
+            '--freq', '12.45e9',
+            '--if-bw', '24e6',
+            '--rx-dish-size', '0.46',
+            '--antenna-noise-temp', '20',
+            '--lnb-noise-fig', '0.6',
+            '--lnb-gain', '40',
+            '--coax-length', '110',
+            '--rx-noise-fig', '10',
+            '--sat-long', '-101',
+            '--rx-long', '-82.43',
+            '--rx-lat', '29.71'
+        ]
+        for extra_args in ([], ['--json'],
+                           ['--rain-rate', '20', '--cloud-liquid', '0.5'],
+                           ['--atmosphere', '--json']):
+            modules = self._imported_modules(args + extra_args)
+            self.assertIn('linkbudget.budget', modules)
+            self.assertNotIn('numpy', modules)
+
+        # NumPy is still loaded on demand by the vectorized features
+        modules = self._imported_modules(args + ['--sweep', 'eirp=50,52'])
+        self.assertIn('numpy', modules)
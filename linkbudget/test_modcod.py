@@ -0,0 +1,149 @@
+import io
+import json
+import math
+import os
+import tempfile
+import unittest
+import unittest.mock
+import numpy as np
+from . import batch, budget, main, modcod
+
+
+class TestModcod(unittest.TestCase):
+    def setUp(self):
+        self.table = modcod.get_table('dvb-s2')
+
+    def test_tables(self):
+        for name in modcod.TABLES:
+            table = modcod.get_table(name)
+            self.assertEqual(len(table), len(modcod.TABLES[name]))
+            self.assertEqual(list(table.esno_db), sorted(table.esno_db))
+            # The selected efficiency never decreases with the Es/N0
+            efficiency = [table.efficiency[i] for i in table.best]
+            self.assertEqual(efficiency, sorted(efficiency))
+            for i, best in enumerate(table.best):
+                self.assertLessEqual(best, i)
+                self.assertEqual(table.efficiency[best],
+                                 max(table.efficiency[:i + 1]))
+
+        # DVB-S2X is at least as efficient as DVB-S2
+        s2x = modcod.get_table('dvb-s2x')
+        cnr_db = np.linspace(-5, 20, 101)
+        self.assertTrue(np.all(
+            modcod.select(cnr_db, 36e6, s2x).efficiency >=
+            modcod.select(cnr_db, 36e6, self.table).efficiency))
+
+    def test_select(self):
+        # At the threshold of QPSK 3/4, with no roll-off
+        sel = modcod.select(4.03, 36e6, self.table, rolloff=0)
+        self.assertEqual(sel.modcod, 'QPSK 3/4')
+        self.assertEqual(sel.margin_db, 0)
+        self.assertAlmostEqual(sel.bitrate_bps, 36e6 * 1.487473)
+
+        # Es/N0 above the C/N, and symbol rate below the bandwidth
+        sel = modcod.select(4.03, 36e6, self.table, rolloff=0.2)
+        self.assertAlmostEqual(sel.esno_db, 4.03 + 10 * math.log10(1.2))
+        self.assertEqual(sel.modcod, 'QPSK 4/5')
+        self.assertAlmostEqual(sel.bitrate_bps, 30e6 * 1.587196)
+
+        # 8PSK 3/5 is more robust than QPSK 8/9, but more efficient
+        sel = modcod.select(6.3, 36e6, self.table, rolloff=0)
+        self.assertEqual(sel.modcod, '8PSK 3/5')
+        self.assertAlmostEqual(sel.margin_db, 0.8)
+
+        # Below the most robust MODCOD
+        sel = modcod.select(-3.35, 36e6, self.table, rolloff=0)
+        self.assertIsNone(sel.modcod)
+        self.assertEqual(sel.index, -1)
+        self.assertEqual(sel.bitrate_bps, 0)
+        self.assertAlmostEqual(sel.margin_db, -1)
+
+        sel = modcod.select(math.nan, 36e6, self.table)
+        self.assertIsNone(sel.modcod)
+        self.assertTrue(math.isnan(sel.margin_db))
+
+    def test_vectorized(self):
+        table = modcod.get_table('dvb-s2x')
+        cnr_db = np.concatenate([np.linspace(-10, 25, 1001), [np.nan]])
+        sel = modcod.select(cnr_db, 36e6, table, rolloff=0.1)
+        for i, val in enumerate(cnr_db):
+            ref = modcod.select(val.item(), 36e6, table, rolloff=0.1)
+            self.assertEqual(sel.index[i], ref.index)
+            self.assertEqual(sel.modcod[i], ref.modcod)
+            self.assertAlmostEqual(sel.bitrate_bps[i], ref.bitrate_bps)
+            np.testing.assert_equal(sel.margin_db[i], ref.margin_db)
+
+    def test_read_csv(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            filename = os.path.join(tmpdir, 'modem.csv')
+            with open(filename, 'w') as fd:
+                fd.write("modcod,esno-db,efficiency\n"
+                         "8PSK 2/3,7.1,1.98\n"
+                         "QPSK 1/2,1.5,0.99\n")
+            table = modcod.get_table(filename)
+            self.assertEqual(table.modcods, ('QPSK 1/2', '8PSK 2/3'))
+            self.assertEqual(
+                modcod.select(6, 10e6, table, rolloff=0).modcod, 'QPSK 1/2')
+
+            invalid = [
+                "modcod,efficiency\nQPSK 1/2,0.99\n",
+                "modcod,esno-db,efficiency\nQPSK 1/2,x,0.99\n",
+                "modcod,esno-db,efficiency\nQPSK 1/2,1.5,0\n",
+                "modcod,esno-db,efficiency\n",
+            ]
+            for content in invalid:
+                with open(filename, 'w') as fd:
+                    fd.write(content)
+                with self.assertRaises(ValueError):
+                    modcod.read_csv(filename)
+
+    def test_cli(self):
+        parser = main.get_parser()
+        base_args = [
+            '--eirp', '52', '--freq', '12.45e9', '--if-bw', '24e6',
+            '--rx-dish-size', '0.46', '--antenna-noise-temp', '20',
+            '--lnb-noise-fig', '0.6', '--lnb-gain', '40', '--coax-length',
+            '110', '--rx-noise-fig', '10', '--sat-long', '-101', '--rx-long',
+            '-82.43', '--rx-lat', '29.71'
+        ]
+        args = parser.parse_args(base_args + [
+            '--modcod-table', 'dvb-s2x', '--rolloff', '0.05', '--json'])
+        main.validate(parser, args)
+        with unittest.mock.patch('sys.stdout', new=io.StringIO()) as out:
+            res = main.analyze(args)
+        self.assertEqual(json.loads(out.getvalue()), res)
+        ref = modcod.select(res['cnr_db'], 24e6,
+                            modcod.get_table('dvb-s2x'), rolloff=0.05)
+        self.assertEqual(res['modcod'], modcod.to_dict(ref))
+
+        args = parser.parse_args(base_args + ['--modcod-table', 'dvb-s2'])
+        with self.assertLogs(level='INFO') as logs:
+            main.analyze(args)
+        self.assertTrue(any('MODCOD' in line for line in logs.output))
+
+        invalid = [
+            ['--modcod-table', 'missing.csv'],
+            ['--modcod-table', 'dvb-s2', '--rolloff', '-0.1'],
+            ['--modcod-table', 'dvb-s2', '--sweep', 'coax_length=10,20'],
+        ]
+        for extra in invalid:
+            with self.assertRaises(SystemExit):
+                args = parser.parse_args(base_args + extra)
+                main.validate(parser, args)
+
+    def test_batch(self):
+        scenarios = [
+            (1, {'eirp': 52, 'freq': 12.45e9, 'if-bw': 24e6,
+                 'rx-dish-size': 0.46, 'antenna-noise-temp': 20,
+                 'lnb-noise-fig': 0.6, 'lnb-gain': 40, 'coax-length': 110,
+                 'rx-noise-fig': 10, 'sat-long': -101, 'rx-long': -82.43,
+                 'rx-lat': 29.71}),
+            (2, {'eirp': 52}),
+        ]
+        results = list(batch.evaluate(
+            scenarios, modcod={'table': self.table, 'rolloff': 0.2}))
+        inp = batch.to_input(scenarios[0][1])
+        ref = modcod.select(budget.compute(inp).cnr_db, inp.if_bw,
+                            self.table)
+        self.assertEqual(results[0]['modcod'], modcod.to_dict(ref))
+        self.assertIn('error', results[1])
@@ -0,0 +1,164 @@
+import dataclasses
+import io
+import json
+import unittest
+import unittest.mock
+import numpy as np
+from . import budget, calc, main, montecarlo
+from .test_budget import sa8_input
+
+
+class TestMonteCarlo(unittest.TestCase):
+    def setUp(self):
+        self.inp = sa8_input()
+        self.dists = montecarlo.parse_sample_opts([
+            'antenna-noise-temp=normal:20,5',
+            'lnb_noise_fig=uniform:0.5,0.8',
+            'pointing-loss=rayleigh:0.3',
+            'extra_loss=lognormal:-1,0.5'
+        ])
+
+    def reference(self, n_draws, seed):
+        """Draws of a single-chunk run evaluated directly"""
+        rng = np.random.default_rng(np.random.SeedSequence(seed).spawn(1)[0])
+        samples = {name: montecarlo._sample(dist, rng, n_draws)
+                   for name, dist in self.dists.items()}
+        inp = dataclasses.replace(
+            self.inp, antenna_noise_temp=samples['antenna_noise_temp'],
+            lnb_noise_fig=samples['lnb_noise_fig'])
+        cnr_db = budget.compute(inp).cnr_db - samples['pointing_loss'] - \
+            samples['extra_loss']
+        return cnr_db, calc.capacity(cnr_db, self.inp.if_bw)
+
+    def test_parse_distribution(self):
+        self.assertEqual(montecarlo.parse_distribution('normal:20,5'),
+                         montecarlo.Distribution('normal', (20, 5)))
+        self.assertEqual(montecarlo.parse_distribution('const:3'),
+                         montecarlo.Distribution('const', (3,)))
+        invalid = ['gamma:1', 'normal:1', 'normal:a,b', 'normal:1,-1',
+                   'uniform']
+        for spec in invalid:
+            with self.assertRaises(ValueError):
+                montecarlo.parse_distribution(spec)
+
+    def test_parse_sample_opts(self):
+        self.assertEqual(list(self.dists), [
+            'antenna_noise_temp', 'lnb_noise_fig', 'pointing_loss',
+            'extra_loss'])
+        invalid = [
+            ['freq'],  # missing distribution
+            ['unknown=normal:1,1'],
+            ['radar=const:1'],
+            ['freq=const:1', 'freq=const:2'],
+        ]
+        for opts in invalid:
+            with self.assertRaises(ValueError):
+                montecarlo.parse_sample_opts(opts, self.inp)
+
+    def test_statistics(self):
+        n_draws = 100000
+        stats = montecarlo.run(self.inp, self.dists, n_draws, seed=7,
+                               chunk_size=n_draws, outage_cnr=14.5,
+                               percentiles=(0, 1, 50, 99, 100))
+        cnr_db, capacity_bps = self.reference(n_draws, 7)
+
+        self.assertEqual(stats['draws'], n_draws)
+        self.assertEqual(stats['seed'], 7)
+        self.assertEqual(stats['invalid'], 0)
+        self.assertAlmostEqual(stats['cnr_db']['mean'], cnr_db.mean())
+        self.assertAlmostEqual(stats['cnr_db']['std'], cnr_db.std())
+        self.assertEqual(stats['cnr_db']['min'], cnr_db.min())
+        self.assertAlmostEqual(stats['capacity_bps']['mean'] /
+                               capacity_bps.mean(), 1)
+        self.assertEqual(stats['outage_probability'],
+                         np.mean(cnr_db < 14.5))
+
+        # Percentiles within the histogram resolution
+        for q, val in stats['cnr_db']['percentiles'].items():
+            self.assertAlmostEqual(val, np.percentile(cnr_db, float(q)),
+                                   delta=montecarlo.CNR_BINS[2])
+        for q, val in stats['capacity_bps']['percentiles'].items():
+            self.assertAlmostEqual(
+                val / np.percentile(capacity_bps, float(q)), 1, delta=1e-3)
+
+    def test_reproducibility(self):
+        kwargs = dict(n_draws=50000, seed=1, chunk_size=4096,
+                      outage_capacity=110e6)
+        stats = montecarlo.run(self.inp, self.dists, **kwargs)
+        self.assertEqual(stats, montecarlo.run(self.inp, self.dists,
+                                               **kwargs))
+
+        # The draws do not depend on the number of workers
+        stats_parallel = montecarlo.run(self.inp, self.dists, workers=2,
+                                        **kwargs)
+        self.assertEqual(stats_parallel['outage_probability'],
+                         stats['outage_probability'])
+        self.assertEqual(stats_parallel['cnr_db']['percentiles'],
+                         stats['cnr_db']['percentiles'])
+        self.assertAlmostEqual(stats_parallel['cnr_db']['mean'],
+                               stats['cnr_db']['mean'])
+
+        kwargs['seed'] = 2
+        self.assertNotEqual(stats, montecarlo.run(self.inp, self.dists,
+                                                  **kwargs))
+
+    def test_invalid_draws(self):
+        # Negative system noise temperatures produce NaN, counted as outages
+        dists = montecarlo.parse_sample_opts(
+            ['antenna_noise_temp=normal:-400,300'])
+        stats = montecarlo.run(self.inp, dists, 10000, seed=0)
+        self.assertGreater(stats['invalid'], 0)
+        self.assertIsNone(stats['outage_probability'])
+        stats = montecarlo.run(self.inp, dists, 10000, seed=0, outage_cnr=-50)
+        self.assertEqual(stats['outage_probability'],
+                         stats['invalid'] / stats['draws'])
+
+    def test_errors(self):
+        with self.assertRaises(ValueError):
+            montecarlo.run(self.inp, self.dists, 0)
+        with self.assertRaises(ValueError):
+            montecarlo.run(self.inp, self.dists, 10, percentiles=(101,))
+        # Missing dish
+        inp = dataclasses.replace(self.inp, rx_dish_size=None)
+        with self.assertRaises(ValueError):
+            montecarlo.run(inp, self.dists, 10)
+        # The sampled parameter replaces its alternatives
+        dists = montecarlo.parse_sample_opts(['rx_dish_gain=normal:33,1'])
+        stats = montecarlo.run(self.inp, dists, 10, seed=0)
+        self.assertEqual(stats['invalid'], 0)
+
+    def test_cli(self):
+        parser = main.get_parser()
+        base_args = [
+            '--eirp', '52', '--freq', '12.45e9', '--if-bw', '24e6',
+            '--lnb-noise-fig', '0.6', '--lnb-gain', '40',
+            '--coax-length', '110', '--rx-noise-fig', '10',
+            '--rx-dish-size', '0.46', '--sat-long', '-101',
+            '--rx-long', '-82.43', '--rx-lat', '29.71', '--json'
+        ]
+        args = parser.parse_args(base_args + [
+            '--monte-carlo', '1000', '--seed', '3', '--percentiles', '5,95',
+            '--sample', 'antenna-noise-temp=normal:20,5',
+            '--outage-cnr', '15.9'
+        ])
+        main.validate(parser, args)
+        with unittest.mock.patch('sys.stdout', new=io.StringIO()) as out:
+            main.run_monte_carlo(args)
+        stats = json.loads(out.getvalue())
+        self.assertEqual(stats['draws'], 1000)
+        self.assertEqual(list(stats['cnr_db']['percentiles']), ['5', '95'])
+        self.assertGreater(stats['outage_probability'], 0)
+
+        invalid = [
+            ['--sample', 'antenna-noise-temp=const:20'],  # no --monte-carlo
+            ['--monte-carlo', '0', '--antenna-noise-temp', '20'],
+            ['--monte-carlo', '10'],  # missing antenna noise temperature
+            ['--monte-carlo', '10', '--antenna-noise-temp', '20',
+             '--sweep', 'freq=12e9'],
+            ['--monte-carlo', '10', '--antenna-noise-temp', '20',
+             '--percentiles', '50,120'],
+        ]
+        for extra in invalid:
+            with self.assertRaises(SystemExit):
+                args = parser.parse_args(base_args + extra)
+                main.validate(parser, args)
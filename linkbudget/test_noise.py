@@ -0,0 +1,91 @@
+import dataclasses
+import unittest
+from . import batch, budget, calc, noise, sweep
+from .test_budget import sa8_input
+
+
+class TestNoiseChain(unittest.TestCase):
+    def setUp(self):
+        self.inp = sa8_input()
+        self.chain = [
+            {'name': 'lnb', 'nf': 0.6, 'gain': 40},
+            {'name': 'coax', 'coax_length': 110},
+            {'name': 'receiver', 'nf': 10}
+        ]
+
+    def test_device_figures(self):
+        self.assertEqual(noise.device_figures({'nf': 3, 'gain': 20}),
+                         (3, 20))
+        self.assertEqual(noise.device_figures({'nf': 3}), (3, 0))
+        self.assertEqual(noise.device_figures({'loss': 2}), (2, -2))
+        nf, gain = noise.device_figures({'noise_temp': 290, 'gain': 10})
+        self.assertAlmostEqual(nf, 3.01, places=2)
+        self.assertEqual(gain, 10)
+        nf, gain = noise.device_figures({'coax_length': 110})
+        self.assertAlmostEqual(nf, 8.8)
+        self.assertAlmostEqual(gain, -8.8)
+
+        for device in ({'gain': 10}, {'nf': 1, 'loss': 1},
+                       {'loss': 1, 'gain': 1}, {'nf': '1'}, {'nf': True},
+                       {'nf': 1, 'unknown': 1}, [1, 2]):
+            with self.assertRaises(ValueError):
+                noise.device_figures(device)
+
+    def test_parse_chain(self):
+        self.assertEqual(
+            noise.parse_chain('[{"nf": 0.6, "gain": 40}, {"loss": 1}]'),
+            [{'nf': 0.6, 'gain': 40}, {'loss': 1}])
+        for spec in ('[]', '{"nf": 1}', 'nf=1', [], [{'gain': 1}]):
+            with self.assertRaises(ValueError):
+                noise.parse_chain(spec)
+
+    def test_cascade(self):
+        chains = [
+            self.chain,
+            [{'nf': 1, 'gain': 30}],
+            [{'nf': 0.8, 'gain': 60}, {'loss': 3}, {'nf': 2, 'gain': 20},
+             {'loss': 6}, {'coax_length': 50}, {'nf': 8}],
+        ]
+        total_nf = noise.cascade(chains)
+        self.assertEqual(total_nf.shape, (3,))
+        for chain, nf in zip(chains, total_nf):
+            self.assertAlmostEqual(nf, noise.noise_figure(chain))
+        self.assertAlmostEqual(total_nf[0], calc.total_noise_figure(
+            [0.6, 8.8, 10], [40, -8.8]))
+
+    def test_compute(self):
+        """The default chain expressed as a noise chain"""
+        ref = budget.compute(self.inp)
+        inp = dataclasses.replace(
+            self.inp, lnb_noise_fig=None, lnb_gain=None, coax_length=None,
+            rx_noise_fig=None, noise_chain=self.chain)
+        inp.validate()
+        res = budget.compute(inp)
+        self.assertAlmostEqual(res.noise_fig_db, ref.noise_fig_db)
+        self.assertAlmostEqual(res.cnr_db, ref.cnr_db)
+        self.assertIsNone(res.lnb_noise_fig_db)
+        self.assertIsNone(res.coax_loss_db)
+
+        # Round trip through a structured record
+        rec = res.to_records()[0]
+        self.assertEqual(budget.LinkBudgetResult.from_record(rec), res)
+
+        # Mutually exclusive with the default chain parameters
+        with self.assertRaises(ValueError):
+            dataclasses.replace(inp, lnb_gain=40).validate()
+
+    def test_batch(self):
+        defaults = dataclasses.asdict(self.inp)
+        scenario = {'noise-chain': '[{"nf": 0.6, "gain": 40}, {"loss": 3}]'}
+        inp = batch.to_input(scenario, defaults)
+        self.assertEqual(len(inp.noise_chain), 2)
+        # The noise chain overrides the default chain parameters
+        self.assertIsNone(inp.lnb_noise_fig)
+        self.assertIsNone(inp.coax_length)
+
+        with self.assertRaises(ValueError):
+            batch.to_input({'noise_chain': [{'gain': 3}]}, defaults)
+
+    def test_not_swept(self):
+        with self.assertRaises(ValueError):
+            sweep.parse_sweep_opts(['noise-chain=1,2'], self.inp)
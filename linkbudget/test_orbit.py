@@ -0,0 +1,88 @@
+import unittest
+import numpy as np
+from . import budget, orbit, pointing
+from .test_budget import sa8_input
+
+
+class TestOrbit(unittest.TestCase):
+    def setUp(self):
+        self.inp = sa8_input()
+
+    def test_circular_orbit(self):
+        altitude = 550e3
+        a = orbit.R_EQ + altitude
+        period = 2 * np.pi * np.sqrt(a**3 / orbit.MU)
+        t = np.linspace(0, period, 101)
+        # With zero GMST and RAAN of 90 degrees, the satellite starts on the
+        # ascending node along the ECEF y-axis
+        x, y, z = orbit.circular_orbit(t, altitude, inclination=53,
+                                       raan=90)
+        np.testing.assert_allclose(np.sqrt(x**2 + y**2 + z**2), a)
+        np.testing.assert_allclose([x[0], y[0], z[0]], [0, a, 0], atol=1e-6)
+        # Maximum latitude given by the inclination
+        lat = np.degrees(np.arcsin(z / a))
+        self.assertAlmostEqual(lat.max(), 53, places=1)
+
+    def test_elliptical_orbit(self):
+        # Molniya-like orbit
+        a = 26560e3
+        ecc = 0.74
+        period = 2 * np.pi * np.sqrt(a**3 / orbit.MU)
+        t = np.linspace(0, period, 1001)
+        x, y, z = orbit.propagate(t, a, ecc, inclination=63.4,
+                                  arg_perigee=270)
+        r = np.sqrt(x**2 + y**2 + z**2)
+        self.assertAlmostEqual(r[0] / (a * (1 - ecc)), 1)
+        self.assertAlmostEqual(r.max() / (a * (1 + ecc)), 1, places=5)
+        # Perigee over the southern hemisphere (argument of perigee of 270)
+        self.assertLess(z[0], 0)
+
+        with self.assertRaises(ValueError):
+            orbit.propagate(t, a, 1.2)
+        with self.assertRaises(ValueError):
+            orbit.propagate(t, 1e6)
+
+    def test_kepler_equation(self):
+        M = np.linspace(0, 2 * np.pi, 50)
+        for ecc in (0.1, 0.5, 0.95):
+            E = orbit._eccentric_anomaly(M, ecc)
+            np.testing.assert_allclose(E - ecc * np.sin(E), M, atol=1e-10)
+
+    def test_geostationary(self):
+        """A geostationary orbit should match the GEO look angles"""
+        x, y, z = orbit.circular_orbit(np.array([0.0]), 35786e3,
+                                       arg_latitude=-101)
+        res = orbit.time_series(self.inp, x, y, z)
+        ref = budget.compute(self.inp)
+        self.assertAlmostEqual(res.elevation[0], ref.elevation)
+        self.assertAlmostEqual(res.azimuth[0], ref.azimuth)
+        self.assertAlmostEqual(res.slant_range[0], ref.slant_range, places=3)
+        self.assertAlmostEqual(res.cnr_db[0], ref.cnr_db)
+
+    def test_look_angles_ecef(self):
+        # Satellite right above the station
+        x, y, z = pointing.geodetic_to_ecef(-82.43, 29.71, 1000e3)
+        elev, _, slant_range = pointing.look_angles_ecef(x, y, z, -82.43,
+                                                         29.71)
+        self.assertAlmostEqual(elev, 90)
+        self.assertAlmostEqual(slant_range, 1000e3, places=3)
+
+    def test_time_series(self):
+        t = np.arange(0, 86400, 10.0)
+        pos = orbit.circular_orbit(t, 550e3, inclination=53)
+        res = orbit.time_series(self.inp, *pos)
+        for attr in ('elevation', 'azimuth', 'slant_range', 'path_loss_db',
+                     'cnr_db', 'capacity_bps'):
+            self.assertEqual(np.shape(getattr(res, attr)), t.shape)
+
+        # Each epoch matches the link budget computed with its geometry
+        visible = np.flatnonzero(res.elevation > 0)
+        self.assertGreater(len(visible), 0)
+        i = visible[0]
+        ref = budget.compute(self.inp, geometry=(
+            res.elevation[i], res.azimuth[i], res.slant_range[i]))
+        self.assertAlmostEqual(res.cnr_db[i], ref.cnr_db)
+
+        # A LEO satellite is much closer than a GEO satellite
+        self.assertGreater(res.cnr_db[visible].max(),
+                           budget.compute(self.inp).cnr_db)
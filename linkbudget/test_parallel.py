@@ -0,0 +1,60 @@
+import dataclasses
+import io
+import json
+import unittest
+from . import batch, budget, parallel
+
+
+class TestParallel(unittest.TestCase):
+    def setUp(self):
+        self.defaults = {
+            'freq': 12.45e9,
+            'if_bw': 24e6,
+            'antenna_noise_temp': 20,
+            'lnb_noise_fig': 0.6,
+            'lnb_gain': 40,
+            'coax_length': 110,
+            'rx_noise_fig': 10,
+            'sat_long': -101,
+            'rx_long': -82.43,
+            'rx_lat': 29.71
+        }
+
+    def test_chunks(self):
+        chunks = list(parallel._chunks(range(7), 3))
+        self.assertEqual(chunks, [[0, 1, 2], [3, 4, 5], [6]])
+
+    def test_compute(self):
+        base = budget.LinkBudgetInput(eirp=52, rx_dish_size=0.46,
+                                      **self.defaults)
+        # Heterogeneous inputs (EIRP vs. Tx power, radar vs. non-radar)
+        inputs = []
+        for i in range(25):
+            if (i % 3 == 0):
+                inp = dataclasses.replace(base, eirp=None, tx_power=i,
+                                          tx_dish_gain=40)
+            elif (i % 3 == 1):
+                inp = dataclasses.replace(base, radar=True,
+                                          radar_alt=355600e3,
+                                          radar_cross_section=0.61685e12)
+            else:
+                inp = dataclasses.replace(base, coax_length=i)
+            inputs.append(inp)
+
+        results = list(parallel.compute(inputs, workers=2, chunk_size=4))
+        self.assertEqual(results, [budget.compute(inp) for inp in inputs])
+
+    def test_batch(self):
+        lines = [json.dumps({'eirp': 40 + i, 'rx_dish_size': 0.46})
+                 for i in range(20)]
+        lines.insert(5, '{"eirp": 52}')  # invalid (missing the dish)
+        text = '\n'.join(lines) + '\n'
+
+        serial_out = io.StringIO()
+        batch.run(io.StringIO(text), serial_out, defaults=self.defaults)
+
+        parallel_out = io.StringIO()
+        count = batch.run(io.StringIO(text), parallel_out,
+                          defaults=self.defaults, workers=2, chunk_size=3)
+        self.assertEqual(count, 21)
+        self.assertEqual(parallel_out.getvalue(), serial_out.getvalue())
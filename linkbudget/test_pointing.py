@@ -1,4 +1,5 @@
 import unittest
+import numpy as np
 from . import pointing
 
 
@@ -95,3 +96,77 @@ class TestPointing(unittest.TestCase):
             # considers the actual longitude of the satellite based on
             # ephemeris data instead of the nominal.
             self.assertAlmostEqual(slant_range_km, info['distance'], delta=12)
+
+    def test_look_angles_batch(self):
+        """Batch computation matches the computation for each station"""
+        sat_long = np.array([-113, -101, -37.5, 138])
+        rx_long = np.array([-46.6333, -77.0369, -118.2437, 13.4050, 151.2093])
+        rx_lat = np.array([-23.5505, 38.9072, 34.0522, 52.5200, -33.8688])
+
+        for implementation in ['ellipsoidal', 'spherical']:
+            # Station x satellite matrix
+            elevation, azimuth, slant_range = pointing.look_angles_batch(
+                sat_long[np.newaxis, :],
+                rx_long[:, np.newaxis],
+                rx_lat[:, np.newaxis],
+                implementation=implementation)
+            self.assertEqual(elevation.shape, (5, 4))
+            self.assertEqual(azimuth.shape, (5, 4))
+            self.assertEqual(slant_range.shape, (5, 4))
+
+            for i in range(len(rx_long)):
+                for j in range(len(sat_long)):
+                    expected = pointing.look_angles(
+                        sat_long[j], rx_long[i], rx_lat[i],
+                        implementation=implementation)
+                    self.assertAlmostEqual(elevation[i, j], expected[0])
+                    self.assertAlmostEqual(azimuth[i, j], expected[1])
+                    self.assertAlmostEqual(slant_range[i, j], expected[2],
+                                           places=3)
+
+        # Station height
+        _, _, slant_range = pointing.look_angles_batch(
+            -101, rx_long, rx_lat, rx_height=np.array([0, 1e3, 0, 0, 0]))
+        self.assertLess(slant_range[1], pointing.look_angles(
+            -101, rx_long[1], rx_lat[1])[2])
+
+    def test_look_angles_dispatch(self):
+        """Scalar inputs give floats and array inputs give arrays"""
+        elevation, azimuth, slant_range = pointing.look_angles(
+            -101, -82.43, 29.71)
+        self.assertIsInstance(elevation, float)
+        self.assertIsInstance(azimuth, float)
+        self.assertIsInstance(slant_range, float)
+
+        # The scalar implementation matches the vectorized one
+        expected = pointing.look_angles_batch(-101, -82.43, 29.71)
+        self.assertAlmostEqual(elevation, expected[0], places=9)
+        self.assertAlmostEqual(azimuth, expected[1], places=9)
+        self.assertAlmostEqual(slant_range, expected[2], places=6)
+
+        elevation, azimuth, slant_range = pointing.look_angles(
+            -101, np.array([-82.43, -77.0369]), np.array([29.71, 38.9072]))
+        self.assertEqual(elevation.shape, (2,))
+        self.assertEqual(azimuth.shape, (2,))
+        self.assertEqual(slant_range.shape, (2,))
+
+    def test_off_axis_angle(self):
+        # Along the horizon, the off-axis angle is the azimuth difference
+        self.assertAlmostEqual(pointing.off_axis_angle(0, 10, 0, 30), 20)
+        self.assertAlmostEqual(pointing.off_axis_angle(0, 0, 0, 180), 180)
+        # Along the same azimuth, it is the elevation difference
+        self.assertAlmostEqual(pointing.off_axis_angle(30, 180, 35, 180), 5)
+        # At the zenith, the azimuth is irrelevant
+        self.assertAlmostEqual(pointing.off_axis_angle(90, 0, 90, 120), 0)
+        # Narrowed by the elevation: cos(30) * 2 degrees, approximately
+        self.assertAlmostEqual(pointing.off_axis_angle(30, 180, 30, 182),
+                               2 * np.cos(np.radians(30)), places=3)
+
+        # Array and scalar implementations
+        el = np.array([10, 30, 45])
+        az = np.array([100, 180, 359])
+        res = pointing.off_axis_angle(el, az, 40, 5)
+        for i in range(len(el)):
+            self.assertAlmostEqual(
+                res[i], pointing.off_axis_angle(el[i].item(), az[i].item(),
+                                                40, 5))
@@ -0,0 +1,95 @@
+import json
+import os
+import tempfile
+import unittest
+import unittest.mock
+from . import budget, calc, main, profiler
+from .cache import LinkBudgetCache
+from .test_budget import sa8_input
+
+
+class TestProfiler(unittest.TestCase):
+    def setUp(self):
+        self.inp = sa8_input()
+
+    def test_profiling(self):
+        ref = budget.compute(self.inp)
+        with profiler.profiling() as prof:
+            for _ in range(3):
+                res = budget.compute(self.inp)
+        self.assertEqual(res, ref)
+
+        timings = prof.to_dict()
+        self.assertEqual(timings['budget.compute']['calls'], 3)
+        for stage in budget.STAGES:
+            self.assertEqual(timings['stage.' + stage.name]['calls'], 3)
+        self.assertEqual(timings['calc.dish_gain']['calls'], 3)
+        self.assertEqual(timings['pointing.look_angles']['calls'], 3)
+        self.assertGreater(timings['budget.compute']['total_s'], 0)
+        # Sorted by decreasing total time
+        totals = [t['total_s'] for t in timings.values()]
+        self.assertEqual(totals, sorted(totals, reverse=True))
+        self.assertEqual(len(prof.render()), len(timings) + 1)
+
+    def test_cache(self):
+        """A cache created beforehand runs the instrumented functions"""
+        cache = LinkBudgetCache()
+        with profiler.profiling() as prof:
+            for _ in range(3):
+                budget.compute(self.inp, cache)
+        timings = prof.to_dict()
+        self.assertEqual(timings['budget.compute']['calls'], 3)
+        # Computed once, then read from the cache
+        self.assertEqual(timings['calc.dish_gain']['calls'], 1)
+        self.assertEqual(timings['pointing.look_angles']['calls'], 1)
+
+    def test_restore(self):
+        stages = budget.STAGES
+        dish_gain = calc.dish_gain
+        with self.assertRaises(ValueError):
+            with profiler.profiling():
+                self.assertIsNot(calc.dish_gain, dish_gain)
+                budget.compute(self.inp)
+                raise ValueError
+        self.assertIs(budget.STAGES, stages)
+        self.assertIs(calc.dish_gain, dish_gain)
+
+        # Nothing is recorded once disabled
+        with profiler.profiling() as prof:
+            pass
+        budget.compute(self.inp)
+        self.assertEqual(prof.timings, {})
+
+    def test_aggregate(self):
+        prof = profiler.Profiler()
+        for _ in range(2):
+            with profiler.profiling(prof):
+                budget.compute(self.inp)
+        self.assertEqual(prof.to_dict()['budget.compute']['calls'], 2)
+        prof.reset()
+        self.assertEqual(prof.to_dict(), {})
+
+    def test_nested(self):
+        with profiler.profiling():
+            with self.assertRaises(RuntimeError):
+                with profiler.profiling():
+                    pass
+
+    def test_cli(self):
+        parser = main.get_parser()
+        with tempfile.TemporaryDirectory() as tmpdir:
+            filename = os.path.join(tmpdir, 'profile.json')
+            args = parser.parse_args([
+                '--eirp', '52', '--freq', '12.45e9', '--if-bw', '24e6',
+                '--rx-dish-size', '0.46', '--antenna-noise-temp', '20',
+                '--lnb-noise-fig', '0.6', '--lnb-gain', '40',
+                '--coax-length', '110', '--rx-noise-fig', '10',
+                '--sat-long', '-101', '--rx-long', '-82.43',
+                '--rx-lat', '29.71', '--json', '--profile', filename
+            ])
+            with unittest.mock.patch('builtins.print'):
+                main.run_profile(args)
+            with open(filename) as fd:
+                report = json.load(fd)
+        self.assertGreater(report['total_s'], 0)
+        self.assertEqual(report['timings']['stage.cnr']['calls'], 1)
@@ -0,0 +1,33 @@
+import unittest
+from . import budget, report
+
+
+class TestReport(unittest.TestCase):
+    def test_render(self):
+        inp = budget.LinkBudgetInput(
+            tx_power=5,
+            tx_dish_size=2.4,
+            freq=12.45e9,
+            if_bw=24e6,
+            rx_dish_gain=33.02,
+            antenna_noise_temp=20,
+            lnb_noise_fig=0.6,
+            lnb_gain=40,
+            coax_length=110,
+            rx_noise_fig=10,
+            sat_long=-101,
+            rx_long=-82.43,
+            rx_lat=29.71
+        )
+        lines = report.render(inp, budget.compute(inp))
+        self.assertIn("Elevation:           49.84 degrees", lines)
+        self.assertIn("Tx dish gain:        47.37 dB", lines)
+        self.assertIn("EIRP:                52.37 dBW (172.71 kW)", lines)
+        self.assertIn("(C/N):               16.32 dB", lines)
+        self.assertIn("Capacity:           130.90 Mbps", lines)
+        # The Rx dish gain is only reported when computed from the size
+        self.assertFalse(any(x.startswith("Rx dish gain") for x in lines))
+
+        with self.assertLogs(level='INFO') as cm:
+            report.log(inp, budget.compute(inp))
+        self.assertEqual(len(cm.output), len(lines))
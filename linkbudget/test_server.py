@@ -0,0 +1,170 @@
+import asyncio
+import json
+import unittest
+from . import batch, budget, server
+from .cache import LinkBudgetCache
+
+
+SCENARIO = {
+    'eirp': 52, 'freq': 12.45e9, 'if-bw': 24e6, 'rx-dish-size': 0.46,
+    'antenna-noise-temp': 20, 'lnb-noise-fig': 0.6, 'lnb-gain': 40,
+    'coax-length': 110, 'rx-noise-fig': 10, 'sat-long': -101,
+    'rx-long': -82.43, 'rx-lat': 29.71
+}
+
+
+def _request(method, path, payload=None, headers=()):
+    """Serialize an HTTP/1.1 request"""
+    body = b'' if payload is None else json.dumps(payload).encode()
+    lines = ["{} {} HTTP/1.1".format(method, path), "Host: localhost",
+             "Content-Length: {}".format(len(body))] + list(headers)
+    return ("\r\n".join(lines) + "\r\n\r\n").encode() + body
+
+
+async def _read_response(reader):
+    """Read one HTTP response and return the status, headers and payload"""
+    status = int((await reader.readline()).split()[1])
+    headers = {}
+    while True:
+        line = (await reader.readline()).decode()
+        if (line == '\r\n'):
+            break
+        name, _, value = line.partition(':')
+        headers[name.lower()] = value.strip()
+    body = await reader.readexactly(int(headers['content-length']))
+    return status, headers, json.loads(body)
+
+
+class TestServer(unittest.TestCase):
+    def run_with_server(self, client, **kwargs):
+        """Run a client coroutine against a server on a free local port"""
+        async def main():
+            srv = server.LinkBudgetServer(port=0, **kwargs)
+            await srv.start()
+            try:
+                reader, writer = await asyncio.open_connection(
+                    '127.0.0.1', srv.port)
+                try:
+                    return await client(srv, reader, writer)
+                finally:
+                    writer.close()
+            finally:
+                await srv.close()
+        return asyncio.run(main())
+
+    def test_analyze(self):
+        async def client(srv, reader, writer):
+            # Several requests on the same (kept-alive) connection
+            responses = []
+            for scenario in [SCENARIO, dict(SCENARIO, eirp=None)]:
+                writer.write(_request('POST', '/analyze', scenario))
+                responses.append(await _read_response(reader))
+            return responses
+
+        ok, error = self.run_with_server(client)
+        # Computed with the look angles and dish gains memoized by the server
+        ref = budget.compute(batch.to_input(SCENARIO),
+                             LinkBudgetCache()).to_dict()
+        self.assertEqual(ok[0], 200)
+        self.assertEqual(ok[1]['connection'], 'keep-alive')
+        self.assertEqual(ok[2], ref)
+        self.assertEqual(error[0], 400)
+        self.assertIn('Missing parameter', error[2]['error'])
+
+    def test_pipelining(self):
+        n_requests = 64
+        scenarios = [dict(SCENARIO, **{'rx-lat': i / 2})
+                     for i in range(n_requests)]
+
+        async def client(srv, reader, writer):
+            # All requests sent at once, before reading any response
+            writer.write(b''.join(_request('POST', '/analyze', scenario)
+                                  for scenario in scenarios))
+            writer.write(_request('GET', '/stats'))
+            responses = [await _read_response(reader)
+                         for _ in range(n_requests + 1)]
+            return responses, srv.coalescer.stats()
+
+        responses, batch_stats = self.run_with_server(client)
+        # Responses in the order of the requests
+        for scenario, (status, _, payload) in zip(scenarios, responses):
+            ref = budget.compute(batch.to_input(scenario))
+            self.assertEqual(status, 200)
+            self.assertAlmostEqual(payload['cnr_db'], ref.cnr_db)
+            self.assertAlmostEqual(payload['pointing']['elevation'],
+                                   ref.elevation)
+        stats = responses[-1][2]
+        self.assertEqual(stats['requests']['/analyze'], n_requests)
+        # The pipelined requests were evaluated in fewer batches
+        self.assertEqual(batch_stats['inputs'], n_requests)
+        self.assertLess(batch_stats['batches'], n_requests)
+
+    def test_batch(self):
+        scenarios = [SCENARIO, dict(SCENARIO, freq=-1), 'invalid',
+                     dict(SCENARIO, **{'rx-dish-size': 1.2})]
+
+        async def client(srv, reader, writer):
+            writer.write(_request('POST', '/batch', scenarios))
+            return await _read_response(reader)
+
+        status, _, payload = self.run_with_server(client)
+        self.assertEqual(status, 200)
+        self.assertEqual(len(payload), len(scenarios))
+        self.assertEqual(payload[0], budget.compute(
+            batch.to_input(SCENARIO), LinkBudgetCache()).to_dict())
+        self.assertTrue(payload[1]['error'].startswith('scenario 2:'))
+        self.assertTrue(payload[2]['error'].startswith('scenario 3:'))
+        self.assertGreater(payload[3]['cnr_db'], payload[0]['cnr_db'])
+
+    def test_batch_scalar_results(self):
+        # Stacked parameter on which the C/N does not depend
+        scenarios = [dict(SCENARIO, **{'tx-dish-size': i + 1})
+                     for i in range(budget.MIN_STACK_SIZE + 4)]
+        scenarios.append(dict(SCENARIO, freq=0))
+
+        async def client(srv, reader, writer):
+            writer.write(_request('POST', '/batch', scenarios))
+            return await _read_response(reader)
+
+        status, _, payload = self.run_with_server(client)
+        self.assertEqual(status, 200)
+        ref = budget.compute(batch.to_input(SCENARIO))
+        for res in payload[:-1]:
+            self.assertAlmostEqual(res['cnr_db'], ref.cnr_db)
+        self.assertTrue(payload[-1]['error'].startswith('scenario 21:'))
+
+    def test_health_and_errors(self):
+        async def client(srv, reader, writer):
+            requests = [
+                ('GET', '/health', None),
+                ('GET', '/unknown', None),
+                ('GET', '/analyze', None),
+                ('POST', '/batch', {'not': 'a list'}),
+            ]
+            responses = []
+            for method, path, payload in requests:
+                writer.write(_request(method, path, payload))
+                responses.append(await _read_response(reader))
+            # Invalid JSON, closing the connection afterwards
+            writer.write(b'POST /analyze HTTP/1.1\r\nContent-Length: 1\r\n'
+                         b'Connection: close\r\n\r\n{')
+            responses.append(await _read_response(reader))
+            eof = await reader.read()
+            return responses, eof
+
+        responses, eof = self.run_with_server(client)
+        self.assertEqual(responses[0][::2], (200, {'status': 'ok'}))
+        self.assertEqual([r[0] for r in responses[1:]],
+                         [404, 405, 400, 400])
+        self.assertEqual(responses[-1][1]['connection'], 'close')
+        self.assertEqual(eof, b'')
+
+    def test_body_limit(self):
+        async def client(srv, reader, writer):
+            writer.write(_request('POST', '/analyze', SCENARIO))
+            return await _read_response(reader), await reader.read()
+
+        (status, headers, _), eof = self.run_with_server(client, max_body=16)
+        self.assertEqual(status, 413)
+        self.assertEqual(headers['connection'], 'close')
+        self.assertEqual(eof, b'')
@@ -0,0 +1,89 @@
+import dataclasses
+import unittest
+import numpy as np
+from . import budget
+from .session import LinkBudgetSession
+from .test_budget import sa8_input
+
+
+class TestSession(unittest.TestCase):
+    def setUp(self):
+        self.inp = sa8_input()
+
+    def assertResultEqual(self, res, inp):
+        ref = budget.compute(inp)
+        self.assertEqual(res.to_dict(), ref.to_dict())
+
+    def test_initial_result(self):
+        session = LinkBudgetSession(self.inp)
+        self.assertResultEqual(session.result(), self.inp)
+        self.assertTrue(all(s['computed'] == 1 and s['reused'] == 0
+                            for s in session.stats().values()))
+
+        # Nothing changed
+        self.assertResultEqual(session.result(), self.inp)
+        self.assertTrue(all(s['computed'] == 1 and s['reused'] == 1
+                            for s in session.stats().values()))
+
+    def test_partial_update(self):
+        session = LinkBudgetSession(self.inp)
+        session.result()
+
+        session.update(coax_length=50)
+        self.assertResultEqual(
+            session.result(), dataclasses.replace(self.inp, coax_length=50))
+        stats = session.stats()
+        for name in ('noise', 'cnr', 'capacity'):
+            self.assertEqual(stats[name]['computed'], 2, name)
+        for name in ('pointing', 'eirp', 'path_loss', 'rx_gain'):
+            self.assertEqual(stats[name]['computed'], 1, name)
+            self.assertEqual(stats[name]['reused'], 1, name)
+
+        # Same value does not invalidate anything
+        session.update(coax_length=50)
+        session.result()
+        self.assertEqual(session.stats()['noise']['computed'], 2)
+
+        # The frequency affects the gains and the path loss, but not the
+        # look angles
+        session.update(freq=11.7e9)
+        self.assertResultEqual(session.result(), dataclasses.replace(
+            self.inp, coax_length=50, freq=11.7e9))
+        stats = session.stats()
+        self.assertEqual(stats['pointing']['computed'], 1)
+        self.assertEqual(stats['noise']['computed'], 2)
+        for name in ('eirp', 'path_loss', 'rx_gain'):
+            self.assertEqual(stats[name]['computed'], 2, name)
+        for name in ('cnr', 'capacity'):
+            self.assertEqual(stats[name]['computed'], 3, name)
+
+        # The receiver position affects the pointing and its dependents
+        session.update(rx_lat=10)
+        session.result()
+        stats = session.stats()
+        self.assertEqual(stats['pointing']['computed'], 2)
+        self.assertEqual(stats['path_loss']['computed'], 3)
+        self.assertEqual(stats['rx_gain']['computed'], 2)
+
+    def test_exclusive_update(self):
+        session = LinkBudgetSession(self.inp)
+        session.update(rx_dish_gain=36)
+        self.assertIsNone(session.inp.rx_dish_size)
+        self.assertResultEqual(session.result(), dataclasses.replace(
+            self.inp, rx_dish_size=None, rx_dish_gain=36))
+
+    def test_invalid_update(self):
+        session = LinkBudgetSession(self.inp)
+        with self.assertRaises(ValueError):
+            session.update(unknown=1)
+        with self.assertRaises(ValueError):
+            session.update(tx_power=10)  # without the Tx dish
+        self.assertEqual(session.inp, self.inp)
+
+    def test_array_update(self):
+        session = LinkBudgetSession(self.inp)
+        sizes = np.array([0.46, 0.9])
+        session.update(rx_dish_size=sizes)
+        res = session.result()
+        self.assertEqual(res.cnr_db.shape, (2,))
+        self.assertEqual(session.stats()['pointing']['computed'], 1)
@@ -0,0 +1,146 @@
+import dataclasses
+import io
+import json
+import unittest
+import unittest.mock
+import numpy as np
+from . import batch, budget, main, solve
+from .test_budget import sa8_input
+
+
+class TestSolve(unittest.TestCase):
+    def setUp(self):
+        self.inp = sa8_input()
+
+    def test_round_trip(self):
+        """The solved value reproduces the target C/N"""
+        inp = dataclasses.replace(self.inp, eirp=None, tx_power=10,
+                                  tx_dish_gain=40)
+        cases = [
+            (self.inp, 'rx_dish_size', 8),
+            (self.inp, 'eirp', 8),
+            (inp, 'tx_power', 8),
+            (self.inp, 'if_bw', 8),
+            (self.inp, 'coax_length', 16),
+            (self.inp, 'lnb_noise_fig', 16),
+        ]
+        for base, param, target in cases:
+            value = solve.solve(base, param, cnr_db=target)
+            res = budget.compute(dataclasses.replace(base, **{param: value}))
+            self.assertAlmostEqual(res.cnr_db, target, places=9, msg=param)
+
+    def test_exclusive_alternative(self):
+        """The alternatives of the free parameter are ignored"""
+        inp = dataclasses.replace(self.inp, rx_dish_size=None,
+                                  rx_dish_gain=30)
+        self.assertAlmostEqual(solve.solve(inp, 'rx_dish_size', cnr_db=8),
+                               solve.solve(self.inp, 'rx_dish_size',
+                                           cnr_db=8))
+
+    def test_capacity_target(self):
+        target = 100e6
+        value = solve.solve(self.inp, 'rx_dish_size', capacity_bps=target)
+        res = budget.compute(dataclasses.replace(self.inp,
+                                                 rx_dish_size=value))
+        self.assertAlmostEqual(res.capacity_bps / target, 1, places=9)
+
+        # The IF bandwidth is solved numerically
+        value = solve.solve(self.inp, 'if_bw', capacity_bps=target)
+        res = budget.compute(dataclasses.replace(self.inp, if_bw=value))
+        self.assertAlmostEqual(res.capacity_bps / target, 1, places=9)
+
+        # The capacity is bounded by C/N0 / ln(2) as the bandwidth grows
+        self.assertTrue(np.isnan(
+            solve.solve(self.inp, 'if_bw', capacity_bps=1e12)))
+
+    def test_array(self):
+        lats = np.array([0, 15, 29.71, 45])
+        inp = dataclasses.replace(self.inp, rx_lat=lats)
+        targets = {
+            'rx_dish_size': {'capacity_bps': 150e6},
+            'coax_length': {'cnr_db': 15.9},
+            'if_bw': {'capacity_bps': 150e6},
+        }
+        for param, target in targets.items():
+            values = solve.solve(inp, param, **target)
+            self.assertEqual(values.shape, lats.shape)
+            for lat, value in zip(lats, values):
+                scalar_inp = dataclasses.replace(self.inp, rx_lat=lat)
+                scalar_value = solve.solve(scalar_inp, param, **target)
+                if (np.isnan(scalar_value)):
+                    self.assertTrue(np.isnan(value))
+                else:
+                    self.assertAlmostEqual(value / scalar_value, 1,
+                                           places=9, msg=param)
+
+    def test_infeasible(self):
+        # Not even a zero-length coax achieves the target
+        self.assertTrue(np.isnan(
+            solve.solve(self.inp, 'coax_length', cnr_db=30)))
+        # Would require a negative LNB noise figure
+        self.assertTrue(np.isnan(
+            solve.solve(self.inp, 'lnb_noise_fig', cnr_db=30)))
+
+    def test_errors(self):
+        with self.assertRaises(ValueError):
+            solve.solve(self.inp, 'freq', cnr_db=8)
+        with self.assertRaises(ValueError):
+            solve.solve(self.inp, 'eirp')
+        with self.assertRaises(ValueError):
+            solve.solve(self.inp, 'eirp', cnr_db=8, capacity_bps=1e6)
+
+        inp = dataclasses.replace(
+            self.inp, lnb_noise_fig=None, lnb_gain=None, coax_length=None,
+            rx_noise_fig=None, noise_chain=[{'nf': 0.6, 'gain': 40},
+                                            {'nf': 10}])
+        with self.assertRaises(ValueError):
+            solve.solve(inp, 'coax_length', cnr_db=8)
+        self.assertGreater(solve.solve(inp, 'rx_dish_size', cnr_db=8), 0)
+
+    def test_batch(self):
+        defaults = {k: v for k, v in dataclasses.asdict(self.inp).items()
+                    if v is not None}
+        scenarios = [{'rx_lat': 10}, {'rx_lat': 40, 'coax_length': 30}]
+        solve_for = {'param': 'coax_length', 'cnr_db': 15.5}
+        res = list(batch.evaluate(enumerate(scenarios), defaults,
+                                  solve_for=solve_for))
+        for scenario, row in zip(scenarios, res):
+            inp = batch.to_input(scenario, defaults)
+            self.assertAlmostEqual(row['coax_length'],
+                                   solve.solve(inp, 'coax_length', 15.5))
+            self.assertGreater(row['coax_length'], 0)
+
+        # Infeasible targets are reported as null
+        solve_for['cnr_db'] = 30
+        res = list(batch.evaluate(enumerate(scenarios), defaults,
+                                  solve_for=solve_for))
+        self.assertEqual(res, [{'coax_length': None}] * 2)
+
+    def test_cli(self):
+        parser = main.get_parser()
+        base_args = [
+            '--eirp', '52', '--freq', '12.45e9', '--if-bw', '24e6',
+            '--antenna-noise-temp', '20', '--lnb-noise-fig', '0.6',
+            '--lnb-gain', '40', '--coax-length', '110',
+            '--rx-noise-fig', '10', '--sat-long', '-101',
+            '--rx-long', '-82.43', '--rx-lat', '29.71', '--json'
+        ]
+        args = parser.parse_args(base_args + ['--solve', 'rx-dish-size',
+                                              '--target-cnr', '8'])
+        main.validate(parser, args)
+        with unittest.mock.patch('sys.stdout', new=io.StringIO()) as out:
+            main.run_solve(args)
+        self.assertAlmostEqual(
+            json.loads(out.getvalue())['rx_dish_size'],
+            solve.solve(self.inp, 'rx_dish_size', cnr_db=8))
+
+        invalid = [
+            ['--rx-dish-size', '0.46', '--solve', 'eirp'],  # no target
+            ['--rx-dish-size', '0.46', '--target-cnr', '8'],  # no --solve
+            ['--solve', 'rx_dish_size', '--target-cnr', '8',
+             '--target-capacity', '1e6'],
+        ]
+        for extra in invalid:
+            with self.assertRaises(SystemExit):
+                args = parser.parse_args(base_args + extra)
+                main.validate(parser, args)
@@ -0,0 +1,96 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+from . import main, store, sweep
+from .test_budget import sa8_input
+
+
+class TestStore(unittest.TestCase):
+    def setUp(self):
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self._tmpdir.name, 'results')
+
+    def tearDown(self):
+        self._tmpdir.cleanup()
+
+    def test_round_trip(self):
+        chunks = [
+            {'a': np.arange(3), 'b.c': np.ones(3)},
+            {'a': np.arange(3, 5), 'b.c': np.zeros(2)},
+        ]
+        n = store.write(self.path, chunks)
+        self.assertEqual(n, 5)
+
+        results = store.open_store(self.path)
+        self.assertEqual(results.length, 5)
+        self.assertEqual(results.keys(), ['a', 'b.c'])
+        self.assertIsInstance(results['a'], np.memmap)
+        np.testing.assert_array_equal(results['a'], np.arange(5))
+        np.testing.assert_array_equal(results['b.c'][2:4], [1, 0])
+        with self.assertRaises(KeyError):
+            results['d']
+
+    def test_empty(self):
+        store.write(self.path, [], columns=['a'])
+        results = store.open_store(self.path)
+        self.assertEqual(results.length, 0)
+        self.assertEqual(len(results['a']), 0)
+
+    def test_invalid_chunks(self):
+        with store.ColumnWriter(self.path, ['a', 'b']) as writer:
+            with self.assertRaises(ValueError):
+                writer.write({'a': [1]})
+            with self.assertRaises(ValueError):
+                writer.write({'a': [1], 'b': [1, 2]})
+
+    def test_incomplete_store(self):
+        with self.assertRaises(RuntimeError):
+            with store.ColumnWriter(self.path, ['a']) as writer:
+                writer.write({'a': [1]})
+                raise RuntimeError
+        with self.assertRaises(ValueError):
+            store.open_store(self.path)
+
+    def test_chunked_sweep(self):
+        inp = sa8_input()
+        values = {
+            'freq': [11.7e9, 12.45e9],
+            'rx_dish_size': np.linspace(0.3, 1.2, 7),
+            'rx_lat': [-10, 20, 50]
+        }
+        ref = sweep.sweep(inp, values)
+        chunks = list(sweep.sweep_chunks(inp, values, chunk_size=5))
+        self.assertEqual([len(c['cnr_db']) for c in chunks],
+                         [5] * 8 + [2])
+
+        store.write(self.path, sweep.sweep_chunks(inp, values, 5))
+        results = store.open_store(self.path)
+        self.assertEqual(results.keys(), list(ref.keys()))
+        for key, col in ref.items():
+            np.testing.assert_array_equal(results[key], col)
+
+    def test_cli(self):
+        parser = main.get_parser()
+        args = parser.parse_args([
+            '--eirp', '52',
+            '--freq', '12.45e9',
+            '--if-bw', '24e6',
+            '--antenna-noise-temp', '20',
+            '--lnb-noise-fig', '0.6',
+            '--lnb-gain', '40',
+            '--coax-length', '110',
+            '--rx-noise-fig', '10',
+            '--sat-long', '-101',
+            '--rx-long', '-82.43',
+            '--rx-lat', '29.71',
+            '--sweep', 'rx-dish-size=0.3:1.2:10',
+            '--sweep-output', self.path,
+            '--sweep-chunk-size', '3'
+        ])
+        main.validate(parser, args)
+        sweep.print_sweep(args)
+        results = store.open_store(self.path)
+        self.assertEqual(results.length, 10)
+        np.testing.assert_allclose(results['rx_dish_size'],
+                                   np.linspace(0.3, 1.2, 10))
@@ -0,0 +1,119 @@
+import unittest
+import numpy as np
+import dataclasses
+from . import budget, main, sweep
+
+
+class TestSweep(unittest.TestCase):
+    def setUp(self):
+        self.parser = main.get_parser()
+        self.base_args = [
+            '--eirp', '52',
+            '--freq', '12.45e9',
+            '--if-bw', '24e6',
+            '--rx-dish-size', '0.46',
+            '--antenna-noise-temp', '20',
+            '--lnb-noise-fig', '0.6',
+            '--lnb-gain', '40',
+            '--coax-length', '110',
+            '--rx-noise-fig', '10',
+            '--sat-long', '-101',
+            '--rx-long', '-82.43',
+            '--rx-lat', '29.71',
+            '--json'
+        ]
+
+    def test_parse_values(self):
+        np.testing.assert_allclose(sweep.parse_values('1,2.5,4'),
+                                   [1, 2.5, 4])
+        np.testing.assert_allclose(sweep.parse_values('11e9:12e9:3'),
+                                   [11e9, 11.5e9, 12e9])
+        np.testing.assert_allclose(sweep.parse_values('5'), [5])
+        with self.assertRaises(ValueError):
+            sweep.parse_values('1:2')
+        with self.assertRaises(ValueError):
+            sweep.parse_values('a,b')
+
+    def test_parse_sweep_opts(self):
+        args = self.parser.parse_args(self.base_args)
+        values = sweep.parse_sweep_opts(
+            ['freq=11e9,12e9', '--rx-dish-size=0.6:1.2:4'], args)
+        self.assertEqual(list(values.keys()), ['freq', 'rx_dish_size'])
+        self.assertEqual(len(values['rx_dish_size']), 4)
+
+        with self.assertRaises(ValueError):
+            sweep.parse_sweep_opts(['freq'], args)
+        with self.assertRaises(ValueError):
+            sweep.parse_sweep_opts(['freq=1', 'freq=2'], args)
+        with self.assertRaises(ValueError):
+            sweep.parse_sweep_opts(['radar=1'], args)
+        with self.assertRaises(ValueError):
+            sweep.parse_sweep_opts(['unknown=1'], args)
+
+    def test_sweep(self):
+        args = self.parser.parse_args(self.base_args)
+        inp = budget.LinkBudgetInput.from_args(args)
+        values = {
+            'freq': [11.7e9, 12.45e9],
+            'rx_dish_size': [0.46, 0.6, 0.9],
+            'coax_length': [50, 110]
+        }
+        columns = sweep.sweep(inp, values)
+
+        n_points = 2 * 3 * 2
+        for key, col in columns.items():
+            self.assertEqual(col.shape, (n_points,), key)
+
+        # Each grid point matches the corresponding single-point analysis
+        i = 0
+        for freq in values['freq']:
+            for size in values['rx_dish_size']:
+                for length in values['coax_length']:
+                    res = budget.compute(dataclasses.replace(
+                        inp, freq=freq, rx_dish_size=size,
+                        coax_length=length)).to_dict()
+                    self.assertEqual(columns['freq'][i], freq)
+                    self.assertEqual(columns['rx_dish_size'][i], size)
+                    self.assertEqual(columns['coax_length'][i], length)
+                    self.assertAlmostEqual(columns['cnr_db'][i],
+                                           res['cnr_db'])
+                    self.assertAlmostEqual(columns['capacity_bps'][i],
+                                           res['capacity_bps'], places=2)
+                    self.assertAlmostEqual(
+                        columns['pointing.elevation'][i],
+                        res['pointing']['elevation'])
+                    self.assertAlmostEqual(
+                        columns['noise_fig_db.total'][i],
+                        res['noise_fig_db']['total'])
+                    i += 1
+
+    def test_sweep_exclusive_param(self):
+        # A swept dish gain replaces the dish size defined on args
+        args = self.parser.parse_args(self.base_args)
+        inp = budget.LinkBudgetInput.from_args(args)
+        columns = sweep.sweep(inp, {'rx_dish_gain': [33.02, 36.02]})
+        self.assertAlmostEqual(columns['cnr_db'][0], 15.95, delta=0.01)
+        self.assertAlmostEqual(columns['cnr_db'][1], 18.95, delta=0.01)
+
+    def test_cli_validation(self):
+        # Swept parameters count as defined
+        args = self.parser.parse_args(
+            [a for a in self.base_args if a not in ('--freq', '12.45e9')] +
+            ['--sweep', 'freq=11e9,12e9'])
+        main.validate(self.parser, args)
+
+        with self.assertRaises(SystemExit):
+            args = self.parser.parse_args(
+                [a for a in self.base_args if a not in ('--freq', '12.45e9')])
+            main.validate(self.parser, args)
+
+        # Swept alternatives are mutually exclusive with the regular options
+        with self.assertRaises(SystemExit):
+            args = self.parser.parse_args(
+                self.base_args + ['--sweep', 'rx-dish-gain=30,33'])
+            main.validate(self.parser, args)
+
+        with self.assertRaises(SystemExit):
+            args = self.parser.parse_args(
+                self.base_args + ['--sweep', 'radar=1'])
+            main.validate(self.parser, args)
@@ -1,8 +1,35 @@
-from math import log10
+import math
+import numbers
+
+
+def is_scalar(*vals):
+    """Check whether all given values are plain (non-array) numbers
+
+    None values are ignored, so that optional arguments can be passed
+    directly.
+
+    """
+    return all(isinstance(v, numbers.Number) for v in vals if v is not None)
+
+
+def array_namespace(*vals):
+    """Pick the math module suitable for the given values
+
+    Returns the standard math module when all values are scalars, so that
+    scalar inputs keep producing Python floats with no array overhead, and
+    NumPy otherwise, so that array inputs are processed element-wise (with
+    broadcasting). NumPy is only imported when first needed, so that the
+    scalar code path does not pay its import cost.
+
+    """
+    if is_scalar(*vals):
+        return math
+    import numpy
+    return numpy
 
 
 def abs_to_db(val):
-    return 10*log10(val)
+    return 10*array_namespace(val).log10(val)
 
 
 def db_to_abs(val_db):
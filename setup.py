@@ -36,5 +36,5 @@ setup(
         "Programming Language :: Python :: 3 :: Only",
         "License :: OSI Approved :: GNU General Public License v3 (GPLv3)"
     ],
-    python_requires='>=3'
+    python_requires='>=3.7'
 )